@@ -1,9 +1,80 @@
-import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
-import joblib
+from __future__ import annotations
+
+import math
 import os
-from typing import Tuple
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Hashable, Optional, Sequence, Tuple, Union
+
+from app.config import settings
+from app.ai.registry import ModelRegistry
+
+# numpy, scipy, scikit-learn and joblib are imported inside the methods that
+# use them, so importing this module (and everything that depends on it)
+# does not pay for the scientific stack until a model is first used.
+if TYPE_CHECKING:
+    import numpy as np
+
+ArrayLike = Union["np.ndarray", Sequence[float]]
+
+# Inference modes:
+# - "fast": closed-form scaler + logistic regression using parameters
+#   extracted once at load time (no sklearn call per prediction)
+# - "sklearn": call scaler.transform + predict_proba on every prediction
+INFERENCE_MODES = ("fast", "sklearn")
+
+
+class ScoreCache:
+    """
+    Bounded, thread-safe LRU cache of recovery scores.
+    
+    Keys are (model version, rounded overdue amount, ageing days), so cases
+    with standard invoice amounts share one model evaluation.
+    """
+    
+    def __init__(self, max_size: int, amount_decimals: int = 2):
+        self.max_size = max_size
+        self.amount_decimals = amount_decimals
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[float]:
+        with self._lock:
+            score = self._entries.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return score
+    
+    def put(self, key: Hashable, score: float):
+        with self._lock:
+            self._entries[key] = score
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "amount_decimals": self.amount_decimals,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
 
 
 class RecoveryScorePredictor:
@@ -20,13 +91,38 @@ class RecoveryScorePredictor:
     - Be regularly retrained and validated
     """
     
-    def __init__(self, model_path: str = None):
+    def __init__(
+        self,
+        model_path: str = None,
+        inference_mode: str = "fast",
+        artifact: Optional[dict] = None,
+        version: Optional[str] = None,
+        score_cache_size: int = 0,
+        cache_amount_decimals: int = 2
+    ):
+        if inference_mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode '{inference_mode}', expected one of {INFERENCE_MODES}")
+        
         self.model = None
         self.scaler = None
         self.model_path = model_path
+        self.inference_mode = inference_mode
+        
+        # Registry version this predictor was loaded from (score provenance)
+        self.version = version
         
-        # Try to load existing model
-        if model_path and os.path.exists(model_path):
+        # Optional memoization of single-row scores
+        self.score_cache = ScoreCache(score_cache_size, cache_amount_decimals) if score_cache_size > 0 else None
+        
+        # Closed-form parameters: (mean, scale, coef) per feature + intercept
+        self._params: Optional[Tuple[float, float, float, float, float, float, float]] = None
+        self._coef: Optional[np.ndarray] = None
+        
+        if artifact is not None:
+            # Load a published registry artifact, no training required
+            self.load_artifact(artifact)
+        elif model_path and os.path.exists(model_path):
+            # Try to load existing model
             self.load_model()
         else:
             # Initialize with a baseline model
@@ -39,6 +135,10 @@ class RecoveryScorePredictor:
         Training data is synthetic for demonstration purposes.
         In production, this would be trained on actual historical recovery data.
         """
+        import numpy as np
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.preprocessing import StandardScaler
+        
         # Synthetic training data
         # Features: [overdue_amount, ageing_days]
         # Label: 1 (recovered), 0 (not recovered)
@@ -71,6 +171,54 @@ class RecoveryScorePredictor:
         # Train logistic regression
         self.model = LogisticRegression(random_state=42)
         self.model.fit(X_train_scaled, y_train)
+        self._extract_params()
+        self._invalidate_cache()
+    
+    def _extract_params(self):
+        """
+        Extract scaler and model parameters for closed-form inference.
+        
+        The model is a StandardScaler followed by a binary LogisticRegression,
+        so the recovery probability is
+        
+            sigmoid(sum_i coef_i * (x_i - mean_i) / scale_i + intercept)
+        
+        The terms are evaluated in the same order as sklearn (standardise,
+        then dot product, then expit). The NumPy batch path reuses the same
+        matmul and expit kernels and is bit-for-bit identical to
+        predict_proba; the plain Python single-row path can differ in the
+        last few ulps of the dot product (BLAS may fuse multiply-adds),
+        which changes the score rounded to 4 decimals only when it lies
+        within those ulps of a rounding boundary.
+        """
+        self._params = None
+        self._coef = None
+        if self.inference_mode != "fast" or self.model is None or self.scaler is None:
+            return
+        
+        self._set_params(self.scaler.mean_, self.scaler.scale_, self.model.coef_[0], self.model.intercept_)
+    
+    def _set_params(self, mean, scale, coef, intercept):
+        """Cache closed-form parameters as Python floats plus a contiguous coef vector."""
+        import numpy as np
+        
+        coef = np.asarray(coef, dtype=np.float64).ravel()
+        self._params = (
+            float(mean[0]), float(scale[0]), float(coef[0]),
+            float(mean[1]), float(scale[1]), float(coef[1]),
+            float(np.ravel(intercept)[0]),
+        )
+        self._coef = np.ascontiguousarray(coef)
+    
+    def _invalidate_cache(self):
+        """Drop memoized scores; called whenever the model changes."""
+        if self.score_cache is not None:
+            self.score_cache.clear()
+    
+    @property
+    def has_model(self) -> bool:
+        """Whether a trained model is available (otherwise deterministic fallback is used)."""
+        return self._params is not None or (self.model is not None and self.scaler is not None)
     
     def predict_recovery_score(self, overdue_amount: float, ageing_days: int) -> float:
         """
@@ -82,11 +230,33 @@ class RecoveryScorePredictor:
         
         Returns:
             Recovery probability score between 0 and 1
+        
+        With a score cache configured, the amount is rounded to the cache's
+        precision and repeated (amount, ageing) pairs skip model evaluation.
         """
+        cache = self.score_cache
+        if cache is None:
+            return self._score(overdue_amount, ageing_days)
+        
+        overdue_amount = round(overdue_amount, cache.amount_decimals)
+        key = (self.version, overdue_amount, ageing_days)
+        score = cache.get(key)
+        if score is None:
+            score = self._score(overdue_amount, ageing_days)
+            cache.put(key, score)
+        return score
+    
+    def _score(self, overdue_amount: float, ageing_days: int) -> float:
+        """Evaluate the model (or deterministic fallback) for a single case."""
+        if self._params is not None:
+            return round(self._fast_probability(overdue_amount, ageing_days), 4)
+        
         if self.model is None or self.scaler is None:
             # Fallback to deterministic scoring if model not available
             return self._deterministic_score(overdue_amount, ageing_days)
         
+        import numpy as np
+        
         # Prepare input
         X = np.array([[overdue_amount, ageing_days]])
         X_scaled = self.scaler.transform(X)
@@ -96,6 +266,77 @@ class RecoveryScorePredictor:
         
         return round(float(probability), 4)
     
+    def _fast_probability(self, overdue_amount: float, ageing_days: float) -> float:
+        """Closed-form recovery probability for a single case in plain Python."""
+        mean_0, scale_0, coef_0, mean_1, scale_1, coef_1, intercept = self._params
+        
+        decision = (
+            ((overdue_amount - mean_0) / scale_0) * coef_0
+            + ((ageing_days - mean_1) / scale_1) * coef_1
+            + intercept
+        )
+        
+        try:
+            return 1.0 / (1.0 + math.exp(-decision))
+        except OverflowError:
+            return 0.0
+    
+    def _fast_probabilities(self, overdue_amounts: np.ndarray, ageing_days: np.ndarray) -> np.ndarray:
+        """Closed-form recovery probabilities for a batch of cases in NumPy."""
+        import numpy as np
+        from scipy.special import expit
+        
+        mean_0, scale_0, _, mean_1, scale_1, _, intercept = self._params
+        
+        X_scaled = np.column_stack((
+            (overdue_amounts - mean_0) / scale_0,
+            (ageing_days - mean_1) / scale_1
+        ))
+        
+        return expit(X_scaled @ self._coef + intercept)
+    
+    def predict_batch(self, overdue_amounts: ArrayLike, ageing_days: ArrayLike) -> np.ndarray:
+        """
+        Predict recovery probability scores for many cases at once.
+        
+        All rows are scored in one vectorized pass (closed-form in "fast"
+        mode, a single scaler.transform + predict_proba call in "sklearn"
+        mode), so per-call overhead is paid once per batch rather than once
+        per case.
+        
+        Args:
+            overdue_amounts: NumPy array or list of overdue amounts
+            ageing_days: NumPy array or list of ageing days, same length
+        
+        Returns:
+            NumPy array of recovery probability scores between 0 and 1
+        """
+        import numpy as np
+        
+        amounts = np.asarray(overdue_amounts, dtype=np.float64).ravel()
+        ageing = np.asarray(ageing_days, dtype=np.float64).ravel()
+        
+        if amounts.shape != ageing.shape:
+            raise ValueError(
+                f"overdue_amounts and ageing_days must have the same length "
+                f"({amounts.size} != {ageing.size})"
+            )
+        
+        if amounts.size == 0:
+            return np.empty(0, dtype=np.float64)
+        
+        if self._params is not None:
+            return np.round(self._fast_probabilities(amounts, ageing), 4)
+        
+        if self.model is None or self.scaler is None:
+            # Fallback to deterministic scoring if model not available
+            return self._deterministic_scores(amounts, ageing)
+        
+        X_scaled = self.scaler.transform(np.column_stack((amounts, ageing)))
+        probabilities = self.model.predict_proba(X_scaled)[:, 1]  # Probability of class 1 (recovery)
+        
+        return np.round(probabilities, 4)
+    
     def _deterministic_score(self, overdue_amount: float, ageing_days: int) -> float:
         """
         Fallback deterministic scoring logic.
@@ -115,8 +356,21 @@ class RecoveryScorePredictor:
         
         return round(score, 4)
     
+    def _deterministic_scores(self, overdue_amounts: np.ndarray, ageing_days: np.ndarray) -> np.ndarray:
+        """Vectorized form of _deterministic_score."""
+        import numpy as np
+        
+        amount_factors = np.maximum(0, 1 - (overdue_amounts / 100000))
+        ageing_factors = np.maximum(0, 1 - (ageing_days / 180))
+        
+        scores = (amount_factors * 0.4) + (ageing_factors * 0.6)
+        
+        return np.round(scores, 4)
+    
     def save_model(self):
         """Save model and scaler to disk."""
+        import joblib
+        
         if self.model_path and self.model and self.scaler:
             os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
             joblib.dump({
@@ -126,10 +380,47 @@ class RecoveryScorePredictor:
     
     def load_model(self):
         """Load model and scaler from disk."""
+        import joblib
+        
         if self.model_path and os.path.exists(self.model_path):
             data = joblib.load(self.model_path)
             self.model = data['model']
             self.scaler = data['scaler']
+            self._extract_params()
+            self._invalidate_cache()
+    
+    def export_artifact(self) -> Tuple[dict, dict]:
+        """
+        Export the model for publishing to the registry.
+        
+        Returns:
+            (params, estimators): inference parameters as NumPy arrays and
+            the fitted sklearn objects
+        """
+        import numpy as np
+        
+        if self.model is None or self.scaler is None:
+            raise ValueError("No trained model to export")
+        
+        params = {
+            "mean": np.asarray(self.scaler.mean_, dtype=np.float64),
+            "scale": np.asarray(self.scaler.scale_, dtype=np.float64),
+            "coef": np.asarray(self.model.coef_[0], dtype=np.float64),
+            "intercept": np.asarray(self.model.intercept_, dtype=np.float64),
+        }
+        return params, {"model": self.model, "scaler": self.scaler}
+    
+    def load_artifact(self, artifact: dict):
+        """Load a registry artifact (parameter arrays, optionally with fitted estimators)."""
+        self.model = artifact.get("model")
+        self.scaler = artifact.get("scaler")
+        
+        if self.inference_mode == "fast":
+            self._set_params(artifact["mean"], artifact["scale"], artifact["coef"], artifact["intercept"])
+        elif self.model is None or self.scaler is None:
+            raise ValueError("sklearn inference mode needs an artifact with fitted estimators")
+        
+        self._invalidate_cache()
     
     def get_model_info(self) -> dict:
         """Get information about the model."""
@@ -137,18 +428,126 @@ class RecoveryScorePredictor:
             "model_type": "Logistic Regression",
             "features": ["overdue_amount", "ageing_days"],
             "output": "Recovery probability score (0-1)",
-            "status": "baseline" if self.model else "fallback",
+            "status": "baseline" if self.has_model else "fallback",
+            "version": self.version,
+            "inference_mode": self.inference_mode if self.has_model else "deterministic",
+            "score_cache": self.score_cache.stats() if self.score_cache else None,
             "description": "Predicts likelihood of debt recovery based on amount and ageing"
         }
 
 
-# Singleton instance
+# Singleton instance, swapped atomically when the active model version changes
 _predictor = None
+_predictor_lock = threading.Lock()
+_last_version_check = 0.0
+_registry = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get singleton instance of the model registry."""
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry(settings.AI_MODEL_REGISTRY_PATH)
+    return _registry
 
 
 def get_predictor() -> RecoveryScorePredictor:
-    """Get singleton instance of the predictor."""
+    """
+    Get the predictor for the active model version.
+    
+    At most every AI_MODEL_RELOAD_INTERVAL_SECONDS the registry's ACTIVE
+    pointer is checked; if another version was activated the new model is
+    loaded and swapped in. Callers holding the previous instance keep using
+    it until they are done, so no request ever sees a half-loaded model.
+    """
+    global _last_version_check
+    
+    predictor = _predictor
+    if predictor is not None and time.monotonic() - _last_version_check < settings.AI_MODEL_RELOAD_INTERVAL_SECONDS:
+        return predictor
+    
+    with _predictor_lock:
+        if _predictor is None or time.monotonic() - _last_version_check >= settings.AI_MODEL_RELOAD_INTERVAL_SECONDS:
+            _last_version_check = time.monotonic()
+            _reload_if_changed()
+        return _predictor
+
+
+def reload_predictor() -> RecoveryScorePredictor:
+    """Check the registry now and hot-swap to the active version if it changed."""
+    global _last_version_check
+    with _predictor_lock:
+        _last_version_check = time.monotonic()
+        _reload_if_changed()
+        return _predictor
+
+
+def load_predictor_version(version: str) -> RecoveryScorePredictor:
+    """Get a predictor for a specific registry version, reusing the serving one if it matches."""
+    current = get_predictor()
+    if current.version == version:
+        return current
+    
+    return RecoveryScorePredictor(
+        inference_mode=settings.AI_INFERENCE_MODE,
+        artifact=get_model_registry().load(version, with_estimators=settings.AI_INFERENCE_MODE == "sklearn"),
+        version=version
+    )
+
+
+def _reload_if_changed():
+    """Load the registry's active version if it differs from the current one. Caller holds the lock."""
     global _predictor
-    if _predictor is None:
-        _predictor = RecoveryScorePredictor()
-    return _predictor
+    registry = get_model_registry()
+    
+    try:
+        active = registry.active_version() or _bootstrap_registry(registry)
+        if _predictor is None or _predictor.version != active:
+            _predictor = RecoveryScorePredictor(
+                inference_mode=settings.AI_INFERENCE_MODE,
+                artifact=registry.load(active, with_estimators=settings.AI_INFERENCE_MODE == "sklearn"),
+                version=active,
+                score_cache_size=settings.AI_SCORE_CACHE_SIZE,
+                cache_amount_decimals=settings.AI_SCORE_CACHE_AMOUNT_DECIMALS
+            )
+            print(f"[Model] Loaded recovery model {active}")
+    except Exception as e:
+        if _predictor is None:
+            print(f"[Model] Could not load model from registry ({e}), using in-memory baseline")
+            _predictor = RecoveryScorePredictor(
+                inference_mode=settings.AI_INFERENCE_MODE,
+                score_cache_size=settings.AI_SCORE_CACHE_SIZE,
+                cache_amount_decimals=settings.AI_SCORE_CACHE_AMOUNT_DECIMALS
+            )
+        else:
+            print(f"[Model] Could not reload model from registry ({e}), keeping {_predictor.version}")
+
+
+def _bootstrap_registry(registry: ModelRegistry) -> str:
+    """
+    Publish and activate the first model version.
+    
+    Imports the legacy AI_MODEL_PATH file if present, otherwise trains the
+    baseline model. Only one process does this; the others wait on the
+    bootstrap lock and then load what it published.
+    """
+    if not registry.acquire_bootstrap_lock():
+        raise RuntimeError("Timed out waiting for model registry bootstrap")
+    
+    try:
+        active = registry.active_version()
+        if active:
+            return active
+        
+        predictor = RecoveryScorePredictor(model_path=settings.AI_MODEL_PATH, inference_mode="sklearn")
+        params, estimators = predictor.export_artifact()
+        description = (
+            f"Imported from {settings.AI_MODEL_PATH}"
+            if os.path.exists(settings.AI_MODEL_PATH)
+            else "Baseline model trained on synthetic data"
+        )
+        version = registry.publish(params, estimators, description=description)
+        registry.activate(version)
+        return version
+    finally:
+        registry.release_bootstrap_lock()
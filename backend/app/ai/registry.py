@@ -0,0 +1,195 @@
+"""
+Model Registry
+Stores versioned recovery model artifacts on local disk.
+
+Layout:
+    <root>/
+        ACTIVE                 # name of the active version
+        v0001/
+            params.joblib      # inference parameters (uncompressed, memory-mappable)
+            estimators.joblib  # fitted scaler + model, for sklearn inference
+            metadata.json
+
+Versions are immutable once published. Activating a version rewrites the
+ACTIVE pointer atomically (write + rename), and workers pick the change up
+on their next reload check without a restart.
+"""
+import json
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+ACTIVE_POINTER = "ACTIVE"
+PARAMS_FILE = "params.joblib"
+ESTIMATORS_FILE = "estimators.joblib"
+METADATA_FILE = "metadata.json"
+BOOTSTRAP_LOCK = ".bootstrap.lock"
+
+VERSION_PATTERN = re.compile(r"^v(\d+)$")
+
+
+class ModelRegistry:
+    """Versioned, file-based store for recovery model artifacts."""
+    
+    def __init__(self, root: str):
+        self.root = root
+    
+    def _version_dir(self, version: str) -> str:
+        if not VERSION_PATTERN.match(version or ""):
+            raise ValueError(f"Invalid model version '{version}'")
+        return os.path.join(self.root, version)
+    
+    def list_versions(self) -> List[dict]:
+        """List published versions with their metadata, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        
+        active = self.active_version()
+        versions = []
+        for name in sorted(self._version_names(), key=lambda n: int(n[1:])):
+            metadata_path = os.path.join(self.root, name, METADATA_FILE)
+            if not os.path.exists(metadata_path):
+                continue
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            metadata["active"] = name == active
+            versions.append(metadata)
+        return versions
+    
+    def has_version(self, version: str) -> bool:
+        """Check whether a version has been fully published."""
+        try:
+            return os.path.exists(os.path.join(self._version_dir(version), METADATA_FILE))
+        except ValueError:
+            return False
+    
+    def active_version(self) -> Optional[str]:
+        """Name of the active version, or None if nothing is active yet."""
+        try:
+            with open(os.path.join(self.root, ACTIVE_POINTER)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    def publish(self, params: dict, estimators: Optional[dict] = None, description: str = "") -> str:
+        """
+        Publish a new model version.
+        
+        Args:
+            params: Inference parameters as NumPy arrays (mean, scale, coef, intercept)
+            estimators: Optional fitted {"model", "scaler"} objects
+            description: Free-text description stored in the metadata
+        
+        Returns:
+            The new version name
+        """
+        import joblib
+        
+        os.makedirs(self.root, exist_ok=True)
+        version, version_dir = self._reserve_version_dir()
+        
+        # Uncompressed so that arrays can be memory-mapped on load
+        joblib.dump(params, os.path.join(version_dir, PARAMS_FILE))
+        if estimators is not None:
+            joblib.dump(estimators, os.path.join(version_dir, ESTIMATORS_FILE))
+        
+        metadata = {
+            "version": version,
+            "model_type": "Logistic Regression",
+            "features": ["overdue_amount", "ageing_days"],
+            "description": description,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        # Metadata is written last: a version without it is not published yet
+        self._write_atomic(os.path.join(version_dir, METADATA_FILE), json.dumps(metadata, indent=2))
+        return version
+    
+    def activate(self, version: str):
+        """Atomically point the registry at a published version."""
+        if not self.has_version(version):
+            raise ValueError(f"Model version '{version}' not found")
+        self._write_atomic(os.path.join(self.root, ACTIVE_POINTER), version)
+    
+    def load(self, version: str, with_estimators: bool = False) -> dict:
+        """
+        Load a version's artifact.
+        
+        Parameter arrays are memory-mapped read-only, so every worker on the
+        host shares the same pages instead of holding its own copy.
+        """
+        import joblib
+        
+        if not self.has_version(version):
+            raise ValueError(f"Model version '{version}' not found")
+        
+        version_dir = self._version_dir(version)
+        artifact = dict(joblib.load(os.path.join(version_dir, PARAMS_FILE), mmap_mode="r"))
+        
+        estimators_path = os.path.join(version_dir, ESTIMATORS_FILE)
+        if with_estimators and os.path.exists(estimators_path):
+            artifact.update(joblib.load(estimators_path))
+        return artifact
+    
+    def acquire_bootstrap_lock(self, timeout: float = 30.0) -> bool:
+        """
+        Take the bootstrap lock used when publishing the first version.
+        
+        Returns True if this process holds the lock, False if another process
+        held it for longer than `timeout` seconds.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, BOOTSTRAP_LOCK)
+        deadline = time.monotonic() + timeout
+        
+        while True:
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                if self._lock_is_stale(path):
+                    self.release_bootstrap_lock()
+                    continue
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.1)
+    
+    @staticmethod
+    def _lock_is_stale(path: str, max_age: float = 300.0) -> bool:
+        """A lock older than `max_age` seconds was left behind by a crashed process."""
+        try:
+            return time.time() - os.path.getmtime(path) > max_age
+        except FileNotFoundError:
+            return False
+    
+    def release_bootstrap_lock(self):
+        try:
+            os.remove(os.path.join(self.root, BOOTSTRAP_LOCK))
+        except FileNotFoundError:
+            pass
+    
+    def _reserve_version_dir(self):
+        """Create the next version directory; mkdir is atomic, so concurrent publishers never share one."""
+        number = max((int(name[1:]) for name in self._version_names()), default=0) + 1
+        
+        while True:
+            version = f"v{number:04d}"
+            version_dir = os.path.join(self.root, version)
+            try:
+                os.mkdir(version_dir)
+                return version, version_dir
+            except FileExistsError:
+                number += 1
+    
+    def _version_names(self) -> List[str]:
+        return [name for name in os.listdir(self.root) if VERSION_PATTERN.match(name)]
+    
+    @staticmethod
+    def _write_atomic(path: str, content: str):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import time
 
 from app.database import get_db
-from app.schemas import CaseCreate, CaseUpdate, CaseResponse, EscalationRequest
+from app.schemas import CaseCreate, CaseUpdate, CaseResponse, CaseSummaryResponse, CasePage, EscalationRequest, BulkImportResult, BacklogAllocationResult, SLAStatusRefreshResult
 from app.models import User, CaseStatus, Priority, SLAStatus, RoleEnum
-from app.services import CaseService
+from app.services import CaseService, AllocationOptimizer
 from app.auth import get_current_active_user, require_role
+from app.utils.case_import import detect_format, iter_case_rows
 
 router = APIRouter(prefix="/api/v1/cases", tags=["Cases"])
 
@@ -28,7 +30,58 @@ def create_case(
         )
 
 
-@router.get("/", response_model=List[CaseResponse])
+@router.post("/bulk", response_model=BulkImportResult)
+def bulk_import_cases(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Bulk import cases from a CSV or NDJSON upload.
+    
+    Rows are streamed through priority calculation, AI scoring, DCA allocation
+    and audit logging in chunks, each committed separately. The response
+    carries a summary per chunk, including row-level validation errors.
+    """
+    try:
+        file_format = file_format or detect_format(file.filename, file.content_type)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    started = time.perf_counter()
+    rows = iter_case_rows(file.file, file_format)
+    chunks = list(CaseService.bulk_create_cases(db, rows, current_user, chunk_size=chunk_size))
+    
+    return BulkImportResult(
+        total_received=sum(c.received for c in chunks),
+        total_created=sum(c.created for c in chunks),
+        total_failed=sum(c.failed for c in chunks),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        chunks=chunks
+    )
+
+
+@router.post("/allocate-backlog", response_model=BacklogAllocationResult)
+def allocate_backlog(
+    dry_run: bool = Query(False),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([RoleEnum.ADMIN]))
+):
+    """
+    Allocate all unassigned open cases in one global optimization pass (Admin only).
+    
+    Respects DCA capacity and debt ranges while maximising expected recovery
+    weighted by DCA performance. With dry_run the plan is only summarised.
+    """
+    return AllocationOptimizer.allocate_backlog(db, current_user, dry_run=dry_run)
+
+
+@router.get("/", response_model=List[CaseSummaryResponse])
 def list_cases(
     status: Optional[CaseStatus] = None,
     priority: Optional[Priority] = None,
@@ -52,6 +105,42 @@ def list_cases(
     return cases
 
 
+@router.get("/page", response_model=CasePage)
+def list_cases_page(
+    status_filter: Optional[CaseStatus] = Query(None, alias="status"),
+    priority: Optional[Priority] = None,
+    sla_status: Optional[SLAStatus] = None,
+    dca_id: Optional[int] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    List cases newest first, a page at a time.
+    
+    Pass the returned next_cursor back, with the same filters, to get the
+    following page; it is null on the last page. Pages stay stable while
+    cases are being created and cost the same however deep they are.
+    """
+    try:
+        items, next_cursor = CaseService.list_cases_page(
+            db=db,
+            status=status_filter,
+            priority=priority,
+            sla_status=sla_status,
+            dca_id=dca_id,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return CasePage(items=items, next_cursor=next_cursor)
+
+
 @router.get("/{case_id}", response_model=CaseResponse)
 def get_case(
     case_id: int,
@@ -116,11 +205,12 @@ def escalate_case(
         )
 
 
-@router.post("/update-sla-statuses", status_code=status.HTTP_200_OK)
+@router.post("/update-sla-statuses", response_model=SLAStatusRefreshResult, status_code=status.HTTP_200_OK)
 def update_sla_statuses(
+    set_based: bool = Query(False, description="Update statuses in SQL by primary key range instead of per case"),
+    chunk_size: int = Query(10000, ge=1, le=100000),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role([RoleEnum.ADMIN]))
 ):
     """Batch update SLA statuses for all cases (Admin only)."""
-    CaseService.update_sla_statuses(db)
-    return {"message": "SLA statuses updated successfully"}
+    return CaseService.update_sla_statuses(db, set_based=set_based, chunk_size=chunk_size)
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer_group
 from typing import List
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
 
 from ..database import get_db
-from ..models.models import Case, DCA, User
+from ..models.models import CASE_DETAIL_GROUP, Case, CaseStatus, DCA, User
+from ..services.case_service import CaseService
+from ..services.dashboard_counters import apply_counter_deltas, case_deltas
+from ..services.dca_capacity_index import get_dca_capacity_index
+from ..services.event_broker import case_event, get_event_broker
 
 router = APIRouter(prefix="/api/v1/customer", tags=["customer"])
 
@@ -51,7 +55,7 @@ async def get_customer_cases(email: str, db: Session = Depends(get_db)):
 @router.get("/dashboard/{case_id}")
 async def get_customer_dashboard(case_id: int, db: Session = Depends(get_db)):
     """Get detailed case information for customer dashboard"""
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = db.query(Case).options(undefer_group(CASE_DETAIL_GROUP)).filter(Case.id == case_id).first()
     
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -87,7 +91,7 @@ async def get_customer_dashboard(case_id: int, db: Session = Depends(get_db)):
 @router.post("/payment")
 async def submit_payment(payment: PaymentRequest, db: Session = Depends(get_db)):
     """Handle customer payment submission"""
-    case = db.query(Case).filter(Case.id == payment.case_id).first()
+    case = db.query(Case).options(undefer_group(CASE_DETAIL_GROUP)).filter(Case.id == payment.case_id).first()
     
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -97,11 +101,22 @@ async def submit_payment(payment: PaymentRequest, db: Session = Depends(get_db))
     case.notes = (case.notes or "") + payment_note
     
     # If full amount paid, update status
-    if payment.amount >= case.overdue_amount:
-        case.status = "CLOSED"
+    old_status = case.status
+    closed_dca = None
+    if payment.amount >= case.overdue_amount and old_status != CaseStatus.CLOSED:
+        case.status = CaseStatus.CLOSED
         case.notes += " - Full payment received, case closed."
+        closed_dca = CaseService.record_closure(db, case)
     
+    if case.status != old_status:
+        apply_counter_deltas(db, case_deltas([
+            ((old_status, case.sla_status, case.overdue_amount), (case.status, case.sla_status, case.overdue_amount))
+        ]))
     db.commit()
+    if closed_dca:
+        get_dca_capacity_index().refresh([closed_dca])
+    if case.status != old_status:
+        get_event_broker().publish([case_event("case.status_changed", case, status=old_status)])
     
     return {
         "success": True,
@@ -113,7 +128,7 @@ async def submit_payment(payment: PaymentRequest, db: Session = Depends(get_db))
 @router.post("/complaint")
 async def register_complaint(complaint: ComplaintRequest, db: Session = Depends(get_db)):
     """Register a customer complaint"""
-    case = db.query(Case).filter(Case.id == complaint.case_id).first()
+    case = db.query(Case).options(undefer_group(CASE_DETAIL_GROUP)).filter(Case.id == complaint.case_id).first()
     
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -134,7 +149,7 @@ async def register_complaint(complaint: ComplaintRequest, db: Session = Depends(
 @router.post("/update-request")
 async def submit_update_request(update: UpdateRequest, db: Session = Depends(get_db)):
     """Submit customer information update request"""
-    case = db.query(Case).filter(Case.id == update.case_id).first()
+    case = db.query(Case).options(undefer_group(CASE_DETAIL_GROUP)).filter(Case.id == update.case_id).first()
     
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
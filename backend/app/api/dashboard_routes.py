@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
+from datetime import date, datetime, timedelta, timezone
 
 from app.database import get_db
-from app.schemas import DashboardStats, AuditLogResponse
-from app.models import User, AuditLog
+from app.schemas import DashboardStats, DashboardTrends, AuditLogResponse
+from app.models import User, AuditLog, Priority
 from app.services import CaseService
+from app.services.dashboard_rollups import rollup_trends
 from app.auth import get_current_active_user
 
+MAX_TREND_DAYS = 366
+
 router = APIRouter(prefix="/api/v1", tags=["Dashboard"])
 
 
@@ -21,6 +25,34 @@ def get_dashboard_stats(
     return stats
 
 
+@router.get("/dashboard/trends", response_model=DashboardTrends)
+def get_dashboard_trends(
+    start: Optional[date] = Query(None, description="First day (UTC); defaults to 29 days before end"),
+    end: Optional[date] = Query(None, description="Last day (UTC); defaults to today"),
+    group_by: Optional[Literal["status", "priority", "sla_status", "dca_id"]] = Query(None),
+    dca_id: Optional[List[int]] = Query(None),
+    priority: Optional[List[Priority]] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get daily dashboard figures over a date range, from the daily rollups.
+    
+    Each point is the state at the end of that day (today: as of the last
+    rollup refresh), optionally split by one dimension with group_by.
+    Filters can be repeated (?priority=P1&priority=P2).
+    """
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= MAX_TREND_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_TREND_DAYS} days")
+    
+    points = rollup_trends(db, start, end, group_by=group_by, dca_ids=dca_id, priorities=priority)
+    return DashboardTrends(start=start, end=end, group_by=group_by, points=points)
+
+
 @router.get("/audit-logs", response_model=List[AuditLogResponse])
 def get_audit_logs(
     case_id: int = Query(None),
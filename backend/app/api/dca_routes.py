@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.database import get_db
-from app.schemas import DCACreate, DCAUpdate, DCAResponse
+from app.schemas import DCACreate, DCAUpdate, DCAResponse, DCAMetricsRecomputeResult
 from app.models import User, RoleEnum
 from app.services import DCAService
 from app.auth import get_current_active_user, require_role
@@ -41,6 +41,15 @@ def list_dcas(
     return dcas
 
 
+@router.post("/recompute-metrics", response_model=DCAMetricsRecomputeResult)
+def recompute_dca_metrics(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([RoleEnum.ADMIN]))
+):
+    """Recompute every DCA's score, average completion time and active case count (Admin only)."""
+    return DCAService.recompute_metrics(db)
+
+
 @router.get("/{dca_id}", response_model=DCAResponse)
 def get_dca(
     dca_id: int,
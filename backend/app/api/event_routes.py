@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import json
+
+from app.database import get_db
+from app.config import settings
+from app.models import User, Priority, SLAStatus
+from app.auth import get_current_active_user
+from app.services.event_broker import get_event_broker
+
+router = APIRouter(prefix="/api/v1/events", tags=["Events"])
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    dca_id: Optional[List[int]] = Query(None, description="Only cases assigned to (or moved away from) these DCAs"),
+    priority: Optional[List[Priority]] = Query(None),
+    sla_status: Optional[List[SLAStatus]] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Stream case events as Server-Sent Events.
+
+    Each event has the event type as its SSE event name and the JSON
+    payload as data. Filters can be repeated (?priority=P1&priority=P2).
+    An events.dropped event means this client fell behind and missed
+    that many events; refetch the affected views.
+    """
+    # The session is only needed for authentication; return its connection
+    # to the pool instead of holding it for the life of the stream
+    db.close()
+
+    broker = get_event_broker()
+    subscription = broker.subscribe(dca_ids=dca_id, priorities=priority, sla_statuses=sla_status)
+
+    async def event_stream():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                events = await subscription.next_batch(settings.EVENT_STREAM_HEARTBEAT_SECONDS)
+                if not events:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                for event in events:
+                    event_id = f"id: {event['id']}\n" if "id" in event else ""
+                    yield f"{event_id}event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
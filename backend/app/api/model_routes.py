@@ -0,0 +1,151 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.database import get_db
+from app.schemas import ModelVersionResponse, RescoringJobResponse
+from app.models import User, RoleEnum
+from app.services import RescoringService
+from app.auth import get_current_active_user, require_role
+from app.ai.predictor import RecoveryScorePredictor, get_model_registry, get_predictor, reload_predictor
+
+router = APIRouter(prefix="/api/v1/models", tags=["Models"])
+
+
+@router.get("/", response_model=List[ModelVersionResponse])
+def list_model_versions(
+    current_user: User = Depends(get_current_active_user)
+):
+    """List published recovery model versions."""
+    return get_model_registry().list_versions()
+
+
+@router.get("/active")
+def get_active_model(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get information about the model serving in this worker."""
+    return get_predictor().get_model_info()
+
+
+@router.post("/baseline", response_model=ModelVersionResponse, status_code=status.HTTP_201_CREATED)
+def publish_baseline_model(
+    activate: bool = Query(False),
+    current_user: User = Depends(require_role([RoleEnum.ADMIN]))
+):
+    """Train the baseline model and publish it as a new version (Admin only)."""
+    registry = get_model_registry()
+    
+    params, estimators = RecoveryScorePredictor(inference_mode="sklearn").export_artifact()
+    version = registry.publish(params, estimators, description="Baseline model trained on synthetic data")
+    
+    if activate:
+        registry.activate(version)
+        reload_predictor()
+    
+    return next(v for v in registry.list_versions() if v["version"] == version)
+
+
+@router.post("/{version}/activate")
+def activate_model_version(
+    version: str,
+    background_tasks: BackgroundTasks,
+    rescore: bool = Query(True),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([RoleEnum.ADMIN]))
+):
+    """
+    Activate a published model version (Admin only).
+    
+    This worker swaps immediately; other workers pick the change up on their
+    next reload check. Unless `rescore` is false, a background job then
+    recomputes the score of every open case with the new version.
+    """
+    registry = get_model_registry()
+    try:
+        registry.activate(version)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    
+    predictor = reload_predictor()
+    response = {"message": f"Model {version} activated", "model": predictor.get_model_info()}
+    
+    if rescore:
+        job = RescoringService.create_job(db, version)
+        background_tasks.add_task(RescoringService.run_job, job.id)
+        response["rescoring_job"] = RescoringService.to_response(job)
+    
+    return response
+
+
+@router.post("/rescoring", response_model=RescoringJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def start_rescoring_job(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([RoleEnum.ADMIN]))
+):
+    """Re-score all open cases with the active model version (Admin only)."""
+    version = get_predictor().version
+    if version is None:
+        # The in-memory fallback model is serving: there is no published version to score with
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No published model version is loaded; activate one before re-scoring"
+        )
+    
+    job = RescoringService.create_job(db, version)
+    background_tasks.add_task(RescoringService.run_job, job.id)
+    return RescoringService.to_response(job)
+
+
+@router.get("/rescoring", response_model=List[RescoringJobResponse])
+def list_rescoring_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """List recent re-scoring jobs with progress and throughput."""
+    return [RescoringService.to_response(job) for job in RescoringService.list_jobs(db, limit=limit)]
+
+
+@router.get("/rescoring/{job_id}", response_model=RescoringJobResponse)
+def get_rescoring_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get progress and throughput of a re-scoring job."""
+    job = RescoringService.get_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Re-scoring job {job_id} not found"
+        )
+    return RescoringService.to_response(job)
+
+
+@router.post("/rescoring/{job_id}/resume", response_model=RescoringJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def resume_rescoring_job(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([RoleEnum.ADMIN]))
+):
+    """Resume an interrupted or failed re-scoring job from its last checkpoint (Admin only)."""
+    job = RescoringService.get_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Re-scoring job {job_id} not found"
+        )
+    if job.status == "completed":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Re-scoring job {job_id} is already completed"
+        )
+    
+    background_tasks.add_task(RescoringService.run_job, job.id)
+    return RescoringService.to_response(job)
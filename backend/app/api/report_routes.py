@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer_group
 
 from app.database import get_db
 from app.models import Case, User
+from app.models.models import CASE_DETAIL_GROUP
 from app.auth import get_current_user
-from app.utils.pdf_generator import generate_case_report_pdf, generate_all_cases_report_pdf
 
 router = APIRouter(prefix="/api/v1/reports", tags=["Reports"])
 
@@ -17,7 +17,10 @@ def download_case_pdf(
     current_user: User = Depends(get_current_user)
 ):
     """Generate and download PDF report for a specific case."""
-    case = db.query(Case).filter(Case.id == case_id).first()
+    # reportlab is heavy; load it on first use rather than at app startup
+    from app.utils.pdf_generator import generate_case_report_pdf
+    
+    case = db.query(Case).options(undefer_group(CASE_DETAIL_GROUP)).filter(Case.id == case_id).first()
     
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -41,6 +44,8 @@ def download_all_cases_pdf(
     current_user: User = Depends(get_current_user)
 ):
     """Generate and download PDF report for all cases."""
+    from app.utils.pdf_generator import generate_all_cases_report_pdf
+    
     # Generate PDF
     pdf_buffer = generate_all_cases_report_pdf(db)
     
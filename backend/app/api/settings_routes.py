@@ -4,11 +4,29 @@ from typing import Optional
 from pydantic import BaseModel
 
 from app.database import get_db
-from app.models import Settings, User, RoleEnum
+from app.models import Settings, User, RoleEnum, Priority
 from app.auth import get_current_user
+from app.services import CaseService, DCAService
+from app.utils.settings_cache import PlatformSettings, default_settings, get_platform_settings, get_settings_cache
 
 router = APIRouter(prefix="/api/v1/settings", tags=["Settings"])
 
+# Settings whose change reschedules open cases of a priority
+SLA_DAYS_FIELDS = {
+    Priority.P1: "p1_sla_days",
+    Priority.P2: "p2_sla_days",
+    Priority.P3: "p3_sla_days",
+}
+
+# Settings whose change requires recomputing DCA performance scores
+PERFORMANCE_FIELDS = {
+    "delay_penalty_percent",
+    "breach_penalty_percent",
+    "processing_threshold_days",
+    "processing_penalty_per_day",
+    "rejection_penalty_percent",
+}
+
 
 class SettingsUpdate(BaseModel):
     # SLA Parameters
@@ -41,45 +59,10 @@ class SettingsUpdate(BaseModel):
 
 @router.get("")
 def get_settings(
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get current platform settings."""
-    settings = db.query(Settings).first()
-    
-    # Create default settings if none exist
-    if not settings:
-        settings = Settings()
-        db.add(settings)
-        db.commit()
-        db.refresh(settings)
-    
-    return {
-        "id": settings.id,
-        # SLA Parameters
-        "p1_sla_days": settings.p1_sla_days,
-        "p2_sla_days": settings.p2_sla_days,
-        "p3_sla_days": settings.p3_sla_days,
-        # Performance Parameters
-        "delay_penalty_percent": settings.delay_penalty_percent,
-        "breach_penalty_percent": settings.breach_penalty_percent,
-        "processing_threshold_days": settings.processing_threshold_days,
-        "processing_penalty_per_day": settings.processing_penalty_per_day,
-        "rejection_penalty_percent": settings.rejection_penalty_percent,
-        # Theme
-        "theme_primary_color": settings.theme_primary_color,
-        "theme_secondary_color": settings.theme_secondary_color,
-        "theme_mode": settings.theme_mode,
-        # Time
-        "timezone": settings.timezone,
-        "date_format": settings.date_format,
-        "time_format": settings.time_format,
-        # Features
-        "ai_assignment_enabled": settings.ai_assignment_enabled,
-        "email_notifications_enabled": settings.email_notifications_enabled,
-        "sms_notifications_enabled": settings.sms_notifications_enabled,
-        "updated_at": settings.updated_at
-    }
+    """Get current platform settings (served from the settings cache)."""
+    return _settings_response(get_platform_settings())
 
 
 @router.put("")
@@ -97,18 +80,24 @@ def update_settings(
     
     # Create default settings if none exist
     if not settings:
-        settings = Settings()
+        settings = Settings(**default_settings())
         db.add(settings)
     
     # Update fields that are provided
     update_data = update.dict(exclude_unset=True)
+    changed = {field for field, value in update_data.items() if getattr(settings, field) != value}
     for field, value in update_data.items():
         setattr(settings, field, value)
     
+    settings.version = (settings.version or 0) + 1
     db.commit()
-    db.refresh(settings)
+    get_settings_cache().invalidate()
     
-    return {"message": "Settings updated successfully", "settings": get_settings(db, current_user)}
+    return {
+        "message": "Settings updated successfully",
+        **_apply_changed_settings(db, changed),
+        "settings": _settings_response(get_platform_settings())
+    }
 
 
 @router.post("/reset")
@@ -120,16 +109,72 @@ def reset_settings(
     if current_user.role != RoleEnum.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access required")
     
+    defaults = default_settings()
     settings = db.query(Settings).first()
+    changed = set()
+    version = 0
     
     if settings:
+        changed = {field for field, value in defaults.items() if getattr(settings, field) != value}
+        version = settings.version or 0
         db.delete(settings)
-        db.commit()
+        db.flush()
     
-    # Create new default settings
-    settings = Settings()
+    # Create new default settings, keeping the version increasing
+    settings = Settings(**{**defaults, "version": version + 1})
     db.add(settings)
     db.commit()
-    db.refresh(settings)
+    get_settings_cache().invalidate()
     
-    return {"message": "Settings reset to defaults", "settings": get_settings(db, current_user)}
+    return {
+        "message": "Settings reset to defaults",
+        **_apply_changed_settings(db, changed),
+        "settings": _settings_response(get_platform_settings())
+    }
+
+
+def _apply_changed_settings(db: Session, changed: set) -> dict:
+    """Bring open cases and DCA scores in line with the settings that changed."""
+    params = get_platform_settings()
+    
+    sla_days = {
+        priority: params.sla_days(priority)
+        for priority, field in SLA_DAYS_FIELDS.items() if field in changed
+    }
+    rescheduled = CaseService.reschedule_sla_due_dates(db, sla_days)
+    
+    recomputed = 0
+    if changed & PERFORMANCE_FIELDS:
+        recomputed = DCAService.recompute_metrics(db).dca_count
+    
+    return {"sla_cases_rescheduled": rescheduled, "dca_scores_recomputed": recomputed}
+
+
+def _settings_response(settings: PlatformSettings) -> dict:
+    return {
+        "id": settings.id,
+        "version": settings.version,
+        # SLA Parameters
+        "p1_sla_days": settings.p1_sla_days,
+        "p2_sla_days": settings.p2_sla_days,
+        "p3_sla_days": settings.p3_sla_days,
+        # Performance Parameters
+        "delay_penalty_percent": settings.delay_penalty_percent,
+        "breach_penalty_percent": settings.breach_penalty_percent,
+        "processing_threshold_days": settings.processing_threshold_days,
+        "processing_penalty_per_day": settings.processing_penalty_per_day,
+        "rejection_penalty_percent": settings.rejection_penalty_percent,
+        # Theme
+        "theme_primary_color": settings.theme_primary_color,
+        "theme_secondary_color": settings.theme_secondary_color,
+        "theme_mode": settings.theme_mode,
+        # Time
+        "timezone": settings.timezone,
+        "date_format": settings.date_format,
+        "time_format": settings.time_format,
+        # Features
+        "ai_assignment_enabled": settings.ai_assignment_enabled,
+        "email_notifications_enabled": settings.email_notifications_enabled,
+        "sms_notifications_enabled": settings.sms_notifications_enabled,
+        "updated_at": settings.updated_at
+    }
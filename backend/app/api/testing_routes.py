@@ -1,12 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, undefer_group
 from typing import List
 from datetime import datetime, timezone
 
 from app.database import get_db
-from app.models import Case, DCA, CaseStatus, User
+from app.models import Case, DCA, DCAPerformanceStats, DashboardDailyRollup, CaseStatus, User
+from app.models.models import CASE_DETAIL_GROUP
 from app.auth import get_current_user
 from app.utils.performance import calculate_dca_performance_score, update_active_case_count
+from app.services import CaseService
+from app.services.dca_capacity_index import get_dca_capacity_index
+from app.services.event_broker import case_event, get_event_broker
+from app.services.dashboard_counters import apply_counter_deltas, case_deltas, reconcile_dashboard_counters
+from app.services.dashboard_rollups import get_dashboard_rollup_job
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/v1/testing", tags=["Testing"])
@@ -24,7 +30,7 @@ def get_all_cases_for_testing(
     current_user: User = Depends(get_current_user)
 ):
     """Get all cases with DCA information for testing."""
-    cases = db.query(Case).all()
+    cases = db.query(Case).options(joinedload(Case.dca).load_only(DCA.name)).all()
     
     result = []
     for case in cases:
@@ -52,7 +58,7 @@ def update_case_status_testing(
     current_user: User = Depends(get_current_user)
 ):
     """Update case status from DCA testing interface."""
-    case = db.query(Case).options(joinedload(Case.dca)).filter(Case.id == update.case_id).first()
+    case = db.query(Case).options(joinedload(Case.dca), undefer_group(CASE_DETAIL_GROUP)).filter(Case.id == update.case_id).first()
     
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -62,24 +68,22 @@ def update_case_status_testing(
     case.confirmation_received = update.confirmation_received
     
     # Update completion metrics
-    if update.status == CaseStatus.CLOSED and not case.completed_at:
-        case.completed_at = datetime.now(timezone.utc)
-        
-        # Update DCA performance metrics only if case is assigned to a DCA
-        if case.dca_id and case.dca and case.assigned_at:
-            dca = case.dca
-            dca.total_cases_completed += 1
-            
-            # Recalculate performance score using new logic
-            score = calculate_dca_performance_score(dca, db)
-            dca.performance_score = str(score) if isinstance(score, (int, float)) else score
-            
-            # Update active case count (remove completed from active)
-            update_active_case_count(dca, db)
+    if update.status == CaseStatus.CLOSED:
+        CaseService.record_closure(db, case)
     
+    apply_counter_deltas(db, case_deltas([
+        ((old_status, case.sla_status, case.overdue_amount), (case.status, case.sla_status, case.overdue_amount))
+    ]))
     db.commit()
     db.refresh(case)
     
+    # Score and load changed - keep the allocation index in step
+    if case.dca:
+        get_dca_capacity_index().refresh([case.dca])
+    
+    if case.status != old_status:
+        get_event_broker().publish([case_event("case.status_changed", case, status=old_status)])
+    
     return {
         "message": "Status updated successfully",
         "case_id": case.case_id,
@@ -100,6 +104,7 @@ def get_all_dcas_for_testing(db: Session = Depends(get_db)):
             "id": dca.id,
             "name": dca.name,
             "performance_score": dca.performance_score,
+            "performance_rated": dca.performance_rated,
             "active_cases": dca.active_cases_count,
             "total_completed": dca.total_cases_completed,
             "total_rejected": dca.total_cases_rejected,
@@ -119,7 +124,7 @@ def simulate_case_rejection(
     current_user: User = Depends(get_current_user)
 ):
     """Simulate a DCA rejecting a case and auto-reassign to another DCA."""
-    case = db.query(Case).options(joinedload(Case.dca)).filter(Case.id == case_id).first()
+    case = db.query(Case).options(joinedload(Case.dca), undefer_group(CASE_DETAIL_GROUP)).filter(Case.id == case_id).first()
     
     if not case or not case.dca:
         raise HTTPException(status_code=404, detail="Case or DCA not found")
@@ -129,7 +134,7 @@ def simulate_case_rejection(
     
     # Recalculate performance score after rejection
     score = calculate_dca_performance_score(old_dca, db)
-    old_dca.performance_score = str(score) if isinstance(score, (int, float)) else score
+    old_dca.performance_score = score
     
     # Update active case count
     update_active_case_count(old_dca, db)
@@ -137,33 +142,22 @@ def simulate_case_rejection(
     # Add rejection note
     case.notes = (case.notes or "") + f"\n[{datetime.now(timezone.utc)}] Case rejected by {old_dca.name}"
     
-    # Auto-reassign to another DCA
-    all_dcas = db.query(DCA).filter(
-        DCA.id != old_dca.id,
-        DCA.is_active == True,
-        DCA.active_cases_count < DCA.max_capacity
-    ).all()
-    
-    if all_dcas:
-        # Find suitable DCA based on debt range
-        suitable_dcas = [
-            dca for dca in all_dcas
-            if dca.min_debt_amount <= case.overdue_amount <= dca.max_debt_amount
-        ]
-        
-        if suitable_dcas:
-            new_dca = suitable_dcas[0]  # Pick first suitable DCA
-        else:
-            new_dca = all_dcas[0]  # Pick any available DCA
+    # Auto-reassign to another DCA, preferring one whose debt range covers the amount
+    index = get_dca_capacity_index()
+    allocation = index.allocate(db, case.priority, case.overdue_amount, exclude=[old_dca.id])
+    
+    if allocation:
+        new_dca = db.get(DCA, allocation[0])
         
         case.dca_id = new_dca.id
         case.assigned_at = datetime.now(timezone.utc)
         case.allocation_reason = f"Auto-reassigned after rejection by {old_dca.name}"
-        new_dca.active_cases_count += 1
         
         case.notes += f"\n[{datetime.now(timezone.utc)}] Auto-reassigned to {new_dca.name}"
         
         db.commit()
+        index.refresh([old_dca, new_dca])
+        get_event_broker().publish([case_event("case.assigned", case, dca_id=old_dca.id)])
         return {
             "message": f"Case rejected by {old_dca.name} and reassigned to {new_dca.name}",
             "case_id": case.case_id,
@@ -174,6 +168,8 @@ def simulate_case_rejection(
         case.dca_id = None
         case.notes += f"\n[{datetime.now(timezone.utc)}] No available DCA for reassignment"
         db.commit()
+        index.refresh([old_dca])
+        get_event_broker().publish([case_event("case.assigned", case, dca_id=old_dca.id)])
         return {
             "message": f"Case rejected by {old_dca.name}. No available DCA for reassignment.",
             "case_id": case.case_id
@@ -187,7 +183,7 @@ def simulate_case_delay(
     current_user: User = Depends(get_current_user)
 ):
     """Simulate a delay in case processing."""
-    case = db.query(Case).options(joinedload(Case.dca)).filter(Case.id == case_id).first()
+    case = db.query(Case).options(joinedload(Case.dca), undefer_group(CASE_DETAIL_GROUP)).filter(Case.id == case_id).first()
     
     if not case or not case.dca:
         raise HTTPException(status_code=404, detail="Case or DCA not found")
@@ -197,11 +193,12 @@ def simulate_case_delay(
     
     # Recalculate performance score after delay
     score = calculate_dca_performance_score(dca, db)
-    dca.performance_score = str(score) if isinstance(score, (int, float)) else score
+    dca.performance_score = score
     
     case.notes = (case.notes or "") + f"\n[{datetime.now(timezone.utc)}] Delay reported by {dca.name}"
     
     db.commit()
+    get_dca_capacity_index().refresh([dca])
     
     return {"message": f"Delay recorded for {dca.name}", "case_id": case.case_id}
 
@@ -218,11 +215,16 @@ def reset_dummy_data(
         
         # Clear existing data
         db.query(Case).delete()
+        db.query(DCAPerformanceStats).delete()
         db.query(DCA).delete()
+        db.query(DashboardDailyRollup).delete()
         db.commit()
         
         # Reinitialize dummy data
         init_comprehensive_dummy_data()
+        get_dca_capacity_index().invalidate()
+        reconcile_dashboard_counters(db)
+        get_dashboard_rollup_job().run_once()
         
         return {"message": "All dummy data has been reset successfully"}
     except Exception as e:
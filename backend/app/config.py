@@ -20,7 +20,37 @@ class Settings(BaseSettings):
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:4567,http://localhost:8000"
     
     # AI/ML
-    AI_MODEL_PATH: str = "app/ai/models/recovery_model.pkl"
+    AI_MODEL_PATH: str = "app/ai/models/recovery_model.pkl"  # Legacy single-file model, imported into the registry
+    AI_MODEL_REGISTRY_PATH: str = "app/ai/models/registry"
+    AI_MODEL_RELOAD_INTERVAL_SECONDS: float = 10.0  # How often workers check for a newly activated version
+    AI_INFERENCE_MODE: str = "fast"  # "fast" (closed-form) or "sklearn"
+    AI_SCORE_CACHE_SIZE: int = 10000  # Max memoized (amount, ageing) scores per worker, 0 disables
+    AI_SCORE_CACHE_AMOUNT_DECIMALS: int = 2  # Amount rounding for cache keys (2 = cents, -2 = hundreds)
+    
+    # Allocation
+    DCA_INDEX_TTL_SECONDS: float = 60.0  # Rebuild the in-memory DCA capacity index at least this often
+    
+    # Platform settings
+    PLATFORM_SETTINGS_TTL_SECONDS: float = 30.0  # Reload the cached settings row at least this often
+    
+    # SLA scheduler
+    SLA_SCHEDULER_ENABLED: bool = True  # Move cases to At Risk / Breached as their SLA boundaries pass
+    SLA_SCHEDULER_WINDOW_SECONDS: float = 900.0  # Upcoming SLA boundaries held in memory per index scan
+    SLA_SCHEDULER_LEADER_RETRY_SECONDS: float = 30.0  # How often standby workers try to take over
+    
+    # Event stream
+    EVENT_STREAM_BUFFER_SIZE: int = 1000  # Events buffered per client before the oldest are dropped
+    EVENT_STREAM_HEARTBEAT_SECONDS: float = 15.0  # Keep-alive comment interval on idle streams
+    
+    # Dashboard
+    DASHBOARD_COUNTERS_RECONCILE_SECONDS: float = 300.0  # How often one worker reconciles the dashboard counters with the tables
+    DASHBOARD_ROLLUP_ENABLED: bool = True  # Keep daily rollups of the case figures for trend charts
+    DASHBOARD_ROLLUP_INTERVAL_SECONDS: float = 3600.0  # How often today's rollup rows are refreshed
+    
+    # Startup
+    # Load the scoring model and PDF stack in a background thread once the
+    # app is up, instead of on the first request that needs them
+    WARM_UP_ON_STARTUP: bool = True
     
     def get_cors_origins(self) -> List[str]:
         """Parse CORS origins from comma-separated string"""
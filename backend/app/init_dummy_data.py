@@ -8,6 +8,7 @@ import random
 from app.database import SessionLocal
 from app.models import User, DCA, Case, RoleEnum, CaseStatus, Priority, SLAStatus
 from app.auth import get_password_hash
+from app.utils.debt_ranges import DebtRangeIndex
 
 
 def init_comprehensive_dummy_data():
@@ -36,7 +37,7 @@ def init_comprehensive_dummy_data():
         dca_configs = [
             {
                 "name": "Swift Debt Solutions",
-                "performance_score": "TBD",
+                "performance_score": None,
                 "min_debt": 50000,
                 "max_debt": 500000,
                 "website": "https://swiftdebt.com",
@@ -47,7 +48,7 @@ def init_comprehensive_dummy_data():
             },
             {
                 "name": "Premium Recovery Services",
-                "performance_score": "TBD",
+                "performance_score": None,
                 "min_debt": 10000,
                 "max_debt": 200000,
                 "website": "https://premiumrecovery.com",
@@ -58,7 +59,7 @@ def init_comprehensive_dummy_data():
             },
             {
                 "name": "Global Collections Inc",
-                "performance_score": "TBD",
+                "performance_score": None,
                 "min_debt": 5000,
                 "max_debt": 1000000,
                 "website": "https://globalcollections.com",
@@ -88,7 +89,7 @@ def init_comprehensive_dummy_data():
                 contact_person="Jennifer Davis",
                 email="jennifer@eliterecovery.com",
                 phone="+1-555-0104",
-                performance_score="TBD",
+                performance_score=None,
                 max_capacity=120,
                 min_debt_amount=20000,
                 max_debt_amount=300000,
@@ -100,7 +101,7 @@ def init_comprehensive_dummy_data():
                 contact_person="Robert Wilson",
                 email="robert@nationaldebt.com",
                 phone="+1-555-0105",
-                performance_score="TBD",
+                performance_score=None,
                 max_capacity=200,
                 min_debt_amount=1000,
                 max_debt_amount=100000,
@@ -112,7 +113,7 @@ def init_comprehensive_dummy_data():
                 contact_person="Lisa Anderson",
                 email="lisa@metrocollections.com",
                 phone="+1-555-0106",
-                performance_score="TBD",
+                performance_score=None,
                 max_capacity=90,
                 min_debt_amount=15000,
                 max_debt_amount=250000,
@@ -298,12 +299,13 @@ def init_comprehensive_dummy_data():
         new_dca_names = ["Elite Recovery Partners", "National Debt Specialists", "Metro Collections Agency"]
         unassigned_cases = []
         
+        debt_ranges = DebtRangeIndex((dca, dca.min_debt_amount, dca.max_debt_amount) for dca in dcas)
+        
         for case in cases_created:  # Assign ALL cases
             # Find suitable DCA based on debt range and prefer new ones
             suitable_dcas = [
-                dca for dca in dcas 
-                if dca.min_debt_amount <= case.overdue_amount <= dca.max_debt_amount
-                and dca.active_cases_count < dca.max_capacity
+                dca for dca in debt_ranges.eligible(case.overdue_amount)
+                if dca.active_cases_count < dca.max_capacity
             ]
             
             if suitable_dcas:
@@ -1,11 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import threading
+import time
 
 from app.database import engine, Base
 from app.config import settings
-from app.api import auth_routes, case_routes, dca_routes, dashboard_routes, testing_routes, customer_routes, settings_routes, report_routes
+from app.api import auth_routes, case_routes, dca_routes, dashboard_routes, testing_routes, customer_routes, settings_routes, report_routes, model_routes, event_routes
 from app.services import CaseService
+from app.services.case_id_generator import sync_case_number_sequence
+from app.services.sla_scheduler import get_sla_scheduler
+from app.services.dashboard_counters import get_dashboard_counters_job, reconcile_dashboard_counters
+from app.services.dashboard_rollups import get_dashboard_rollup_job
+from app.migrations import run_migrations
 from app.database import SessionLocal
 
 
@@ -13,6 +20,8 @@ from app.database import SessionLocal
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    sync_case_number_sequence(engine)
 
 
 # Initialize sample data
@@ -94,6 +103,26 @@ def init_sample_data():
         db.close()
 
 
+# Warm-up of lazily imported heavy dependencies
+def warm_up():
+    """
+    Load the scientific and PDF stacks ahead of the first request.
+    
+    numpy/scikit-learn (scoring) and reportlab (PDF reports) are imported
+    lazily so the app starts serving quickly; this pulls them in explicitly.
+    """
+    started = time.perf_counter()
+    try:
+        from app.ai import get_predictor
+        get_predictor()
+        
+        import app.utils.pdf_generator  # noqa: F401
+        
+        print(f"✓ Warm-up completed in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        print(f"Note: Warm-up failed, dependencies will load on first use: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
@@ -109,12 +138,35 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"Note: Could not initialize dummy data: {e}")
     
+    # Seeding bypasses the dashboard counters; start them from the seeded tables
+    db = SessionLocal()
+    try:
+        reconcile_dashboard_counters(db)
+    finally:
+        db.close()
+    
     print("✓ Database initialized")
     
+    if settings.WARM_UP_ON_STARTUP:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    
+    if settings.SLA_SCHEDULER_ENABLED:
+        get_sla_scheduler().start()
+    
+    get_dashboard_counters_job().start()
+    
+    if settings.DASHBOARD_ROLLUP_ENABLED:
+        get_dashboard_rollup_job().start()
+    
     yield
     
     # Shutdown
     print("Shutting down...")
+    if settings.SLA_SCHEDULER_ENABLED:
+        get_sla_scheduler().stop()
+    get_dashboard_counters_job().stop()
+    if settings.DASHBOARD_ROLLUP_ENABLED:
+        get_dashboard_rollup_job().stop()
 
 
 # Create FastAPI app
@@ -143,6 +195,8 @@ app.include_router(testing_routes.router)
 app.include_router(customer_routes.router)
 app.include_router(settings_routes.router)
 app.include_router(report_routes.router)
+app.include_router(model_routes.router)
+app.include_router(event_routes.router)
 
 
 @app.get("/")
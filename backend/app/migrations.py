@@ -0,0 +1,96 @@
+"""
+Schema Migrations
+Idempotent schema upgrades for existing databases.
+
+Base.metadata.create_all() only creates tables that do not exist yet, so
+columns added to existing tables are applied here on startup. Every step
+checks the live schema first and is safe to run repeatedly.
+"""
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import sqltypes
+
+from app.database import Base
+from app.models import Case, CaseStatus, DCAPerformanceStats, Settings
+from app.utils.performance import rebuild_performance_stats
+from app.utils.settings_cache import default_settings
+
+# (table, column, column DDL) added after the initial schema
+ADDED_COLUMNS = [
+    ("cases", "ai_model_version", "VARCHAR"),
+    ("dcas", "performance_rated", "BOOLEAN NOT NULL DEFAULT FALSE"),
+    ("settings", "version", "INTEGER NOT NULL DEFAULT 1"),
+]
+
+
+def run_migrations(engine: Engine):
+    """Apply pending schema upgrades."""
+    inspector = inspect(engine)
+    
+    with engine.begin() as conn:
+        for table, column, ddl in ADDED_COLUMNS:
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                print(f"[Migrations] Added column {table}.{column}")
+        
+        _migrate_numeric_performance_score(conn, inspector)
+        _create_missing_indexes(conn)
+        _backfill_performance_stats(conn)
+
+
+def _migrate_numeric_performance_score(conn: Connection, inspector):
+    """
+    Convert dcas.performance_score from text ("TBD", "85.5") to a float.
+    
+    Neither SQLite nor a plain ALTER can cast in place portably, so the
+    values are parsed into a new column which then replaces the old one.
+    Unparseable values ("TBD") become NULL with performance_rated false.
+    """
+    column = next(c for c in inspector.get_columns("dcas") if c["name"] == "performance_score")
+    if not isinstance(column["type"], sqltypes.String):
+        return
+    
+    scores = []
+    for dca_id, raw in conn.execute(text("SELECT id, performance_score FROM dcas")).all():
+        try:
+            scores.append({"id": dca_id, "score": float(raw), "rated": True})
+        except (TypeError, ValueError):
+            scores.append({"id": dca_id, "score": None, "rated": False})
+    
+    conn.execute(text("ALTER TABLE dcas ADD COLUMN performance_score_numeric FLOAT"))
+    if scores:
+        conn.execute(
+            text("UPDATE dcas SET performance_score_numeric = :score, performance_rated = :rated WHERE id = :id"),
+            scores
+        )
+    conn.execute(text("ALTER TABLE dcas DROP COLUMN performance_score"))
+    conn.execute(text("ALTER TABLE dcas RENAME COLUMN performance_score_numeric TO performance_score"))
+    print(f"[Migrations] Converted dcas.performance_score to numeric ({sum(s['rated'] for s in scores)} rated)")
+
+
+def _create_missing_indexes(conn: Connection):
+    """Create indexes declared on the models that an older schema lacks."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in {i["name"] for i in inspect(conn).get_indexes(table.name)}:
+                index.create(conn)
+                print(f"[Migrations] Created index {index.name}")
+
+
+def _backfill_performance_stats(conn: Connection):
+    """Fill dca_performance_stats from existing closed cases when the table is new."""
+    if conn.execute(select(DCAPerformanceStats.dca_id).limit(1)).first():
+        return
+    closed = select(Case.id).where(Case.status == CaseStatus.CLOSED, Case.dca_id.isnot(None)).limit(1)
+    if not conn.execute(closed).first():
+        return
+    
+    # Read the threshold on this connection: the settings cache would open a
+    # second one, which SQLite blocks while this transaction is writing
+    slow_after_days = conn.execute(select(Settings.processing_threshold_days).limit(1)).scalar()
+    if slow_after_days is None:
+        slow_after_days = default_settings()["processing_threshold_days"]
+    
+    stats = rebuild_performance_stats(conn, slow_after_days=slow_after_days)
+    print(f"[Migrations] Built performance aggregates for {len(stats)} DCAs")
@@ -1,12 +1,17 @@
-from app.models.models import User, DCA, Case, AuditLog
+from app.models.models import User, DCA, DCAPerformanceStats, Case, AuditLog, CaseNumberBlock, RescoringJob, DashboardCounters, DashboardDailyRollup
 from app.models.models import RoleEnum, CaseStatus, Priority, SLAStatus
 from app.models.settings import Settings
 
 __all__ = [
     "User",
     "DCA",
+    "DCAPerformanceStats",
     "Case",
     "AuditLog",
+    "CaseNumberBlock",
+    "RescoringJob",
+    "DashboardCounters",
+    "DashboardDailyRollup",
     "RoleEnum",
     "CaseStatus",
     "Priority",
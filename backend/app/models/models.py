@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, ForeignKey, Text, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Enum, ForeignKey, Text, Boolean, Sequence, Index, and_
+from sqlalchemy.orm import deferred, relationship, validates
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -52,7 +52,8 @@ class DCA(Base):
     contact_person = Column(String)
     email = Column(String)
     phone = Column(String)
-    performance_score = Column(String, default="TBD")  # TBD or 0-100
+    performance_score = Column(Float, nullable=True)  # 0-120, NULL until the first case is completed
+    performance_rated = Column(Boolean, nullable=False, default=False)
     active_cases_count = Column(Integer, default=0)
     max_capacity = Column(Integer, default=100)
     is_active = Column(Boolean, default=True)
@@ -76,6 +77,62 @@ class DCA(Base):
     
     # Relationships
     cases = relationship("Case", back_populates="dca")
+    
+    __table_args__ = (
+        # Ranking used by DCA listings: rated first, best score, least loaded
+        Index(
+            "ix_dcas_ranking",
+            performance_rated.desc(),
+            performance_score.desc(),
+            active_cases_count
+        ),
+    )
+    
+    @validates("performance_score")
+    def _sync_performance_rated(self, key, value):
+        """Keep the rated flag in step with the score."""
+        self.performance_rated = value is not None
+        return value
+
+
+class DCAPerformanceStats(Base):
+    """Running aggregates over a DCA's closed cases, updated once per completion."""
+    __tablename__ = "dca_performance_stats"
+    
+    dca_id = Column(Integer, ForeignKey("dcas.id", ondelete="CASCADE"), primary_key=True)
+    completed_count = Column(Integer, nullable=False, default=0)
+    quick_count = Column(Integer, nullable=False, default=0)  # Completed within 5 days of assignment
+    slow_count = Column(Integer, nullable=False, default=0)  # Completed after more than 10 days
+    slow_overage_days = Column(Integer, nullable=False, default=0)  # Sum of days beyond 10
+    completion_days_total = Column(Integer, nullable=False, default=0)
+    at_risk_count = Column(Integer, nullable=False, default=0)  # SLA at risk when closed
+    breached_count = Column(Integer, nullable=False, default=0)  # SLA breached when closed
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# Case numbers are handed out in blocks: every nextval() reserves
+# CASE_NUMBER_BLOCK_SIZE consecutive numbers for the calling worker.
+CASE_NUMBER_BLOCK_SIZE = 100
+
+case_number_seq = Sequence(
+    "case_number_seq",
+    start=1,
+    increment=CASE_NUMBER_BLOCK_SIZE,
+    metadata=Base.metadata
+)
+
+
+class CaseNumberBlock(Base):
+    """Block allocation counter standing in for case_number_seq on databases without sequences (SQLite)."""
+    __tablename__ = "case_number_blocks"
+    
+    name = Column(String, primary_key=True)
+    next_value = Column(Integer, nullable=False)
+
+
+# Deferred group of the unbounded text columns of Case. Listings leave them
+# out; detail views load them with options(undefer_group(CASE_DETAIL_GROUP)).
+CASE_DETAIL_GROUP = "detail"
 
 
 class Case(Base):
@@ -84,43 +141,64 @@ class Case(Base):
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(String, unique=True, index=True, nullable=False)
     customer_name = Column(String, nullable=False)
-    customer_email = Column(String)
+    customer_email = Column(String, index=True)  # Customer portal lookup
     customer_phone = Column(String)
     overdue_amount = Column(Float, nullable=False)
     ageing_days = Column(Integer, nullable=False)
     status = Column(Enum(CaseStatus), default=CaseStatus.OPEN)
     priority = Column(Enum(Priority), default=Priority.P3)
-    sla_due_date = Column(DateTime(timezone=True))
+    sla_due_date = Column(DateTime(timezone=True), index=True)  # Range scans by the SLA scheduler
     sla_status = Column(Enum(SLAStatus), default=SLAStatus.ON_TRACK)
     
     # Customer additional data
-    customer_address = Column(Text, nullable=True)
+    customer_address = deferred(Column(Text, nullable=True), group=CASE_DETAIL_GROUP)
     customer_social_media_instagram = Column(String, nullable=True)
     customer_social_media_facebook = Column(String, nullable=True)
     customer_social_media_linkedin = Column(String, nullable=True)
     customer_website_url = Column(String, nullable=True)
     customer_document_url = Column(String, nullable=True)
-    scraped_customer_data = Column(Text, nullable=True)  # JSON data
-    family_info = Column(Text, nullable=True)
+    scraped_customer_data = deferred(Column(Text, nullable=True), group=CASE_DETAIL_GROUP)  # JSON data
+    family_info = deferred(Column(Text, nullable=True), group=CASE_DETAIL_GROUP)
     
     # AI/ML fields
     ai_recovery_score = Column(Float, default=0.0)  # 0-1
+    ai_model_version = Column(String, nullable=True)  # Registry version that produced the score
     
     # DCA assignment
     dca_id = Column(Integer, ForeignKey("dcas.id"), nullable=True)
-    allocation_reason = Column(Text)
+    allocation_reason = deferred(Column(Text), group=CASE_DETAIL_GROUP)
     assigned_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     confirmation_received = Column(Boolean, default=False)
     
     # Metadata
-    notes = Column(Text)
+    notes = deferred(Column(Text), group=CASE_DETAIL_GROUP)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     dca = relationship("DCA", back_populates="cases")
     audit_logs = relationship("AuditLog", back_populates="case")
+    
+    __table_args__ = (
+        # Newest-first listing and its keyset cursor
+        Index("ix_cases_created_at_id", created_at, id),
+        # The same listing filtered by one column, still read in order;
+        # further filters are checked against the index rows
+        Index("ix_cases_status_created_at", status, created_at, id),
+        Index("ix_cases_priority_created_at", priority, created_at, id),
+        Index("ix_cases_sla_status_created_at", sla_status, created_at, id),
+        Index("ix_cases_dca_created_at", dca_id, created_at, id),
+        # DCA worklists by status, and active case counts (covered)
+        Index("ix_cases_dca_status_created_at", dca_id, status, created_at, id),
+        # Unassigned open backlog, read by allocation in id order
+        Index(
+            "ix_cases_unassigned_open",
+            id,
+            postgresql_where=and_(dca_id.is_(None), status.in_([CaseStatus.OPEN, CaseStatus.IN_PROGRESS])),
+            sqlite_where=and_(dca_id.is_(None), status.in_([CaseStatus.OPEN, CaseStatus.IN_PROGRESS]))
+        ),
+    )
 
 
 class AuditLog(Base):
@@ -138,3 +216,62 @@ class AuditLog(Base):
     # Relationships
     user = relationship("User", back_populates="audit_logs")
     case = relationship("Case", back_populates="audit_logs")
+
+
+class RescoringJob(Base):
+    """Progress checkpoint of a background job re-scoring open cases with a model version."""
+    __tablename__ = "rescoring_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    model_version = Column(String, nullable=False)
+    status = Column(String, default="pending")  # pending, running, completed, failed
+    last_case_id = Column(Integer, default=0)  # Resume point: cases.id <= this are done
+    total_count = Column(Integer, default=0)  # Open cases needing a score at job start
+    processed_count = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class DashboardCounters(Base):
+    """
+    Single-row dashboard figures, kept current by deltas applied in the
+    transactions that change cases or DCAs and periodically reconciled
+    (see app.services.dashboard_counters).
+    """
+    __tablename__ = "dashboard_counters"
+    
+    id = Column(Integer, primary_key=True)
+    total_cases = Column(Integer, nullable=False, default=0)
+    open_cases = Column(Integer, nullable=False, default=0)
+    in_progress_cases = Column(Integer, nullable=False, default=0)
+    closed_cases = Column(Integer, nullable=False, default=0)
+    sla_breach_count = Column(Integer, nullable=False, default=0)  # Breached and not closed
+    at_risk_count = Column(Integer, nullable=False, default=0)  # At risk and not closed
+    total_overdue_amount = Column(Float, nullable=False, default=0.0)  # Not closed
+    pending_amount = Column(Float, nullable=False, default=0.0)  # Open or in progress
+    recovered_amount = Column(Float, nullable=False, default=0.0)  # Closed
+    total_dcas = Column(Integer, nullable=False, default=0)
+    active_dcas = Column(Integer, nullable=False, default=0)
+    reconciled_at = Column(DateTime(timezone=True), nullable=True)  # Last reconciliation
+
+
+class DashboardDailyRollup(Base):
+    """
+    End-of-day case figures for dashboard trends: one row per UTC day and
+    combination of status, priority, SLA status and DCA.
+    """
+    __tablename__ = "dashboard_daily_rollups"
+    
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False, index=True)
+    status = Column(Enum(CaseStatus), nullable=False)
+    priority = Column(Enum(Priority), nullable=True)
+    sla_status = Column(Enum(SLAStatus), nullable=True)
+    dca_id = Column(Integer, nullable=True)  # No foreign key: history outlives deleted DCAs
+    case_count = Column(Integer, nullable=False, default=0)
+    overdue_amount = Column(Float, nullable=False, default=0.0)  # Sum over the counted cases
+    created_count = Column(Integer, nullable=False, default=0)  # Of those, created that day
+    closed_count = Column(Integer, nullable=False, default=0)  # Of those, closed that day
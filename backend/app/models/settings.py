@@ -11,6 +11,7 @@ class Settings(Base):
     __tablename__ = "settings"
     
     id = Column(Integer, primary_key=True, index=True)
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every update, for cache invalidation
     
     # SLA Parameters (in days)
     p1_sla_days = Column(Integer, default=3)
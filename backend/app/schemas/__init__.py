@@ -9,12 +9,26 @@ from app.schemas.schemas import (
     DCACreate,
     DCAUpdate,
     DCAResponse,
+    DCAMetricsRecomputeResult,
     CaseBase,
     CaseCreate,
     CaseUpdate,
     CaseResponse,
+    DCASummary,
+    CaseSummaryResponse,
+    CasePage,
+    ModelVersionResponse,
+    RescoringJobResponse,
+    BulkImportRowError,
+    BulkImportChunkResult,
+    BulkImportResult,
+    BacklogAllocationResult,
+    SLATransitionCount,
+    SLAStatusRefreshResult,
     AuditLogResponse,
     DashboardStats,
+    DashboardTrendPoint,
+    DashboardTrends,
     EscalationRequest,
 )
 
@@ -29,11 +43,25 @@ __all__ = [
     "DCACreate",
     "DCAUpdate",
     "DCAResponse",
+    "DCAMetricsRecomputeResult",
     "CaseBase",
     "CaseCreate",
     "CaseUpdate",
     "CaseResponse",
+    "DCASummary",
+    "CaseSummaryResponse",
+    "CasePage",
+    "ModelVersionResponse",
+    "RescoringJobResponse",
+    "BulkImportRowError",
+    "BulkImportChunkResult",
+    "BulkImportResult",
+    "BacklogAllocationResult",
+    "SLATransitionCount",
+    "SLAStatusRefreshResult",
     "AuditLogResponse",
     "DashboardStats",
+    "DashboardTrendPoint",
+    "DashboardTrends",
     "EscalationRequest",
 ]
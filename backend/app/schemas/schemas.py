@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import List, Optional, Union
+from datetime import date, datetime
 from app.models.models import RoleEnum, CaseStatus, Priority, SLAStatus
 
 
@@ -42,18 +42,30 @@ class LoginRequest(BaseModel):
 
 
 # DCA Schemas
+def _parse_performance_score(value):
+    """Accept the legacy "TBD" marker (or blank) for an unrated DCA."""
+    if isinstance(value, str) and value.strip().upper() in ("", "TBD"):
+        return None
+    return value
+
+
 class DCABase(BaseModel):
     name: str
     contact_person: Optional[str] = None
     email: Optional[EmailStr] = None
     phone: Optional[str] = None
-    performance_score: str = "TBD"
+    performance_score: Optional[float] = Field(default=None, ge=0)  # None until rated
     max_capacity: int = Field(default=100, gt=0)
     is_active: bool = True
     min_debt_amount: float = Field(default=0.0, ge=0)
     max_debt_amount: float = Field(default=1000000.0, gt=0)
     website_url: Optional[str] = None
     document_url: Optional[str] = None
+    
+    @field_validator("performance_score", mode="before")
+    @classmethod
+    def parse_performance_score(cls, value):
+        return _parse_performance_score(value)
 
 
 class DCACreate(DCABase):
@@ -65,7 +77,7 @@ class DCAUpdate(BaseModel):
     contact_person: Optional[str] = None
     email: Optional[EmailStr] = None
     phone: Optional[str] = None
-    performance_score: Optional[str] = None
+    performance_score: Optional[float] = Field(default=None, ge=0)
     max_capacity: Optional[int] = Field(default=None, gt=0)
     is_active: Optional[bool] = None
     min_debt_amount: Optional[float] = Field(default=None, ge=0)
@@ -76,10 +88,16 @@ class DCAUpdate(BaseModel):
     total_cases_rejected: Optional[int] = None
     total_delays: Optional[int] = None
     avg_completion_time_days: Optional[float] = None
+    
+    @field_validator("performance_score", mode="before")
+    @classmethod
+    def parse_performance_score(cls, value):
+        return _parse_performance_score(value)
 
 
 class DCAResponse(DCABase):
     id: int
+    performance_rated: bool
     active_cases_count: int
     total_cases_completed: int
     total_cases_rejected: int
@@ -91,6 +109,15 @@ class DCAResponse(DCABase):
         from_attributes = True
 
 
+class DCAMetricsRecomputeResult(BaseModel):
+    dca_count: int
+    rated: int
+    scores_changed: int
+    active_counts_changed: int
+    aggregate_ms: float  # Grouped aggregate over cases
+    write_ms: float  # Aggregates table and DCA updates, including commit
+
+
 # Case Schemas
 class CaseBase(BaseModel):
     customer_name: str
@@ -127,6 +154,7 @@ class CaseResponse(CaseBase):
     sla_due_date: Optional[datetime]
     sla_status: SLAStatus
     ai_recovery_score: float
+    ai_model_version: Optional[str] = None
     dca_id: Optional[int]
     allocation_reason: Optional[str]
     created_at: datetime
@@ -137,6 +165,125 @@ class CaseResponse(CaseBase):
         from_attributes = True
 
 
+class DCASummary(BaseModel):
+    id: int
+    name: str
+    
+    class Config:
+        from_attributes = True
+
+
+class CaseSummaryResponse(BaseModel):
+    """A case as listed: no free-text detail columns, and only the DCA's name."""
+    id: int
+    case_id: str
+    customer_name: str
+    customer_email: Optional[EmailStr] = None
+    overdue_amount: float
+    ageing_days: int
+    status: CaseStatus
+    priority: Priority
+    sla_due_date: Optional[datetime]
+    sla_status: SLAStatus
+    ai_recovery_score: float
+    dca_id: Optional[int]
+    created_at: datetime
+    dca: Optional[DCASummary] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class CasePage(BaseModel):
+    items: List[CaseSummaryResponse]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page; None on the last page
+
+
+# Model Registry Schemas
+class ModelVersionResponse(BaseModel):
+    version: str
+    model_type: str
+    features: List[str]
+    description: str = ""
+    created_at: datetime
+    active: bool = False
+    
+    class Config:
+        protected_namespaces = ()
+
+
+class RescoringJobResponse(BaseModel):
+    id: int
+    model_version: str
+    status: str
+    last_case_id: int
+    total_count: int
+    processed_count: int
+    percent_complete: float
+    rows_per_second: float
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        protected_namespaces = ()
+
+
+# Bulk Import Schemas
+class BulkImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class BulkImportChunkResult(BaseModel):
+    chunk: int
+    received: int
+    created: int
+    failed: int
+    first_case_id: Optional[str] = None
+    last_case_id: Optional[str] = None
+    elapsed_ms: float
+    errors: List[BulkImportRowError] = []
+
+
+class BulkImportResult(BaseModel):
+    total_received: int
+    total_created: int
+    total_failed: int
+    elapsed_ms: float
+    chunks: List[BulkImportChunkResult]
+
+
+# Backlog Allocation Schemas
+class BacklogAllocationResult(BaseModel):
+    backlog_size: int
+    dca_count: int
+    assigned: int
+    unassigned: int
+    expected_recovery: float  # Sum of overdue_amount * ai_recovery_score over assigned cases
+    objective: float  # Expected recovery weighted by DCA performance
+    dry_run: bool
+    solve_ms: float
+    apply_ms: float
+
+
+# SLA Schemas
+class SLATransitionCount(BaseModel):
+    from_status: Optional[SLAStatus] = None
+    to_status: SLAStatus
+    count: int
+
+
+class SLAStatusRefreshResult(BaseModel):
+    message: str = "SLA statuses updated successfully"  # The endpoint's original response
+    set_based: bool
+    updated: int
+    transitions: List[SLATransitionCount] = []
+    chunks: int  # Primary key ranges updated (1 for the per-case path)
+    elapsed_ms: float
+
+
 # Audit Log Schemas
 class AuditLogResponse(BaseModel):
     id: int
@@ -170,6 +317,29 @@ class DashboardStats(BaseModel):
     recovered_amount: float = 0
 
 
+class DashboardTrendPoint(BaseModel):
+    day: date
+    group: Optional[Union[int, str]] = None  # Value of the group_by dimension
+    total_cases: int
+    open_cases: int
+    in_progress_cases: int
+    closed_cases: int
+    sla_breach_count: int
+    at_risk_count: int
+    total_overdue_amount: float
+    pending_amount: float
+    recovered_amount: float
+    created_cases: int  # Created that day
+    closed_that_day: int
+
+
+class DashboardTrends(BaseModel):
+    start: date
+    end: date
+    group_by: Optional[str] = None
+    points: List[DashboardTrendPoint] = []
+
+
 # Escalation Schema
 class EscalationRequest(BaseModel):
     reason: str
@@ -1,4 +1,6 @@
 from app.services.case_service import CaseService
 from app.services.dca_service import DCAService
+from app.services.rescoring_service import RescoringService
+from app.services.allocation_optimizer import AllocationOptimizer
 
-__all__ = ["CaseService", "DCAService"]
+__all__ = ["CaseService", "DCAService", "RescoringService", "AllocationOptimizer"]
@@ -0,0 +1,486 @@
+"""
+Global allocation of the unassigned case backlog.
+
+Case creation allocates one case at a time (see DCACapacityIndex), which
+is fast but myopic: early cases take the best DCAs whether or not later,
+larger cases could only have gone there. Here the whole backlog is
+allocated at once as a transportation problem:
+
+    maximize   sum x_ij * expected_recovery_i * quality_j
+    subject to sum_j x_ij <= 1                  (each case at most once)
+               sum_i x_ij <= spare_capacity_j   (DCA capacity)
+               x_ij = 0 unless min_debt_j <= overdue_amount_i <= max_debt_j
+
+where expected_recovery = overdue_amount * ai_recovery_score and quality
+is the DCA performance score / 100.
+
+A case-level LP would have one variable per (case, DCA) pair, so cases
+are aggregated first. The DCA debt ranges cut the amount axis into
+segments whose cases all see the same in-range DCAs; within a segment,
+cases are bucketed by expected recovery. The class x DCA transportation
+LP is solved with HiGHS and mapped back to cases, giving each class's
+best cases to its best DCAs. Cases still unplaced (rounding, bucketing)
+then go greedily to any in-range spare capacity.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+import time
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Case, DCA, AuditLog, User, CaseStatus
+from app.schemas import BacklogAllocationResult
+from app.services.dca_capacity_index import get_dca_capacity_index
+from app.services.event_broker import case_event, get_event_broker
+from app.utils.performance import format_performance_score
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Upper bound on LP variables (class x in-range DCA pairs); keeps the
+# solve to a few seconds even with hundreds of distinct debt ranges
+DEFAULT_MAX_VARIABLES = 100_000
+
+# Expected-recovery buckets per amount segment, before the variable cap
+DEFAULT_BUCKETS_PER_SEGMENT = 16
+
+
+def dca_quality(performance_scores: Sequence[Optional[float]]) -> "np.ndarray":
+    """
+    Allocation weight per DCA from its performance score (0-120 -> 0-1.2).
+    
+    Unrated DCAs get the median of the rated ones, or 1.0 when none are
+    rated yet.
+    """
+    import numpy as np
+    
+    quality = np.array(
+        [np.nan if score is None else score / 100.0 for score in performance_scores],
+        dtype=np.float64
+    )
+    
+    rated = ~np.isnan(quality)
+    quality[~rated] = np.median(quality[rated]) if rated.any() else 1.0
+    return quality
+
+
+def solve_allocation(
+    amounts: "np.ndarray",
+    expected_recovery: "np.ndarray",
+    quality: "np.ndarray",
+    min_debt: "np.ndarray",
+    max_debt: "np.ndarray",
+    capacity: "np.ndarray",
+    max_variables: int = DEFAULT_MAX_VARIABLES,
+    buckets_per_segment: int = DEFAULT_BUCKETS_PER_SEGMENT,
+) -> "np.ndarray":
+    """
+    Allocate cases to DCAs. Returns the DCA position per case, -1 if unassigned.
+    
+    All arguments are aligned arrays: the first two per case, the rest
+    per DCA. Capacity is the spare capacity (max - active).
+    """
+    import numpy as np
+    
+    amounts = np.asarray(amounts, dtype=np.float64)
+    weights = np.asarray(expected_recovery, dtype=np.float64)
+    quality = np.asarray(quality, dtype=np.float64)
+    min_debt = np.asarray(min_debt, dtype=np.float64)
+    max_debt = np.asarray(max_debt, dtype=np.float64)
+    capacity = np.maximum(np.asarray(capacity, dtype=np.int64), 0)
+    
+    assignment = np.full(amounts.size, -1, dtype=np.int64)
+    if amounts.size == 0 or quality.size == 0 or capacity.sum() == 0:
+        return assignment
+    
+    groups, group_feasible = _amount_groups(amounts, min_debt, max_debt, capacity, max_variables)
+    
+    # Bucket each group's cases by expected recovery, best first, so a
+    # class is a contiguous run of the (group, -weight) ordering
+    order = np.lexsort((-weights, groups))
+    sorted_groups = groups[order]
+    group_sizes = np.bincount(groups, minlength=len(group_feasible))
+    group_starts = np.concatenate(([0], np.cumsum(group_sizes)[:-1]))
+    rank_in_group = np.arange(amounts.size) - group_starts[sorted_groups]
+    
+    buckets = int(np.clip(max_variables // max(int(group_feasible.sum()), 1), 1, buckets_per_segment))
+    bucket = rank_in_group * buckets // group_sizes[sorted_groups]
+    classes, sorted_class = np.unique(sorted_groups * buckets + bucket, return_inverse=True)
+    class_group = classes // buckets
+    class_sizes = np.bincount(sorted_class)
+    class_starts = np.concatenate(([0], np.cumsum(class_sizes)[:-1]))
+    class_weight = np.bincount(sorted_class, weights=weights[order]) / class_sizes
+    
+    units, pair_class, pair_dca = _solve_transportation(
+        class_weight, class_sizes, group_feasible[class_group], quality, capacity
+    )
+    
+    # Hand each class's cases, best first, to its DCAs, best first
+    used = np.nonzero(units)[0]
+    used = used[np.lexsort((-quality[pair_dca[used]], pair_class[used]))]
+    counts = units[used]
+    used_class = pair_class[used]
+    ends = np.cumsum(counts)
+    offsets = ends - counts
+    class_offsets = offsets - offsets[np.searchsorted(used_class, used_class)]
+    rank = np.arange(ends[-1] if ends.size else 0) - np.repeat(offsets, counts)
+    positions = np.repeat(class_starts[used_class] + class_offsets, counts) + rank
+    in_class = np.repeat(class_offsets, counts) + rank < np.repeat(class_sizes[used_class], counts)
+    assignment[order[positions[in_class]]] = np.repeat(pair_dca[used], counts)[in_class]
+    
+    _enforce_capacity(assignment, weights, capacity)
+    _fill_remaining(assignment, amounts, weights, quality, min_debt, max_debt, capacity)
+    return assignment
+
+
+def _amount_groups(
+    amounts: "np.ndarray",
+    min_debt: "np.ndarray",
+    max_debt: "np.ndarray",
+    capacity: "np.ndarray",
+    max_variables: int,
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Group cases by the set of DCAs whose debt range covers their amount.
+    
+    Returns (group per case, group x DCA feasibility). If there are too
+    many groups for the LP budget, adjacent ones are merged and only keep
+    the DCAs in range for all of them.
+    """
+    import numpy as np
+    
+    edges = np.unique(np.concatenate((min_debt, np.nextafter(max_debt, np.inf))))
+    segment = np.searchsorted(edges, amounts, side="right") - 1
+    segments, case_segment = np.unique(segment, return_inverse=True)
+    
+    # Amounts do not cross a range boundary inside a segment, so its left
+    # edge stands in for all of them (segment -1 is below every range)
+    left = edges[np.maximum(segments, 0)]
+    feasible = (
+        (segments[:, None] >= 0)
+        & (left[:, None] >= min_debt)
+        & (left[:, None] <= max_debt)
+        & (capacity > 0)
+    )
+    
+    merge = 1
+    group_feasible = feasible
+    while group_feasible.sum() > max_variables and merge < len(segments):
+        merge *= 2
+        group_feasible = np.logical_and.reduceat(feasible, np.arange(0, len(segments), merge), axis=0)
+    
+    return case_segment // merge, group_feasible
+
+
+def _solve_transportation(
+    class_weight: "np.ndarray",
+    class_sizes: "np.ndarray",
+    class_feasible: "np.ndarray",
+    quality: "np.ndarray",
+    capacity: "np.ndarray",
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Solve the class-level LP. Returns (units, class, dca) per in-range pair."""
+    import numpy as np
+    from scipy.optimize import linprog
+    from scipy.sparse import csr_matrix
+    
+    pair_class, pair_dca = np.nonzero(class_feasible)
+    value = class_weight[pair_class] * quality[pair_dca]
+    keep = value > 0
+    pair_class, pair_dca, value = pair_class[keep], pair_dca[keep], value[keep]
+    
+    units = np.zeros(pair_class.size, dtype=np.int64)
+    if pair_class.size == 0:
+        return units, pair_class, pair_dca
+    
+    n_classes = class_sizes.size
+    pairs = np.arange(pair_class.size)
+    constraints = csr_matrix(
+        (np.ones(2 * pairs.size), (np.concatenate((pair_class, n_classes + pair_dca)), np.concatenate((pairs, pairs)))),
+        shape=(n_classes + capacity.size, pairs.size)
+    )
+    bounds = np.concatenate((class_sizes, capacity)).astype(np.float64)
+    
+    result = linprog(-value, A_ub=constraints, b_ub=bounds, bounds=(0, None), method="highs-ipm")
+    if result.status != 0:
+        print(f"[Allocation] LP solve failed ({result.message}), falling back to greedy placement")
+        return units, pair_class, pair_dca
+    
+    # Transportation LPs have integral vertices; crossover returns one
+    units[:] = np.floor(result.x + 1e-6)
+    return units, pair_class, pair_dca
+
+
+def _enforce_capacity(assignment: "np.ndarray", weights: "np.ndarray", capacity: "np.ndarray"):
+    """Unassign the lowest-value cases of any DCA over capacity (rounding guard)."""
+    import numpy as np
+    
+    placed = np.nonzero(assignment >= 0)[0]
+    if not np.any(np.bincount(assignment[placed], minlength=capacity.size) > capacity):
+        return
+    
+    placed = placed[np.lexsort((-weights[placed], assignment[placed]))]
+    dcas = assignment[placed]
+    rank = np.arange(placed.size) - np.searchsorted(dcas, dcas)
+    assignment[placed[rank >= capacity[dcas]]] = -1
+
+
+def _fill_remaining(
+    assignment: "np.ndarray",
+    amounts: "np.ndarray",
+    weights: "np.ndarray",
+    quality: "np.ndarray",
+    min_debt: "np.ndarray",
+    max_debt: "np.ndarray",
+    capacity: "np.ndarray",
+    chunk_size: int = 8192,
+):
+    """
+    Place leftover cases into in-range DCAs with spare capacity.
+    
+    Each round every pending case proposes to its best open DCA and each
+    DCA accepts its highest-value proposers up to its spare capacity.
+    Every round with a rejection fills a DCA, so this ends within one
+    round per DCA.
+    """
+    import numpy as np
+    
+    remaining = capacity - np.bincount(assignment[assignment >= 0], minlength=capacity.size)
+    pending = np.nonzero(assignment < 0)[0]
+    
+    while pending.size and np.any(remaining > 0):
+        open_quality = np.where(remaining > 0, quality, -np.inf)
+        choice = np.empty(pending.size, dtype=np.int64)
+        for start in range(0, pending.size, chunk_size):
+            block = amounts[pending[start:start + chunk_size], None]
+            scores = np.where((block >= min_debt) & (block <= max_debt), open_quality, -np.inf)
+            best = scores.argmax(axis=1)
+            best[np.isneginf(scores[np.arange(best.size), best])] = -1
+            choice[start:start + chunk_size] = best
+        
+        placeable = choice >= 0
+        pending, choice = pending[placeable], choice[placeable]
+        if not pending.size:
+            break
+        
+        by_dca = np.lexsort((-weights[pending], choice))
+        pending, choice = pending[by_dca], choice[by_dca]
+        rank = np.arange(pending.size) - np.searchsorted(choice, choice)
+        accepted = rank < remaining[choice]
+        
+        assignment[pending[accepted]] = choice[accepted]
+        remaining -= np.bincount(choice[accepted], minlength=remaining.size)
+        pending = pending[~accepted]
+
+
+class AllocationOptimizer:
+    """Batch allocation of the unassigned open backlog across all active DCAs."""
+    
+    OPEN_STATUSES = [CaseStatus.OPEN, CaseStatus.IN_PROGRESS]
+    
+    @staticmethod
+    def allocate_backlog(
+        db: Session,
+        user: User,
+        dry_run: bool = False,
+        chunk_size: int = 5000
+    ) -> BacklogAllocationResult:
+        """
+        Allocate every unassigned open case in one optimization pass.
+        
+        With dry_run the plan is computed and summarised but not written.
+        Otherwise case assignments, DCA counts and audit logs are written in
+        chunked bulk statements and committed together, and the result
+        counts what was actually written (see _apply).
+        """
+        import numpy as np
+        
+        started = time.perf_counter()
+        cases = db.execute(
+            select(Case.id, Case.overdue_amount, Case.ai_recovery_score)
+            .where(Case.dca_id.is_(None), Case.status.in_(AllocationOptimizer.OPEN_STATUSES))
+            .order_by(Case.id)
+        ).all()
+        dcas = db.execute(
+            select(
+                DCA.id,
+                DCA.name,
+                DCA.performance_score,
+                DCA.active_cases_count,
+                DCA.max_capacity,
+                DCA.min_debt_amount,
+                DCA.max_debt_amount
+            )
+            .where(DCA.is_active == True)
+            .order_by(DCA.id)
+        ).all()
+        
+        amounts = np.array([c.overdue_amount for c in cases], dtype=np.float64)
+        expected_recovery = amounts * np.array([c.ai_recovery_score or 0.0 for c in cases], dtype=np.float64)
+        quality = dca_quality([d.performance_score for d in dcas])
+        
+        assignment = solve_allocation(
+            amounts,
+            expected_recovery,
+            quality,
+            min_debt=[d.min_debt_amount or 0.0 for d in dcas],
+            max_debt=[d.max_debt_amount if d.max_debt_amount is not None else np.inf for d in dcas],
+            capacity=[(d.max_capacity or 0) - (d.active_cases_count or 0) for d in dcas]
+        )
+        solve_ms = (time.perf_counter() - started) * 1000
+        
+        apply_ms = 0.0
+        if not dry_run and np.any(assignment >= 0):
+            applied = time.perf_counter()
+            assignment = AllocationOptimizer._apply(db, user, cases, dcas, assignment, expected_recovery, chunk_size)
+            apply_ms = (time.perf_counter() - applied) * 1000
+        
+        placed = np.nonzero(assignment >= 0)[0]
+        result = BacklogAllocationResult(
+            backlog_size=len(cases),
+            dca_count=len(dcas),
+            assigned=int(placed.size),
+            unassigned=len(cases) - int(placed.size),
+            expected_recovery=round(float(expected_recovery[placed].sum()), 2),
+            objective=round(float((expected_recovery[placed] * quality[assignment[placed]]).sum()), 2),
+            dry_run=dry_run,
+            solve_ms=round(solve_ms, 2),
+            apply_ms=round(apply_ms, 2)
+        )
+        
+        print(
+            f"[Allocation] Backlog {result.backlog_size} cases, {result.dca_count} DCAs: "
+            f"{result.assigned} assigned in {result.solve_ms:.0f}ms solve + {result.apply_ms:.0f}ms apply"
+            + (" (dry run)" if dry_run else "")
+        )
+        return result
+    
+    @staticmethod
+    def _apply(
+        db: Session,
+        user: User,
+        cases: List,
+        dcas: List,
+        assignment: "np.ndarray",
+        expected_recovery: "np.ndarray",
+        chunk_size: int
+    ) -> "np.ndarray":
+        """
+        Write an allocation plan in one transaction; return the assignment
+        actually written (-1 for cases left unassigned).
+        
+        The plan comes from a snapshot, so every write is conditional. A
+        case is only taken while it is still unassigned and open. Each
+        DCA's capacity is then claimed for the cases it got with the same
+        `active_cases_count + n <= max_capacity` update as case creation
+        (see DCACapacityIndex); if less room is left, its cases with the
+        lowest expected recovery are handed back to the backlog. Cases are
+        locked before DCAs, in the order status changes take them.
+        case.assigned events are published after the commit.
+        """
+        import numpy as np
+        
+        now = datetime.now(timezone.utc)
+        position_of = {case.id: position for position, case in enumerate(cases)}
+        applied = np.full(assignment.size, -1, dtype=np.int64)
+        events = []
+        
+        for dca_index in np.unique(assignment[assignment >= 0]).tolist():
+            dca = dcas[dca_index]
+            planned = [cases[position].id for position in np.nonzero(assignment == dca_index)[0].tolist()]
+            
+            taken = []
+            for start in range(0, len(planned), chunk_size):
+                taken += db.execute(
+                    update(Case)
+                    .where(
+                        Case.id.in_(planned[start:start + chunk_size]),
+                        Case.dca_id.is_(None),
+                        Case.status.in_(AllocationOptimizer.OPEN_STATUSES)
+                    )
+                    .values(dca_id=dca.id, assigned_at=now)
+                    .returning(Case.id, Case.case_id, Case.dca_id, Case.priority, Case.status, Case.sla_status)
+                    .execution_options(synchronize_session=False)
+                ).all()
+            if not taken:
+                continue
+            
+            # Best expected recovery first, so a short claim drops the least valuable cases
+            taken.sort(key=lambda row: -expected_recovery[position_of[row.id]])
+            claimed = AllocationOptimizer._claim_capacity(db, dca.id, len(taken))
+            taken, returned = taken[:claimed], [row.id for row in taken[claimed:]]
+            for start in range(0, len(returned), chunk_size):
+                db.execute(
+                    update(Case)
+                    .where(Case.id.in_(returned[start:start + chunk_size]))
+                    .values(dca_id=None, assigned_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+            
+            for start in range(0, len(taken), chunk_size):
+                chunk = taken[start:start + chunk_size]
+                db.execute(update(Case), [
+                    {
+                        "id": row.id,
+                        "allocation_reason": (
+                            f"Backlog optimizer assigned to DCA with score {format_performance_score(dca.performance_score)} "
+                            f"(expected recovery: {expected_recovery[position_of[row.id]]:,.0f})"
+                        )
+                    }
+                    for row in chunk
+                ])
+                db.execute(insert(AuditLog), [
+                    {
+                        "user_id": user.id,
+                        "case_id": row.id,
+                        "action_type": "ALLOCATE_CASE",
+                        "description": f"Allocated to {dca.name} by backlog optimizer",
+                        "new_value": f"DCA: {dca.id}"
+                    }
+                    for row in chunk
+                ])
+            
+            for row in taken:
+                applied[position_of[row.id]] = dca_index
+            events += [case_event("case.assigned", row, dca_id=None) for row in taken]
+        
+        db.commit()
+        get_dca_capacity_index().invalidate()
+        get_event_broker().publish(events)
+        return applied
+    
+    @staticmethod
+    def _claim_capacity(db: Session, dca_id: int, count: int) -> int:
+        """
+        Take up to `count` slots of an active DCA's capacity; return how many were taken.
+        
+        Tries the whole count, then whatever room is left. Unlike case
+        creation, waits for the DCA's row lock instead of skipping it.
+        """
+        for _ in range(3):
+            if count <= 0:
+                return 0
+            claimed = db.execute(
+                update(DCA)
+                .where(
+                    DCA.id == dca_id,
+                    DCA.is_active == True,
+                    DCA.active_cases_count + count <= DCA.max_capacity
+                )
+                .values(active_cases_count=DCA.active_cases_count + count)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if claimed:
+                return count
+            
+            room = db.scalar(
+                select(DCA.max_capacity - DCA.active_cases_count).where(DCA.id == dca_id, DCA.is_active == True)
+            )
+            if room is None:
+                return 0
+            count = min(count, room)
+        return 0
@@ -0,0 +1,161 @@
+"""
+Case ID Generation
+Hands out collision-free case numbers without counting the cases table.
+
+Each worker process reserves blocks of consecutive case numbers from the
+database (a PostgreSQL sequence incrementing by the block size, or a
+counter row on SQLite) and serves IDs from memory until the block runs out,
+so creating a case needs no COUNT and, most of the time, no round trip.
+"""
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Deque, List, Tuple
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.models import Case, CaseNumberBlock, CASE_NUMBER_BLOCK_SIZE, case_number_seq
+
+
+def format_case_id(number: int, year: int = None) -> str:
+    """Format a case number as a public case ID, e.g. CASE-2026-000042."""
+    if year is None:
+        year = datetime.utcnow().year
+    return f"CASE-{year}-{number:06d}"
+
+
+class CaseIdGenerator:
+    """Process-local dispenser of case numbers backed by reserved database blocks."""
+    
+    def __init__(self, block_size: int = CASE_NUMBER_BLOCK_SIZE):
+        self.block_size = block_size
+        self._blocks: Deque[Tuple[int, int]] = deque()  # [start, end) ranges
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+    
+    def next_case_id(self, db: Session) -> str:
+        """Get the next case ID."""
+        return self.next_case_ids(db, 1)[0]
+    
+    def next_case_ids(self, db: Session, count: int) -> List[str]:
+        """Get `count` case IDs, reserving new blocks only when the current ones run out."""
+        year = datetime.utcnow().year
+        return [format_case_id(number, year) for number in self._take(db, count)]
+    
+    def _take(self, db: Session, count: int) -> List[int]:
+        with self._lock:
+            # Blocks reserved before a fork belong to the parent process
+            if self._pid != os.getpid():
+                self._blocks.clear()
+                self._pid = os.getpid()
+            
+            available = sum(end - start for start, end in self._blocks)
+            if available < count:
+                missing = count - available
+                blocks_needed = -(-missing // self.block_size)
+                self._blocks.extend(self._reserve_blocks(db.get_bind(), blocks_needed))
+            
+            numbers = []
+            while len(numbers) < count:
+                start, end = self._blocks[0]
+                take = min(count - len(numbers), end - start)
+                numbers.extend(range(start, start + take))
+                if start + take == end:
+                    self._blocks.popleft()
+                else:
+                    self._blocks[0] = (start + take, end)
+            return numbers
+    
+    def _reserve_blocks(self, bind, count: int) -> List[Tuple[int, int]]:
+        """
+        Reserve `count` blocks in their own transaction.
+        
+        Like a sequence, reservations are never rolled back with the caller's
+        transaction, so numbers may be skipped but never handed out twice.
+        """
+        engine = bind.engine if isinstance(bind, Connection) else bind
+        
+        with engine.begin() as conn:
+            if conn.dialect.supports_sequences:
+                starts = conn.execute(
+                    select(case_number_seq.next_value()).select_from(
+                        func.generate_series(1, count).table_valued("n")
+                    )
+                ).scalars().all()
+            else:
+                reserved = count * self.block_size
+                end = _advance_counter(conn, reserved)
+                starts = range(end - reserved, end, self.block_size)
+        
+        return [(start, start + self.block_size) for start in starts]
+
+
+def _case_number_floor(conn: Connection) -> int:
+    """
+    Lowest case number that is safe to hand out.
+    
+    Case numbers used to be derived from COUNT(*) + 1, which is never larger
+    than the highest primary key, so MAX(cases.id) + 1 is a safe floor.
+    """
+    return (conn.execute(select(func.max(Case.id))).scalar() or 0) + 1
+
+
+def _advance_counter(conn: Connection, amount: int) -> int:
+    """Advance the block counter row by `amount` and return its new value."""
+    advanced = conn.execute(
+        update(CaseNumberBlock)
+        .where(CaseNumberBlock.name == case_number_seq.name)
+        .values(next_value=CaseNumberBlock.next_value + amount)
+    )
+    if advanced.rowcount == 0:
+        conn.execute(CaseNumberBlock.__table__.insert().values(
+            name=case_number_seq.name,
+            next_value=_case_number_floor(conn) + amount
+        ))
+    
+    return conn.execute(
+        select(CaseNumberBlock.next_value)
+        .where(CaseNumberBlock.name == case_number_seq.name)
+    ).scalar_one()
+
+
+def sync_case_number_sequence(engine: Engine):
+    """
+    Make sure the case number sequence starts above every existing case.
+    Safe to run on every startup.
+    """
+    with engine.begin() as conn:
+        floor = _case_number_floor(conn)
+        
+        if conn.dialect.supports_sequences:
+            conn.execute(
+                text(
+                    "SELECT setval(:seq, :floor) "
+                    "WHERE (SELECT last_value FROM case_number_seq) < :floor"
+                ),
+                {"seq": case_number_seq.name, "floor": floor}
+            )
+            return
+        
+        current = _advance_counter(conn, 0)
+        if current < floor:
+            conn.execute(
+                update(CaseNumberBlock)
+                .where(CaseNumberBlock.name == case_number_seq.name)
+                .values(next_value=floor)
+            )
+
+
+# Singleton instance
+_generator = None
+
+
+def get_case_id_generator() -> CaseIdGenerator:
+    """Get singleton instance of the case ID generator."""
+    global _generator
+    if _generator is None:
+        _generator = CaseIdGenerator()
+    return _generator
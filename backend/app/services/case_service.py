@@ -1,23 +1,50 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy.orm import Session, joinedload, undefer_group
+from sqlalchemy import DateTime, String, case as sql_case, func, insert, literal, tuple_, type_coerce, update
+from pydantic import ValidationError
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from collections import Counter
+from itertools import islice
+from types import SimpleNamespace
+import base64
+import json
+import time
 
 from app.models import Case, DCA, AuditLog, User, CaseStatus, Priority, SLAStatus
-from app.schemas import CaseCreate, CaseUpdate, DashboardStats
+from app.models.models import CASE_DETAIL_GROUP
+from app.schemas import (
+    CaseCreate,
+    CaseUpdate,
+    DashboardStats,
+    BulkImportChunkResult,
+    BulkImportRowError,
+    SLATransitionCount,
+    SLAStatusRefreshResult,
+)
 from app.workflows import WorkflowEngine
 from app.ai import get_predictor
+from app.services.case_id_generator import get_case_id_generator
+from app.services.dca_capacity_index import get_dca_capacity_index
+from app.services.event_broker import case_event, get_event_broker
+from app.services.dashboard_counters import apply_counter_deltas, case_deltas, read_dashboard_stats
+from app.utils.performance import calculate_dca_performance_score, record_case_completion
+
+
+# Cap on row errors reported back per bulk import chunk
+MAX_REPORTED_ERRORS_PER_CHUNK = 50
 
 
 class CaseService:
     """Service layer for case management operations."""
     
+    # Case columns returned by bulk UPDATEs to publish case events
+    _EVENT_COLUMNS = (Case.id, Case.case_id, Case.dca_id, Case.priority, Case.status, Case.sla_status)
+    
     @staticmethod
     def create_case(db: Session, case_data: CaseCreate, user: User) -> Case:
         """Create a new case with automated workflow rules."""
-        # Generate unique case ID
-        case_count = db.query(Case).count()
-        case_id = f"CASE-{datetime.utcnow().year}-{case_count + 1:06d}"
+        # Generate unique case ID from this worker's reserved block
+        case_id = get_case_id_generator().next_case_id(db)
         
         # Calculate priority using workflow engine
         priority = WorkflowEngine.calculate_priority(
@@ -51,6 +78,7 @@ class CaseService:
             sla_due_date=sla_due_date,
             sla_status=sla_status,
             ai_recovery_score=ai_score,
+            ai_model_version=predictor.version,
             notes=case_data.notes
         )
         
@@ -70,53 +98,201 @@ class CaseService:
             new_value=f"Priority: {priority}, Amount: {case_data.overdue_amount}"
         )
         
+        apply_counter_deltas(db, case_deltas([(None, (case.status, case.sla_status, case.overdue_amount))]))
         db.commit()
         db.refresh(case)
+        get_event_broker().publish(CaseService._creation_events([case]))
         return case
     
+    @staticmethod
+    def _creation_events(cases) -> Iterator[dict]:
+        """case.created, then case.assigned for allocated cases."""
+        for case in cases:
+            yield case_event("case.created", case)
+            if case.dca_id:
+                yield case_event("case.assigned", case)
+    
     @staticmethod
     def _allocate_to_dca(db: Session, case: Case):
-        """Allocate case to best available DCA."""
-        # Get active DCAs with capacity
-        dcas = db.query(DCA).filter(
-            DCA.is_active == True,
-            DCA.active_cases_count < DCA.max_capacity
-        ).order_by(
-            DCA.performance_score.desc(),
-            DCA.active_cases_count.asc()
-        ).all()
+        """
+        Allocate case to best available DCA.
+        
+        Allocation logic:
+        - Only DCAs whose debt range covers the amount, unless none has capacity
+        - P1 cases go to best performing DCA
+        - P2/P3 use load balancing
+        """
+        allocation = get_dca_capacity_index().allocate(db, case.priority, case.overdue_amount)
         
-        if not dcas:
+        if not allocation:
             case.allocation_reason = "No available DCA with capacity"
             return
         
-        # Allocation logic:
-        # - P1 cases go to best performing DCA
-        # - P2/P3 use load balancing
-        if case.priority == Priority.P1:
-            selected_dca = dcas[0]  # Best performing
-            reason = f"High priority case assigned to best performing DCA (score: {selected_dca.performance_score})"
-        else:
-            # Load balance - find DCA with lowest active cases
-            selected_dca = min(dcas, key=lambda d: d.active_cases_count)
-            reason = f"Load balanced to DCA with {selected_dca.active_cases_count} active cases"
-        
         # Assign DCA
-        case.dca_id = selected_dca.id
-        case.allocation_reason = reason
+        case.dca_id, case.allocation_reason = allocation
+    
+    @staticmethod
+    def bulk_create_cases(
+        db: Session,
+        rows: Iterable[Tuple[int, Optional[dict]]],
+        user: User,
+        chunk_size: int = 1000
+    ) -> Iterator[BulkImportChunkResult]:
+        """
+        Create cases from a stream of (line_number, row) pairs.
+        
+        Rows are processed in chunks: each chunk is validated, prioritised,
+        scored and allocated in memory, then written with multi-row INSERTs
+        for cases and audit logs and committed on its own. A summary is
+        yielded per chunk so callers can report progress as they go.
+        """
+        rows = iter(rows)
+        chunk_number = 0
+        
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            chunk_number += 1
+            
+            result = CaseService._import_chunk(db, chunk_number, chunk, user)
+            print(
+                f"[BulkImport] Chunk {result.chunk}: {result.created}/{result.received} created, "
+                f"{result.failed} failed in {result.elapsed_ms:.0f}ms"
+            )
+            yield result
+    
+    @staticmethod
+    def _import_chunk(
+        db: Session,
+        chunk_number: int,
+        chunk: List[Tuple[int, Optional[dict]]],
+        user: User
+    ) -> BulkImportChunkResult:
+        """Validate, score, allocate and insert one chunk of imported rows."""
+        started = time.perf_counter()
+        errors: List[BulkImportRowError] = []
+        valid: List[Tuple[int, CaseCreate]] = []
+        
+        for line_number, row in chunk:
+            if row is None:
+                errors.append(BulkImportRowError(line=line_number, error="Malformed record"))
+                continue
+            try:
+                valid.append((line_number, CaseCreate.model_validate(row)))
+            except ValidationError as e:
+                message = "; ".join(
+                    f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                    for err in e.errors()
+                )
+                errors.append(BulkImportRowError(line=line_number, error=message))
+        
+        result = BulkImportChunkResult(
+            chunk=chunk_number,
+            received=len(chunk),
+            created=0,
+            failed=len(errors),
+            elapsed_ms=0.0
+        )
         
-        # Update DCA case count
-        selected_dca.active_cases_count += 1
+        if valid:
+            try:
+                case_ids = CaseService._insert_chunk(db, [data for _, data in valid], user)
+                result.created = len(case_ids)
+                result.first_case_id = case_ids[0]
+                result.last_case_id = case_ids[-1]
+            except Exception as e:
+                db.rollback()
+                result.failed += len(valid)
+                errors.append(BulkImportRowError(
+                    line=valid[0][0],
+                    error=f"Chunk rolled back (lines {valid[0][0]}-{valid[-1][0]}): {e}"
+                ))
+        
+        result.errors = errors[:MAX_REPORTED_ERRORS_PER_CHUNK]
+        result.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        return result
+    
+    @staticmethod
+    def _insert_chunk(db: Session, cases: List[CaseCreate], user: User) -> List[str]:
+        """Insert a validated chunk of cases and their audit logs in one transaction."""
+        case_ids = get_case_id_generator().next_case_ids(db, len(cases))
+        
+        # Score the whole chunk in one vectorized call
+        predictor = get_predictor()
+        scores = predictor.predict_batch(
+            [case_data.overdue_amount for case_data in cases],
+            [case_data.ageing_days for case_data in cases]
+        ).tolist()
+        
+        priorities = [
+            WorkflowEngine.calculate_priority(case_data.overdue_amount, case_data.ageing_days)
+            for case_data in cases
+        ]
+        
+        # Allocate the whole chunk from the capacity index, one count update per DCA
+        allocations = get_dca_capacity_index().allocate_many(
+            db,
+            priorities,
+            [case_data.overdue_amount for case_data in cases]
+        )
+        
+        records = []
+        for case_id, case_data, ai_score, priority, allocation in zip(case_ids, cases, scores, priorities, allocations):
+            sla_due_date = WorkflowEngine.calculate_sla_due_date(priority)
+            
+            record = case_data.model_dump()
+            record.update(
+                case_id=case_id,
+                status=CaseStatus.OPEN,
+                priority=priority,
+                sla_due_date=sla_due_date,
+                sla_status=WorkflowEngine.calculate_sla_status(sla_due_date),
+                ai_recovery_score=ai_score,
+                ai_model_version=predictor.version,
+                dca_id=None,
+                allocation_reason="No available DCA with capacity"
+            )
+            
+            if allocation:
+                record["dca_id"], record["allocation_reason"] = allocation
+            
+            records.append(record)
+        
+        inserted = db.execute(
+            insert(Case).returning(Case.id, Case.case_id, sort_by_parameter_order=True),
+            records
+        ).all()
+        
+        db.execute(insert(AuditLog), [
+            {
+                "user_id": user.id,
+                "case_id": row.id,
+                "action_type": "CREATE_CASE",
+                "description": f"Created case {row.case_id} via bulk import",
+                "new_value": f"Priority: {record['priority']}, Amount: {record['overdue_amount']}"
+            }
+            for row, record in zip(inserted, records)
+        ])
+        
+        apply_counter_deltas(db, case_deltas(
+            (None, (CaseStatus.OPEN, record["sla_status"], record["overdue_amount"])) for record in records
+        ))
+        db.commit()
+        get_event_broker().publish(CaseService._creation_events(
+            SimpleNamespace(**{**record, "id": row.id}) for row, record in zip(inserted, records)
+        ))
+        return [row.case_id for row in inserted]
     
     @staticmethod
     def get_case(db: Session, case_id: int) -> Optional[Case]:
-        """Get case by ID."""
-        return db.query(Case).filter(Case.id == case_id).first()
+        """Get case by ID, with its detail columns."""
+        return db.query(Case).options(undefer_group(CASE_DETAIL_GROUP)).filter(Case.id == case_id).first()
     
     @staticmethod
     def get_case_by_case_id(db: Session, case_id: str) -> Optional[Case]:
-        """Get case by case_id string."""
-        return db.query(Case).filter(Case.case_id == case_id).first()
+        """Get case by case_id string, with its detail columns."""
+        return db.query(Case).options(undefer_group(CASE_DETAIL_GROUP)).filter(Case.case_id == case_id).first()
     
     @staticmethod
     def list_cases(
@@ -128,9 +304,67 @@ class CaseService:
         skip: int = 0,
         limit: int = 100
     ) -> List[Case]:
-        """List cases with optional filters."""
-        query = db.query(Case)
+        """List cases with optional filters, without their detail columns."""
+        query = CaseService._filter_cases(
+            db.query(Case).options(CaseService._summary_dca()), status, priority, sla_status, dca_id
+        )
+        return query.order_by(Case.created_at.desc()).offset(skip).limit(limit).all()
+    
+    @staticmethod
+    def list_cases_page(
+        db: Session,
+        status: Optional[CaseStatus] = None,
+        priority: Optional[Priority] = None,
+        sla_status: Optional[SLAStatus] = None,
+        dca_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Case], Optional[str]]:
+        """
+        List cases newest first, paginated by a cursor on (created_at, id).
+        
+        Unlike skip/limit, a page costs the same however deep it is, and
+        cases created meanwhile do not shift the pages after it. Returns the
+        page and the cursor of the next one (None on the last page); raises
+        ValueError for a malformed cursor.
+        """
+        # SQLite stores datetimes as text, with or without fractional seconds
+        # depending on whether the database or the application set them, and
+        # orders them as text: there the cursor keeps that text, so comparing
+        # against it agrees with the ordering and can use ix_cases_created_at_id
+        as_text = db.get_bind().dialect.name == "sqlite"
+        stored_created_at = type_coerce(Case.created_at, String) if as_text else Case.created_at
+        query = CaseService._filter_cases(
+            db.query(Case, stored_created_at).options(CaseService._summary_dca()), status, priority, sla_status, dca_id
+        )
         
+        if cursor:
+            after_created_at, after_id = CaseService._decode_cursor(cursor, as_text)
+            query = query.filter(
+                tuple_(Case.created_at, Case.id) < tuple_(literal(after_created_at, stored_created_at.type), after_id)
+            )
+        
+        # One extra row tells whether there is a next page
+        rows = query.order_by(Case.created_at.desc(), Case.id.desc()).limit(limit + 1).all()
+        cases = [case for case, _ in rows[:limit]]
+        if len(rows) <= limit:
+            return cases, None
+        return cases, CaseService._encode_cursor(*rows[limit - 1])
+    
+    @staticmethod
+    def _summary_dca():
+        """Loader option for the DCA columns a case summary shows, fetched in the same query."""
+        return joinedload(Case.dca).load_only(DCA.id, DCA.name)
+    
+    @staticmethod
+    def _filter_cases(
+        query,
+        status: Optional[CaseStatus] = None,
+        priority: Optional[Priority] = None,
+        sla_status: Optional[SLAStatus] = None,
+        dca_id: Optional[int] = None
+    ):
+        """Apply the case listing filters to a query."""
         if status:
             query = query.filter(Case.status == status)
         if priority:
@@ -139,8 +373,25 @@ class CaseService:
             query = query.filter(Case.sla_status == sla_status)
         if dca_id:
             query = query.filter(Case.dca_id == dca_id)
-        
-        return query.order_by(Case.created_at.desc()).offset(skip).limit(limit).all()
+        return query
+    
+    @staticmethod
+    def _encode_cursor(case: Case, created_at) -> str:
+        """Opaque cursor for the cases after `case`."""
+        if isinstance(created_at, datetime):
+            created_at = created_at.isoformat()
+        raw = json.dumps([created_at, case.id])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str, as_text: bool = False) -> Tuple[Any, int]:
+        """(created_at, id) from a cursor made by _encode_cursor; created_at is a datetime unless as_text."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            created_at, case_id = json.loads(raw)
+            return (str(created_at) if as_text else datetime.fromisoformat(created_at)), int(case_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError("Invalid cursor") from e
     
     @staticmethod
     def update_case_status(
@@ -166,11 +417,7 @@ class CaseService:
         if notes:
             case.notes = f"{case.notes}\n{notes}" if case.notes else notes
         
-        # Update DCA case count if closing
-        if new_status == CaseStatus.CLOSED and case.dca_id:
-            dca = db.query(DCA).filter(DCA.id == case.dca_id).first()
-            if dca:
-                dca.active_cases_count = max(0, dca.active_cases_count - 1)
+        closed_dca = CaseService.record_closure(db, case) if new_status == CaseStatus.CLOSED else None
         
         # Create audit log
         AuditLog.create_log(
@@ -183,23 +430,248 @@ class CaseService:
             new_value=new_status.value
         )
         
+        apply_counter_deltas(db, case_deltas([
+            ((old_status, case.sla_status, case.overdue_amount), (new_status, case.sla_status, case.overdue_amount))
+        ]))
         db.commit()
         db.refresh(case)
+        if closed_dca:
+            get_dca_capacity_index().refresh([closed_dca])
+        if new_status != old_status:
+            get_event_broker().publish([case_event("case.status_changed", case, status=old_status)])
         return case
     
     @staticmethod
-    def update_sla_statuses(db: Session):
-        """Batch update SLA statuses for all open cases."""
-        cases = db.query(Case).filter(
-            Case.status.in_([CaseStatus.OPEN, CaseStatus.IN_PROGRESS])
-        ).all()
-        
-        for case in cases:
-            new_sla_status = WorkflowEngine.calculate_sla_status(case.sla_due_date)
-            if case.sla_status != new_sla_status:
-                case.sla_status = new_sla_status
-        
+    def record_closure(db: Session, case: Case) -> Optional[DCA]:
+        """
+        Bookkeeping for a case just set to CLOSED; the caller commits.
+        
+        Stamps completed_at, adds the case to its DCA's performance
+        aggregates, refreshes the DCA's score and releases its capacity
+        slot. Does nothing for a case already completed. Returns the DCA,
+        to refresh in the allocation index after the commit, or None.
+        """
+        if case.completed_at:
+            return None
+        case.completed_at = datetime.now(timezone.utc)
+        
+        dca = db.get(DCA, case.dca_id) if case.dca_id else None
+        if dca is None:
+            return None
+        
+        dca.total_cases_completed = DCA.total_cases_completed + 1
+        record_case_completion(db, dca, case)
+        dca.performance_score = calculate_dca_performance_score(dca, db)
+        get_dca_capacity_index().release(db, dca.id)
+        return dca
+    
+    @staticmethod
+    def update_sla_statuses(db: Session, set_based: bool = False, chunk_size: int = 10000) -> SLAStatusRefreshResult:
+        """
+        Batch update SLA statuses for all open cases.
+        
+        By default each open case is loaded and checked in Python. With
+        set_based, statuses are computed in SQL instead: for each primary
+        key range of chunk_size cases, one UPDATE per current status sets
+        the new status where it differs, and the range is committed. No
+        cases are loaded, so memory does not grow with the number of open
+        cases.
+        """
+        started = time.perf_counter()
+        transitions: Counter = Counter()
+        
+        if set_based:
+            chunks = CaseService._update_sla_statuses_in_sql(db, transitions, chunk_size)
+        else:
+            chunks = 1
+            cases = db.query(Case).filter(
+                Case.status.in_([CaseStatus.OPEN, CaseStatus.IN_PROGRESS])
+            ).all()
+            
+            events = []
+            changes = []
+            for case in cases:
+                old_sla_status = case.sla_status
+                new_sla_status = WorkflowEngine.calculate_sla_status(case.sla_due_date)
+                if old_sla_status != new_sla_status:
+                    transitions[(old_sla_status, new_sla_status)] += 1
+                    case.sla_status = new_sla_status
+                    events.append(case_event("case.sla_changed", case, sla_status=old_sla_status))
+                    changes.append(((case.status, old_sla_status, 0.0), (case.status, new_sla_status, 0.0)))
+            
+            # Only SLA statuses changed, so amounts cancel out
+            apply_counter_deltas(db, case_deltas(changes))
+            db.commit()
+            get_event_broker().publish(events)
+        
+        result = SLAStatusRefreshResult(
+            set_based=set_based,
+            updated=sum(transitions.values()),
+            transitions=[
+                SLATransitionCount(from_status=old, to_status=new, count=count)
+                for (old, new), count in transitions.items()
+            ],
+            chunks=chunks,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2)
+        )
+        print(f"[SLA] Updated {result.updated} SLA statuses in {result.elapsed_ms:.0f}ms")
+        return result
+    
+    @staticmethod
+    def _update_sla_statuses_in_sql(db: Session, transitions: Counter, chunk_size: int) -> int:
+        """Set-based mode of update_sla_statuses; counts into `transitions` and returns the number of chunks."""
+        now = datetime.now(timezone.utc)
+        open_cases = (
+            Case.status.in_([CaseStatus.OPEN, CaseStatus.IN_PROGRESS]),
+            Case.sla_due_date.isnot(None),
+        )
+        first, last = db.query(func.min(Case.id), func.max(Case.id)).filter(*open_cases).one()
+        if first is None:
+            return 0
+        
+        new_status = CaseService._sla_status_sql(Case.sla_due_date, now)
+        chunks = 0
+        for start in range(first, last + 1, chunk_size):
+            in_chunk = (Case.id.between(start, start + chunk_size - 1), *open_cases)
+            
+            changes = CaseService._set_sla_statuses(db, in_chunk, new_status)
+            for old, row in changes:
+                transitions[(old, row.sla_status)] += 1
+            
+            CaseService._apply_sla_deltas(db, changes)
+            db.commit()
+            chunks += 1
+            get_event_broker().publish(
+                case_event("case.sla_changed", row, sla_status=old) for old, row in changes
+            )
+        
+        return chunks
+    
+    @staticmethod
+    def refresh_sla_statuses(db: Session, *criteria, now: Optional[datetime] = None) -> int:
+        """
+        Recompute in SQL the SLA status of the open cases matching `criteria`
+        and commit. Only rows whose status changes are written. Returns the
+        number of cases updated.
+        """
+        new_status = CaseService._sla_status_sql(Case.sla_due_date, now or datetime.now(timezone.utc))
+        changes = CaseService._set_sla_statuses(db, (*criteria, Case.sla_due_date.isnot(None)), new_status)
+        CaseService._apply_sla_deltas(db, changes)
         db.commit()
+        get_event_broker().publish(case_event("case.sla_changed", row, sla_status=old) for old, row in changes)
+        return len(changes)
+    
+    @staticmethod
+    def reschedule_sla_due_dates(db: Session, sla_days: Dict[Priority, int], chunk_size: int = 5000) -> int:
+        """
+        Recalculate SLA due dates and statuses of open cases after the SLA
+        days setting changed for some priorities.
+        
+        Due dates become created_at + the new SLA days. They are computed in
+        SQL by UPDATEs over primary key ranges of chunk_size cases, each
+        committed on its own, so no cases are loaded and locks stay short.
+        Returns the number of cases updated.
+        """
+        if not sla_days:
+            return 0
+        
+        now = datetime.now(timezone.utc)
+        open_cases = (
+            Case.status.in_([CaseStatus.OPEN, CaseStatus.IN_PROGRESS]),
+            Case.created_at.isnot(None),
+        )
+        first, last = db.query(func.min(Case.id), func.max(Case.id)).filter(
+            Case.priority.in_(list(sla_days)), *open_cases
+        ).one()
+        if first is None:
+            return 0
+        
+        updated = 0
+        for start in range(first, last + 1, chunk_size):
+            changes = []
+            for priority, days in sla_days.items():
+                due = CaseService._sla_due_date_sql(db, days)
+                changes += CaseService._set_sla_statuses(
+                    db,
+                    (Case.id.between(start, start + chunk_size - 1), Case.priority == priority, *open_cases),
+                    CaseService._sla_status_sql(due, now),
+                    sla_due_date=due
+                )
+            # After every UPDATE of the chunk: case rows are locked before the counters row
+            CaseService._apply_sla_deltas(db, changes)
+            db.commit()
+            
+            updated += len(changes)
+            get_event_broker().publish(
+                case_event("case.sla_changed", row, sla_status=old) for old, row in changes if row.sla_status != old
+            )
+        
+        print(f"[SLA] Rescheduled {updated} open cases for {', '.join(p.value for p in sla_days)}")
+        return updated
+    
+    @staticmethod
+    def _set_sla_statuses(db: Session, criteria, new_status, **values) -> List[Tuple[Optional[SLAStatus], Any]]:
+        """
+        Set sla_status to `new_status` (a SQL expression), and any other
+        `values`, on the open cases matching `criteria`.
+        
+        Runs one UPDATE per current SLA status so every returned row's
+        transition is known; without other values, only cases whose status
+        changes are written. The caller applies the dashboard counter deltas
+        (_apply_sla_deltas) after its last case UPDATE, and commits. Returns
+        (previous SLA status, updated row) pairs.
+        """
+        changes = []
+        for old in (*SLAStatus, None):
+            if old is None:
+                current = Case.sla_status.is_(None)
+            elif values:
+                current = Case.sla_status == old
+            else:
+                current = (Case.sla_status == old) & (new_status != literal(old, Case.sla_status.type))
+            
+            rows = db.execute(
+                update(Case)
+                .where(current, Case.status.in_([CaseStatus.OPEN, CaseStatus.IN_PROGRESS]), *criteria)
+                .values(sla_status=new_status, **values)
+                .returning(*CaseService._EVENT_COLUMNS)
+                .execution_options(synchronize_session=False)
+            ).all()
+            changes.extend((old, row) for row in rows)
+        
+        return changes
+    
+    @staticmethod
+    def _apply_sla_deltas(db: Session, changes: List[Tuple[Optional[SLAStatus], Any]]):
+        """
+        Dashboard counter deltas of _set_sla_statuses changes. Call after the
+        transaction's case UPDATEs, so it locks case rows before the counters
+        row, like every other case write.
+        """
+        # Only SLA statuses changed, so amounts cancel out
+        apply_counter_deltas(db, case_deltas(
+            ((row.status, old, 0.0), (row.status, row.sla_status, 0.0)) for old, row in changes
+        ))
+    
+    @staticmethod
+    def _sla_due_date_sql(db: Session, sla_days: int):
+        """WorkflowEngine.calculate_sla_due_date from created_at, as a SQL expression."""
+        if db.get_bind().dialect.name == "postgresql":
+            return Case.created_at + timedelta(days=sla_days)
+        # SQLite stores datetimes as text; keep the fractional seconds
+        return type_coerce(func.strftime("%Y-%m-%d %H:%M:%f", Case.created_at, f"+{sla_days} days"), DateTime)
+    
+    @staticmethod
+    def _sla_status_sql(due, now: datetime):
+        """WorkflowEngine.calculate_sla_status for a due date expression, as a SQL expression."""
+        def status(value: SLAStatus):
+            return literal(value, Case.sla_status.type)
+        
+        return sql_case(
+            (due < now, status(SLAStatus.BREACHED)),
+            (due < now + timedelta(hours=24), status(SLAStatus.AT_RISK)),
+            else_=status(SLAStatus.ON_TRACK)
+        )
     
     @staticmethod
     def escalate_case(db: Session, case_id: int, user: User, reason: str) -> Case:
@@ -224,67 +696,8 @@ class CaseService:
     
     @staticmethod
     def get_dashboard_stats(db: Session) -> DashboardStats:
-        """Get dashboard statistics."""
-        # Total overdue amount
-        total_overdue = db.query(func.sum(Case.overdue_amount)).filter(
-            Case.status != CaseStatus.CLOSED
-        ).scalar() or 0
-        
-        # Total cases
-        total_cases = db.query(Case).count()
-        
-        # Cases by status
-        open_cases = db.query(Case).filter(Case.status == CaseStatus.OPEN).count()
-        in_progress_cases = db.query(Case).filter(Case.status == CaseStatus.IN_PROGRESS).count()
-        closed_cases = db.query(Case).filter(Case.status == CaseStatus.CLOSED).count()
-        
-        # Pending cases (OPEN + IN_PROGRESS)
-        pending_cases = open_cases + in_progress_cases
-        
-        # Rejected cases - cases that were unassigned from DCA
-        # For now, we'll approximate this as cases that had dca_id but now don't (or track separately)
-        rejected_cases = 0  # Can be enhanced with proper tracking
-        
-        # Amount calculations
-        pending_amount = db.query(func.sum(Case.overdue_amount)).filter(
-            Case.status.in_([CaseStatus.OPEN, CaseStatus.IN_PROGRESS])
-        ).scalar() or 0
-        
-        recovered_amount = db.query(func.sum(Case.overdue_amount)).filter(
-            Case.status == CaseStatus.CLOSED
-        ).scalar() or 0
-        
-        # SLA breach count
-        sla_breach_count = db.query(Case).filter(
-            Case.sla_status == SLAStatus.BREACHED,
-            Case.status != CaseStatus.CLOSED
-        ).count()
-        
-        # At risk count
-        at_risk_count = db.query(Case).filter(
-            Case.sla_status == SLAStatus.AT_RISK,
-            Case.status != CaseStatus.CLOSED
-        ).count()
-        
-        # DCA stats
-        total_dcas = db.query(DCA).count()
-        active_dcas = db.query(DCA).filter(DCA.is_active == True).count()
-        
-        return DashboardStats(
-            total_overdue_amount=float(total_overdue),
-            total_cases=total_cases,
-            open_cases=open_cases,
-            in_progress_cases=in_progress_cases,
-            closed_cases=closed_cases,
-            sla_breach_count=sla_breach_count,
-            at_risk_count=at_risk_count,
-            total_dcas=total_dcas,
-            active_dcas=active_dcas,
-            rejected_cases=rejected_cases,
-            pending_cases=pending_cases,
-            pending_amount=float(pending_amount),
-            recovered_amount=float(recovered_amount)
-        )
+        """Get dashboard statistics, from the incrementally maintained counters."""
+        return read_dashboard_stats(db)
 
 
 # Add helper method to AuditLog model
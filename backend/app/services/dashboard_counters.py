@@ -0,0 +1,298 @@
+"""
+Dashboard Counters
+
+GET /api/v1/dashboard reads one precomputed row (DashboardCounters)
+instead of aggregating over cases. Every transaction that creates a case,
+changes its status or SLA status, or adds or (de)activates a DCA adds the
+resulting deltas to that row just before it commits, with an atomic
+`column = column + delta` UPDATE, so the figures change together with the
+data they describe.
+
+Changes that bypass these hooks (bulk deletes, reseeding, direct SQL) are
+corrected by reconciliation: DashboardCountersJob runs it every
+DASHBOARD_COUNTERS_RECONCILE_SECONDS in one worker, and it also runs after
+reseeding and on demand. Reading the dashboard never aggregates unless the
+row is missing. Reconciliation reads the aggregates and the row in one
+statement and adds the difference as a delta, so it holds no lock while
+scanning cases, and deltas committed meanwhile are neither lost nor
+counted twice.
+"""
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case as sql_case, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Case, CaseStatus, DCA, DashboardCounters, SLAStatus
+from app.schemas import DashboardStats
+from app.services.leader_lock import LeaderLock
+
+COUNTERS_ID = 1
+
+# Application-wide key of the reconciliation job's advisory lock ("DCR")
+ADVISORY_LOCK_KEY = 0x444352
+
+COUNTER_COLUMNS = (
+    "total_cases",
+    "open_cases",
+    "in_progress_cases",
+    "closed_cases",
+    "sla_breach_count",
+    "at_risk_count",
+    "total_overdue_amount",
+    "pending_amount",
+    "recovered_amount",
+    "total_dcas",
+    "active_dcas",
+)
+
+# (status, sla_status, overdue_amount) of a case, or None before it exists
+CaseFigures = Optional[Tuple[Optional[CaseStatus], Optional[SLAStatus], float]]
+
+
+def case_contribution(figures: CaseFigures) -> Dict[str, float]:
+    """What one case adds to the counters."""
+    if figures is None:
+        return {}
+    
+    status, sla_status, amount = figures
+    counters = {"total_cases": 1}
+    if status == CaseStatus.CLOSED:
+        counters["closed_cases"] = 1
+        counters["recovered_amount"] = amount
+    elif status in (CaseStatus.OPEN, CaseStatus.IN_PROGRESS):
+        counters["open_cases" if status == CaseStatus.OPEN else "in_progress_cases"] = 1
+        counters["total_overdue_amount"] = counters["pending_amount"] = amount
+        if sla_status == SLAStatus.BREACHED:
+            counters["sla_breach_count"] = 1
+        elif sla_status == SLAStatus.AT_RISK:
+            counters["at_risk_count"] = 1
+    return counters
+
+
+def case_deltas(changes: Iterable[Tuple[CaseFigures, CaseFigures]]) -> Dict[str, float]:
+    """Counter deltas for the (before, after) figures of changed cases."""
+    deltas = defaultdict(int)
+    for before, after in changes:
+        for name, value in case_contribution(after).items():
+            deltas[name] += value
+        for name, value in case_contribution(before).items():
+            deltas[name] -= value
+    return deltas
+
+
+def dca_deltas(was_active: Optional[bool], is_active: Optional[bool]) -> Dict[str, int]:
+    """Counter deltas for a DCA created (was_active None) or (de)activated."""
+    return {"total_dcas": int(was_active is None), "active_dcas": int(bool(is_active)) - int(bool(was_active))}
+
+
+def apply_counter_deltas(db: Session, deltas: Dict[str, float]):
+    """
+    Add deltas to the counters in the caller's transaction.
+    
+    Call right before committing: the row stays locked until then. The
+    session's pending changes are flushed first, so every transaction
+    locks the case and DCA rows it changes before the counters row, and
+    two writers can't wait on each other's rows. A missing row is left
+    alone; the next read reconciles it.
+    """
+    db.flush()
+    values = {
+        name: getattr(DashboardCounters, name) + delta
+        for name, delta in deltas.items() if delta
+    }
+    if values:
+        db.execute(update(DashboardCounters).where(DashboardCounters.id == COUNTERS_ID).values(values))
+
+
+def read_dashboard_stats(db: Session) -> DashboardStats:
+    """Dashboard statistics from the counters row, creating it first if missing."""
+    counters = db.get(DashboardCounters, COUNTERS_ID, populate_existing=True)
+    if counters is None:
+        counters = reconcile_dashboard_counters(db)
+    
+    return DashboardStats(
+        total_overdue_amount=float(counters.total_overdue_amount),
+        total_cases=counters.total_cases,
+        open_cases=counters.open_cases,
+        in_progress_cases=counters.in_progress_cases,
+        closed_cases=counters.closed_cases,
+        sla_breach_count=counters.sla_breach_count,
+        at_risk_count=counters.at_risk_count,
+        total_dcas=counters.total_dcas,
+        active_dcas=counters.active_dcas,
+        # Rejections are not tracked per case yet
+        rejected_cases=0,
+        # Pending cases (OPEN + IN_PROGRESS)
+        pending_cases=counters.open_cases + counters.in_progress_cases,
+        pending_amount=float(counters.pending_amount),
+        recovered_amount=float(counters.recovered_amount)
+    )
+
+
+def reconcile_dashboard_counters(db: Session) -> DashboardCounters:
+    """
+    Correct the counters row from cases and DCAs, and commit.
+    
+    Each aggregate query also reads the row's current values, so both
+    sides see the same committed transactions and their difference is
+    exactly the drift. Adding it leaves deltas committed since in place;
+    a counter nobody changed meanwhile is set to the aggregate as is.
+    """
+    # Make sure the row exists
+    insert = (postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert)(DashboardCounters)
+    db.execute(insert.values(id=COUNTERS_ID).on_conflict_do_nothing(index_elements=[DashboardCounters.id]))
+    db.commit()
+    
+    cases, dcas = _aggregate(db, with_counters=True)
+    values = {}
+    for row in (cases, dcas):
+        for name, actual in row._asdict().items():
+            if name.startswith("counted_"):
+                continue
+            column, counted = getattr(DashboardCounters, name), getattr(row, "counted_" + name)
+            values[name] = sql_case((column == counted, actual), else_=column + (actual - counted))
+    
+    values["reconciled_at"] = datetime.now(timezone.utc)
+    db.execute(update(DashboardCounters).where(DashboardCounters.id == COUNTERS_ID).values(values))
+    db.commit()
+    
+    return db.get(DashboardCounters, COUNTERS_ID, populate_existing=True)
+
+
+def aggregate_dashboard_stats(db: Session) -> DashboardStats:
+    """
+    Dashboard statistics computed from the tables.
+    
+    Two queries: one pass over cases with a filtered aggregate per figure,
+    and one over DCAs.
+    """
+    cases, dcas = _aggregate(db)
+    
+    return DashboardStats(
+        total_overdue_amount=float(cases.total_overdue_amount),
+        total_cases=cases.total_cases,
+        open_cases=cases.open_cases,
+        in_progress_cases=cases.in_progress_cases,
+        closed_cases=cases.closed_cases,
+        sla_breach_count=cases.sla_breach_count,
+        at_risk_count=cases.at_risk_count,
+        total_dcas=dcas.total_dcas,
+        active_dcas=dcas.active_dcas,
+        # Rejections are not tracked per case yet
+        rejected_cases=0,
+        # Pending cases (OPEN + IN_PROGRESS)
+        pending_cases=cases.open_cases + cases.in_progress_cases,
+        pending_amount=float(cases.pending_amount),
+        recovered_amount=float(cases.recovered_amount)
+    )
+
+
+def _aggregate(db: Session, with_counters: bool = False):
+    """
+    The case and DCA aggregate rows, labelled like the counter columns.
+    
+    With with_counters, each row also has the counters row's current
+    value of every figure in it, as counted_<name>.
+    """
+    open_statuses = [CaseStatus.OPEN, CaseStatus.IN_PROGRESS]
+    not_closed = Case.status != CaseStatus.CLOSED
+    
+    def amount(condition):
+        return func.coalesce(func.sum(Case.overdue_amount).filter(condition), 0)
+    
+    def count(condition):
+        return func.count().filter(condition)
+    
+    def with_counted(*columns):
+        if not with_counters:
+            return columns
+        return columns + tuple(
+            select(getattr(DashboardCounters, column.name))
+            .where(DashboardCounters.id == COUNTERS_ID)
+            .scalar_subquery()
+            .label("counted_" + column.name)
+            for column in columns
+        )
+    
+    cases = db.execute(
+        select(*with_counted(
+            amount(not_closed).label("total_overdue_amount"),
+            func.count().label("total_cases"),
+            count(Case.status == CaseStatus.OPEN).label("open_cases"),
+            count(Case.status == CaseStatus.IN_PROGRESS).label("in_progress_cases"),
+            count(Case.status == CaseStatus.CLOSED).label("closed_cases"),
+            amount(Case.status.in_(open_statuses)).label("pending_amount"),
+            amount(Case.status == CaseStatus.CLOSED).label("recovered_amount"),
+            count((Case.sla_status == SLAStatus.BREACHED) & not_closed).label("sla_breach_count"),
+            count((Case.sla_status == SLAStatus.AT_RISK) & not_closed).label("at_risk_count")
+        )).select_from(Case)
+    ).one()
+    
+    dcas = db.execute(
+        select(*with_counted(
+            func.count().label("total_dcas"),
+            func.count().filter(DCA.is_active == True).label("active_dcas")
+        )).select_from(DCA)
+    ).one()
+    
+    return cases, dcas
+
+
+class DashboardCountersJob:
+    """Background thread reconciling the dashboard counters in the leading worker."""
+    
+    def __init__(self, interval_seconds: float = 300.0, leader_retry_seconds: float = 30.0):
+        self.interval_seconds = interval_seconds
+        self.leader_retry_seconds = leader_retry_seconds
+        self._leader = LeaderLock(ADVISORY_LOCK_KEY, "DashboardCounters")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the job thread (no-op if already running)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dashboard-counters", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5.0):
+        """Stop the thread and give up leadership."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._leader.release()
+    
+    def _run(self):
+        # Startup already reconciled: wait one interval first
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                while not self._leader.acquire():
+                    if self._stop.wait(self.leader_retry_seconds):
+                        return
+                
+                db = SessionLocal()
+                try:
+                    reconcile_dashboard_counters(db)
+                finally:
+                    db.close()
+            except Exception as e:
+                print(f"[DashboardCounters] Reconciliation failed: {e}")
+                self._leader.release()
+
+
+_job: Optional[DashboardCountersJob] = None
+
+
+def get_dashboard_counters_job() -> DashboardCountersJob:
+    """Get this worker's dashboard counters reconciliation job."""
+    global _job
+    if _job is None:
+        _job = DashboardCountersJob(interval_seconds=settings.DASHBOARD_COUNTERS_RECONCILE_SECONDS)
+    return _job
@@ -0,0 +1,381 @@
+"""
+Dashboard Daily Rollups
+
+Trend charts read DashboardDailyRollup rows, a few hundred per day at
+most, instead of rescanning cases for every point. Each row holds the
+number and overdue amount of the cases in one combination of status,
+priority, SLA status and DCA at the end of a UTC day, plus how many of
+them were created or closed that day.
+
+Rows come from two places:
+- Today's rows are a snapshot of the live cases (one GROUP BY), refreshed
+  every DASHBOARD_ROLLUP_INTERVAL_SECONDS by DashboardRollupJob, so a
+  finished day keeps its last refresh before midnight. The job runs in
+  one worker only, elected like the SLA scheduler (see LeaderLock).
+- Days without rows (history, or downtime) are reconstructed from
+  created_at, completed_at and sla_due_date in a single pass over cases:
+  each case contributes a handful of dated state changes, and running
+  totals turn those into per-day rows. Cases are taken to have their
+  current priority and DCA throughout, and to be in their current status
+  until closed (Open, if since closed); SLA statuses are recomputed from
+  the due date for each day. A case closed without a completed_at is
+  taken to have closed at its last update.
+
+Writers hold a transaction-level advisory lock on PostgreSQL while they
+replace a day range, so the job and manual backfills (maintenance
+command, data resets) queue up instead of duplicating rows.
+"""
+import threading
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Case, CaseStatus, DashboardDailyRollup, Priority, SLAStatus
+from app.schemas import DashboardTrendPoint
+from app.services.leader_lock import LeaderLock
+
+# Application-wide key of the rollup writers' advisory lock ("DRU")
+ADVISORY_LOCK_KEY = 0x445255
+
+# Application-wide key of the rollup job's leadership lock ("DRJ")
+LEADER_LOCK_KEY = 0x44524A
+
+AT_RISK_BEFORE_DUE = timedelta(hours=24)
+
+INSERT_BATCH_SIZE = 5000
+
+# Case columns the group_by parameter of trend queries can name
+GROUP_BY_COLUMNS = {
+    "status": DashboardDailyRollup.status,
+    "priority": DashboardDailyRollup.priority,
+    "sla_status": DashboardDailyRollup.sla_status,
+    "dca_id": DashboardDailyRollup.dca_id,
+}
+
+# (status, priority, sla_status, dca_id) of a group of cases
+GroupKey = Tuple[CaseStatus, Optional[Priority], Optional[SLAStatus], Optional[int]]
+
+
+def snapshot_today(db: Session) -> int:
+    """Replace today's (UTC) rows with the live case figures, and commit."""
+    day = _utcnow().date()
+    day_start = _day_start(day)
+    
+    groups = db.execute(
+        select(
+            Case.status,
+            Case.priority,
+            Case.sla_status,
+            Case.dca_id,
+            func.count().label("case_count"),
+            func.coalesce(func.sum(Case.overdue_amount), 0.0).label("overdue_amount"),
+            func.count().filter(Case.created_at >= day_start).label("created_count"),
+            func.count().filter(_closed_at() >= day_start, Case.status == CaseStatus.CLOSED).label("closed_count")
+        )
+        .where(Case.status.isnot(None))
+        .group_by(Case.status, Case.priority, Case.sla_status, Case.dca_id)
+    ).all()
+    
+    rows = [{"day": day, **group._asdict()} for group in groups]
+    _replace_days(db, day, day, rows)
+    return len(rows)
+
+
+def backfill_rollups(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """
+    Reconstruct and replace the rows of days `start` to `end` (default: the
+    first case's creation day to yesterday) in one pass over cases, and commit.
+    """
+    end = end or _utcnow().date() - timedelta(days=1)
+    if start is None:
+        first_created = db.scalar(select(func.min(Case.created_at)))
+        if first_created is None:
+            return 0
+        start = _as_utc(first_created).date()
+    if start > end:
+        return 0
+    
+    # Per day: changes to each group's (case count, overdue amount), and cases created / closed
+    changes: Dict[date, Dict[GroupKey, List[float]]] = defaultdict(lambda: defaultdict(lambda: [0, 0.0, 0, 0]))
+    
+    cases = db.execute(
+        select(
+            Case.status,
+            Case.priority,
+            Case.sla_status,
+            Case.dca_id,
+            Case.overdue_amount,
+            Case.sla_due_date,
+            Case.created_at,
+            Case.completed_at,
+            Case.updated_at
+        )
+        .where(Case.status.isnot(None), Case.created_at.isnot(None))
+        .execution_options(yield_per=10000)
+    )
+    for case in cases:
+        timeline = _case_timeline(case)
+        created_day = timeline[0][0]
+        if created_day > end:
+            continue
+        
+        previous = None
+        for day, key in timeline:
+            if day > end:
+                break
+            counted = changes[max(day, start)]
+            if previous is not None:
+                counted[previous][0] -= 1
+                counted[previous][1] -= case.overdue_amount
+            counted[key][0] += 1
+            counted[key][1] += case.overdue_amount
+            previous = key
+        
+        # Flows are counted against the case's group at the end of that day
+        if created_day >= start:
+            changes[created_day][_key_at(timeline, created_day)][2] += 1
+        closed_day = timeline[-1][0] if timeline[-1][1][0] == CaseStatus.CLOSED else None
+        if closed_day is not None and start <= closed_day <= end:
+            changes[closed_day][timeline[-1][1]][3] += 1
+    
+    rows = []
+    totals: Dict[GroupKey, List[float]] = defaultdict(lambda: [0, 0.0])
+    day = start
+    while day <= end:
+        day_changes = changes.pop(day, {})
+        for key, (count, amount, _, _) in day_changes.items():
+            totals[key][0] += count
+            totals[key][1] += amount
+        
+        for key in [key for key, (count, _) in totals.items() if count == 0]:
+            del totals[key]
+        for key, (count, amount) in totals.items():
+            flows = day_changes.get(key, (0, 0.0, 0, 0))
+            status, priority, sla_status, dca_id = key
+            rows.append({
+                "day": day,
+                "status": status,
+                "priority": priority,
+                "sla_status": sla_status,
+                "dca_id": dca_id,
+                "case_count": count,
+                "overdue_amount": round(amount, 2),
+                "created_count": flows[2],
+                "closed_count": flows[3],
+            })
+        day += timedelta(days=1)
+    
+    _replace_days(db, start, end, rows)
+    return len(rows)
+
+
+def rollup_trends(
+    db: Session,
+    start: date,
+    end: date,
+    group_by: Optional[str] = None,
+    dca_ids: Optional[Sequence[int]] = None,
+    priorities: Optional[Sequence[Priority]] = None
+) -> List[DashboardTrendPoint]:
+    """Dashboard figures per day from `start` to `end`, optionally per value of one dimension."""
+    open_statuses = [CaseStatus.OPEN, CaseStatus.IN_PROGRESS]
+    rollup = DashboardDailyRollup
+    not_closed = rollup.status != CaseStatus.CLOSED
+    
+    def cases(condition=None):
+        total = func.sum(rollup.case_count)
+        return func.coalesce(total if condition is None else total.filter(condition), 0)
+    
+    def amount(condition):
+        return func.coalesce(func.sum(rollup.overdue_amount).filter(condition), 0.0)
+    
+    dimensions = [rollup.day]
+    if group_by is not None:
+        dimensions.append(GROUP_BY_COLUMNS[group_by].label("group"))
+    
+    query = (
+        select(
+            *dimensions,
+            cases().label("total_cases"),
+            cases(rollup.status == CaseStatus.OPEN).label("open_cases"),
+            cases(rollup.status == CaseStatus.IN_PROGRESS).label("in_progress_cases"),
+            cases(rollup.status == CaseStatus.CLOSED).label("closed_cases"),
+            cases((rollup.sla_status == SLAStatus.BREACHED) & not_closed).label("sla_breach_count"),
+            cases((rollup.sla_status == SLAStatus.AT_RISK) & not_closed).label("at_risk_count"),
+            amount(not_closed).label("total_overdue_amount"),
+            amount(rollup.status.in_(open_statuses)).label("pending_amount"),
+            amount(rollup.status == CaseStatus.CLOSED).label("recovered_amount"),
+            func.coalesce(func.sum(rollup.created_count), 0).label("created_cases"),
+            func.coalesce(func.sum(rollup.closed_count), 0).label("closed_that_day")
+        )
+        .where(rollup.day.between(start, end))
+        .group_by(*dimensions)
+        .order_by(*dimensions)
+    )
+    if dca_ids:
+        query = query.where(rollup.dca_id.in_(dca_ids))
+    if priorities:
+        query = query.where(rollup.priority.in_(priorities))
+    
+    points = []
+    for row in db.execute(query):
+        point = row._asdict()
+        if "group" in point:
+            point["group"] = getattr(point["group"], "value", point["group"])
+        points.append(DashboardTrendPoint(**point))
+    return points
+
+
+def _case_timeline(case) -> List[Tuple[date, GroupKey]]:
+    """
+    The days on which a case's group changes, and its group from then on,
+    starting with the day it was created. Several changes on one day all
+    stay in the list; the last one is the group at the end of that day.
+    """
+    created_at = _as_utc(case.created_at)
+    closed_at = None
+    if case.status == CaseStatus.CLOSED:
+        closed_moment = case.completed_at or case.updated_at
+        closed_at = max(_as_utc(closed_moment), created_at) if closed_moment else created_at
+    open_status = CaseStatus.OPEN if closed_at else case.status
+    
+    def key(status, sla_status):
+        return (status, case.priority, sla_status, case.dca_id)
+    
+    if case.sla_due_date is None:
+        timeline = [(created_at, key(open_status, case.sla_status))]
+    else:
+        due = _as_utc(case.sla_due_date)
+        at_risk_from = due - AT_RISK_BEFORE_DUE
+        
+        def sla_status_at(moment):
+            if moment > due:
+                return SLAStatus.BREACHED
+            if moment > at_risk_from:
+                return SLAStatus.AT_RISK
+            return SLAStatus.ON_TRACK
+        
+        timeline = [(created_at, key(open_status, sla_status_at(created_at)))]
+        for boundary, sla_status in ((at_risk_from, SLAStatus.AT_RISK), (due, SLAStatus.BREACHED)):
+            if created_at < boundary and (closed_at is None or boundary < closed_at):
+                timeline.append((boundary, key(open_status, sla_status)))
+    
+    if closed_at:
+        # SLA statuses stop moving when a case is closed
+        timeline.append((closed_at, key(CaseStatus.CLOSED, case.sla_status)))
+    
+    return [(moment.date(), group) for moment, group in timeline]
+
+
+def _closed_at():
+    """When a closed case closed, in SQL: completed_at, else its last update."""
+    return func.coalesce(Case.completed_at, Case.updated_at)
+
+
+def _key_at(timeline: List[Tuple[date, GroupKey]], day: date) -> GroupKey:
+    """The group at the end of `day` (which must be on or after the first day)."""
+    return [key for change_day, key in timeline if change_day <= day][-1]
+
+
+def _replace_days(db: Session, start: date, end: date, rows: List[dict]):
+    """Swap the rows of days `start` to `end` for `rows` in one transaction, and commit."""
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        db.execute(delete(DashboardDailyRollup).where(DashboardDailyRollup.day.between(start, end)))
+        for i in range(0, len(rows), INSERT_BATCH_SIZE):
+            db.execute(insert(DashboardDailyRollup), rows[i:i + INSERT_BATCH_SIZE])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+class DashboardRollupJob:
+    """Background thread filling in missed days and refreshing today's rollup rows."""
+    
+    # Refresh this long before midnight, so a finished day's rows are close to its end
+    FINAL_REFRESH_LEAD = timedelta(minutes=1)
+    
+    def __init__(self, interval_seconds: float = 3600.0, leader_retry_seconds: float = 30.0):
+        self.interval = timedelta(seconds=interval_seconds)
+        self.leader_retry_seconds = leader_retry_seconds
+        self._leader = LeaderLock(LEADER_LOCK_KEY, "DashboardRollups")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the job thread (no-op if already running)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="dashboard-rollups", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5.0):
+        """Stop the thread and give up leadership."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._leader.release()
+    
+    def run_once(self):
+        """Backfill the days since the last rollup (all history on first run), then snapshot today."""
+        db = SessionLocal()
+        try:
+            today = _utcnow().date()
+            last_day = db.scalar(select(func.max(DashboardDailyRollup.day)))
+            if last_day is None or last_day < today - timedelta(days=1):
+                start = last_day + timedelta(days=1) if last_day else None
+                backfilled = backfill_rollups(db, start=start, end=today - timedelta(days=1))
+                print(f"[DashboardRollups] Backfilled {backfilled} rows from {start or 'the first case'}")
+            snapshot_today(db)
+        finally:
+            db.close()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if not self._leader.acquire():
+                    self._stop.wait(self.leader_retry_seconds)
+                    continue
+                self.run_once()
+            except Exception as e:
+                print(f"[DashboardRollups] Error: {e}")
+                self._leader.release()
+            
+            now = _utcnow()
+            wake_at = now + self.interval
+            final_refresh = _day_start(now.date() + timedelta(days=1)) - self.FINAL_REFRESH_LEAD
+            if now < final_refresh < wake_at:
+                wake_at = final_refresh
+            self._stop.wait((wake_at - now).total_seconds())
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Timezone-aware UTC datetime; SQLite hands back stored datetimes naive."""
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+_job: Optional[DashboardRollupJob] = None
+
+
+def get_dashboard_rollup_job() -> DashboardRollupJob:
+    """Get this worker's dashboard rollup job."""
+    global _job
+    if _job is None:
+        _job = DashboardRollupJob(interval_seconds=settings.DASHBOARD_ROLLUP_INTERVAL_SECONDS)
+    return _job
@@ -0,0 +1,437 @@
+"""
+In-process index of DCA capacity used for case allocation.
+
+Keeps active DCAs with spare capacity in pools of two structures each:
+- a min-heap keyed on active case count (load balancing for P2/P3),
+  with lazy deletion of entries whose load has since changed
+- a sorted list keyed on performance score (best DCA for P1)
+
+There is one pool per node of a DebtRangeIndex over the DCAs' debt
+ranges, so the DCAs accepting an amount are the union of the O(log n)
+pools on its path, plus one pool over all DCAs for when no DCA whose
+range covers the amount has capacity left.
+
+Picking a DCA is O(log^2 n) and needs no read query. The index only
+proposes: capacity is claimed in the database with a conditional
+`UPDATE ... SET active_cases_count = active_cases_count + n WHERE
+active_cases_count + n <= max_capacity RETURNING`, so concurrent requests
+and other workers can never overshoot max_capacity. A claim on a DCA row
+locked by another transaction waits for it, then re-checks the condition
+against the committed count, so a DCA that still has room is never
+passed over just because someone else was claiming it. A failed claim
+(no room left, or deactivated) resyncs that DCA's entry and the case
+falls back to the next candidate. DCAs are claimed in id order, so
+concurrent batches lock them in the same order. Counts returned by
+successful claims keep the index in step with other workers; it is also
+rebuilt every DCA_INDEX_TTL_SECONDS.
+"""
+import bisect
+import heapq
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import case as sql_case, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import DCA, Priority
+from app.utils.debt_ranges import DebtRangeIndex
+from app.utils.performance import format_performance_score
+
+
+ScoreRank = Tuple[int, float]
+
+
+def score_rank(performance_score: Optional[float]) -> ScoreRank:
+    """Sort key for a performance score: rated DCAs best first, unrated last."""
+    if performance_score is None:
+        return (1, 0.0)
+    return (0, -performance_score)
+
+
+class _Entry:
+    __slots__ = ("name", "performance_score", "rank", "load", "capacity", "min_debt", "max_debt")
+    
+    def __init__(
+        self,
+        name: str,
+        performance_score: Optional[float],
+        load: int,
+        capacity: int,
+        min_debt: Optional[float],
+        max_debt: Optional[float]
+    ):
+        self.name = name
+        self.performance_score = performance_score
+        self.rank = score_rank(performance_score)
+        self.load = load
+        self.capacity = capacity
+        self.min_debt = min_debt
+        self.max_debt = max_debt
+    
+    @classmethod
+    def from_row(cls, dca) -> "_Entry":
+        return cls(
+            name=dca.name,
+            performance_score=dca.performance_score,
+            load=dca.active_cases_count or 0,
+            capacity=dca.max_capacity or 0,
+            min_debt=dca.min_debt_amount,
+            max_debt=dca.max_debt_amount
+        )
+    
+    @property
+    def has_capacity(self) -> bool:
+        return self.load < self.capacity
+
+
+class _Pool:
+    """Load heap and score list over one set of DCAs."""
+    __slots__ = ("by_load", "by_score")
+    
+    def __init__(self):
+        self.by_load: List[Tuple[int, ScoreRank, int]] = []
+        self.by_score: List[Tuple[ScoreRank, int, int]] = []
+
+
+class DCACapacityIndex:
+    """Allocation index over active DCAs, shared by all requests in a worker."""
+    
+    def __init__(self, ttl_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, _Entry] = {}
+        self._ranges: DebtRangeIndex[int] = DebtRangeIndex([])
+        self._all = _Pool()
+        self._pools: Dict[int, _Pool] = {}
+        self._built_at: Optional[float] = None
+        self._stale = True
+        self._lock = threading.RLock()
+    
+    # Allocation
+    
+    def allocate(
+        self,
+        db: Session,
+        priority: Priority,
+        amount: Optional[float] = None,
+        exclude: Iterable[int] = ()
+    ) -> Optional[Tuple[int, str]]:
+        """Pick a DCA for one case and record the assignment. Returns (dca_id, reason) or None."""
+        return self.allocate_many(db, [priority], [amount], exclude)[0]
+    
+    def allocate_many(
+        self,
+        db: Session,
+        priorities: Sequence[Priority],
+        amounts: Optional[Sequence[Optional[float]]] = None,
+        exclude: Iterable[int] = ()
+    ) -> List[Optional[Tuple[int, str]]]:
+        """
+        Pick DCAs for a batch of cases in order.
+        
+        Each case goes to a DCA whose debt range covers its amount if one
+        has capacity, otherwise to any DCA with capacity. DCAs in `exclude`
+        are never picked.
+        
+        Picks are made in memory, then claimed with one conditional UPDATE
+        per DCA, within the caller's transaction. Cases whose claim fails
+        are re-picked with that DCA excluded, so every round excludes at
+        least one DCA and a full DCA costs one statement, never a retry
+        loop. A claim on a DCA locked by another transaction waits for it
+        rather than failing.
+        """
+        self._ensure_fresh(db)
+        
+        allocations: List[Optional[Tuple[int, str]]] = [None] * len(priorities)
+        pending = list(range(len(priorities)))
+        excluded: Set[int] = set(exclude)
+        
+        while pending:
+            claims = defaultdict(list)
+            with self._lock:
+                for position in pending:
+                    amount = amounts[position] if amounts is not None else None
+                    pick = self._pick(priorities[position], amount, excluded)
+                    if pick:
+                        claims[pick[0]].append((position, pick))
+            
+            pending = []
+            for dca_id, picks in sorted(claims.items()):
+                if self._claim(db, dca_id, len(picks)):
+                    for position, pick in picks:
+                        allocations[position] = pick
+                else:
+                    excluded.add(dca_id)
+                    pending.extend(position for position, _ in picks)
+            pending.sort()
+        
+        return allocations
+    
+    def release(self, db: Session, dca_id: int):
+        """Record that a case left this DCA (closed, rejected or reassigned)."""
+        row = db.execute(
+            update(DCA)
+            .where(DCA.id == dca_id)
+            .values(active_cases_count=sql_case(
+                (DCA.active_cases_count > 0, DCA.active_cases_count - 1),
+                else_=0
+            ))
+            .returning(DCA.active_cases_count, DCA.max_capacity, DCA.is_active)
+        ).first()
+        
+        with self._lock:
+            if row is None or not row.is_active:
+                self._remove(dca_id)
+                return
+            entry = self._entries.get(dca_id)
+            if entry is None:
+                return
+            entry.capacity = row.max_capacity
+            self._set_load(dca_id, row.active_cases_count)
+    
+    def _pick(
+        self,
+        priority: Priority,
+        amount: Optional[float] = None,
+        excluded: Set[int] = frozenset()
+    ) -> Optional[Tuple[int, str]]:
+        """Choose a DCA not in `excluded` and bump its load in memory. Caller holds the lock."""
+        # Pools of DCAs whose debt range covers the amount, then every DCA as a fallback
+        path = self._ranges.path(amount) if amount is not None else []
+        pools = [self._pools[node] for node in path if node in self._pools]
+        
+        for candidates, suffix in ((pools, ""), ([self._all], "; no DCA with capacity covers this amount")):
+            if priority == Priority.P1:
+                # Best performing DCA with spare capacity
+                best = min(filter(None, (self._best_scored(pool, excluded) for pool in candidates)), default=None)
+                if best is None:
+                    continue
+                dca_id = best[2]
+                entry = self._entries[dca_id]
+                reason = f"High priority case assigned to best performing DCA (score: {format_performance_score(entry.performance_score)})"
+            else:
+                # Load balance - least loaded DCA, best score on ties
+                best = min(filter(None, (self._least_loaded(pool, excluded) for pool in candidates)), default=None)
+                if best is None:
+                    continue
+                dca_id = best[2]
+                entry = self._entries[dca_id]
+                reason = f"Load balanced to DCA with {entry.load} active cases"
+            
+            self._set_load(dca_id, entry.load + 1)
+            return dca_id, reason + suffix
+        
+        return None
+    
+    def _best_scored(self, pool: _Pool, excluded: Set[int]) -> Optional[Tuple[ScoreRank, int, int]]:
+        return next((item for item in pool.by_score if item[2] not in excluded), None)
+    
+    def _least_loaded(self, pool: _Pool, excluded: Set[int]) -> Optional[Tuple[int, ScoreRank, int]]:
+        """Pop stale heap entries until the top matches a DCA's current load."""
+        skipped = []
+        found = None
+        while pool.by_load:
+            load, rank, dca_id = top = pool.by_load[0]
+            entry = self._entries.get(dca_id)
+            if entry and entry.load == load and entry.rank == rank and entry.has_capacity:
+                if dca_id not in excluded:
+                    found = top
+                    break
+                skipped.append(top)
+            heapq.heappop(pool.by_load)
+        
+        for item in skipped:
+            heapq.heappush(pool.by_load, item)
+        return found
+    
+    def _claim(self, db: Session, dca_id: int, count: int) -> bool:
+        """
+        Atomically take `count` slots of a DCA's capacity in the database.
+        
+        Returns False if the DCA no longer has room or was deactivated. If
+        another transaction holds the DCA's row, waits for it to finish and
+        checks the room left after it.
+        """
+        row = db.execute(
+            update(DCA)
+            .where(
+                DCA.id == dca_id,
+                DCA.is_active == True,
+                DCA.active_cases_count + count <= DCA.max_capacity
+            )
+            .values(active_cases_count=DCA.active_cases_count + count)
+            .returning(DCA.active_cases_count, DCA.max_capacity)
+            .execution_options(synchronize_session=False)
+        ).first()
+        
+        if row is None:
+            self._resync(db, dca_id)
+            return False
+        
+        with self._lock:
+            entry = self._entries.get(dca_id)
+            if entry and (row.active_cases_count > entry.load or row.max_capacity != entry.capacity):
+                # Other workers assigned cases to this DCA since we last looked
+                entry.capacity = row.max_capacity
+                self._set_load(dca_id, row.active_cases_count)
+        return True
+    
+    def _resync(self, db: Session, dca_id: int):
+        """Reload one DCA's entry after a failed claim (plain read, no row lock)."""
+        row = db.execute(
+            select(
+                DCA.id,
+                DCA.name,
+                DCA.performance_score,
+                DCA.active_cases_count,
+                DCA.max_capacity,
+                DCA.min_debt_amount,
+                DCA.max_debt_amount,
+                DCA.is_active
+            ).where(DCA.id == dca_id)
+        ).first()
+        
+        self.refresh([row] if row else [])
+        if row is None:
+            with self._lock:
+                self._remove(dca_id)
+    
+    # Maintenance
+    
+    def refresh(self, dcas: Iterable[DCA]):
+        """Update entries from DCA rows after they were created, edited or recounted."""
+        with self._lock:
+            ranges_changed = False
+            for dca in dcas:
+                previous = self._entries.get(dca.id)
+                self._remove(dca.id)
+                if not dca.is_active:
+                    continue
+                
+                entry = self._entries[dca.id] = _Entry.from_row(dca)
+                if previous is None or (previous.min_debt, previous.max_debt) != (entry.min_debt, entry.max_debt):
+                    ranges_changed = True
+                else:
+                    self._index(dca.id)
+            
+            if ranges_changed:
+                self._reindex()
+    
+    def invalidate(self):
+        """Force a rebuild on next use, e.g. after DCAs were changed in bulk."""
+        with self._lock:
+            self._stale = True
+    
+    def rebuild(self, db: Session):
+        """Reload all active DCAs from the database."""
+        rows = db.execute(
+            select(
+                DCA.id,
+                DCA.name,
+                DCA.performance_score,
+                DCA.active_cases_count,
+                DCA.max_capacity,
+                DCA.min_debt_amount,
+                DCA.max_debt_amount
+            ).where(DCA.is_active == True)
+        ).all()
+        
+        with self._lock:
+            self._entries = {row.id: _Entry.from_row(row) for row in rows}
+            self._reindex()
+            self._built_at = time.monotonic()
+            self._stale = False
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "dcas": len(self._entries),
+                "with_capacity": len(self._all.by_score),
+                "range_segments": self._ranges.segments,
+                "range_pools": len(self._pools),
+                "heap_entries": len(self._all.by_load) + sum(len(pool.by_load) for pool in self._pools.values()),
+                "stale": self._stale,
+                "age_seconds": round(time.monotonic() - self._built_at, 1) if self._built_at else None,
+            }
+    
+    def _ensure_fresh(self, db: Session):
+        with self._lock:
+            expired = self._built_at is None or time.monotonic() - self._built_at > self.ttl_seconds
+            if self._stale or expired:
+                self.rebuild(db)
+    
+    # Index structure helpers (caller holds the lock)
+    
+    def _reindex(self):
+        """Rebuild the debt range index and every pool from the entries."""
+        self._ranges = DebtRangeIndex(
+            (dca_id, entry.min_debt, entry.max_debt) for dca_id, entry in self._entries.items()
+        )
+        self._all = _Pool()
+        self._pools = {}
+        for dca_id, entry in self._entries.items():
+            if not entry.has_capacity:
+                continue
+            for pool in self._pools_of(dca_id):
+                pool.by_load.append((entry.load, entry.rank, dca_id))
+                pool.by_score.append((entry.rank, entry.load, dca_id))
+        
+        for pool in (self._all, *self._pools.values()):
+            heapq.heapify(pool.by_load)
+            pool.by_score.sort()
+    
+    def _pools_of(self, dca_id: int) -> List[_Pool]:
+        pools = [self._all]
+        for node in self._ranges.nodes_of(dca_id):
+            if node not in self._pools:
+                self._pools[node] = _Pool()
+            pools.append(self._pools[node])
+        return pools
+    
+    def _set_load(self, dca_id: int, load: int):
+        self._unindex(dca_id)
+        self._entries[dca_id].load = load
+        self._index(dca_id)
+    
+    def _index(self, dca_id: int):
+        entry = self._entries[dca_id]
+        if not entry.has_capacity:
+            return
+        for pool in self._pools_of(dca_id):
+            heapq.heappush(pool.by_load, (entry.load, entry.rank, dca_id))
+            bisect.insort(pool.by_score, (entry.rank, entry.load, dca_id))
+            
+            # Lazy deletion leaves superseded heap entries behind; compact occasionally
+            if len(pool.by_load) > 4 * len(pool.by_score) + 64:
+                pool.by_load = [(load, rank, i) for rank, load, i in pool.by_score]
+                heapq.heapify(pool.by_load)
+    
+    def _unindex(self, dca_id: int):
+        """Drop a DCA from the score lists; its heap entries go stale and are skipped later."""
+        entry = self._entries[dca_id]
+        key = (entry.rank, entry.load, dca_id)
+        for pool in self._pools_of(dca_id):
+            position = bisect.bisect_left(pool.by_score, key)
+            if position < len(pool.by_score) and pool.by_score[position] == key:
+                del pool.by_score[position]
+    
+    def _remove(self, dca_id: int):
+        if dca_id in self._entries:
+            self._unindex(dca_id)
+            del self._entries[dca_id]
+
+
+_index: Optional[DCACapacityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_dca_capacity_index() -> DCACapacityIndex:
+    """Get this worker's DCA capacity index."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DCACapacityIndex(ttl_seconds=settings.DCA_INDEX_TTL_SECONDS)
+    return _index
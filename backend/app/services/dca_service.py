@@ -1,8 +1,18 @@
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import time
 
 from app.models import DCA
-from app.schemas import DCACreate, DCAUpdate
+from app.schemas import DCACreate, DCAUpdate, DCAMetricsRecomputeResult
+from app.services.dca_capacity_index import get_dca_capacity_index
+from app.services.dashboard_counters import apply_counter_deltas, dca_deltas
+from app.utils.performance import (
+    aggregate_dca_cases,
+    average_completion_days,
+    performance_score_from_stats,
+    rebuild_performance_stats,
+)
 
 
 class DCAService:
@@ -13,8 +23,11 @@ class DCAService:
         """Create a new DCA."""
         dca = DCA(**dca_data.model_dump())
         db.add(dca)
+        db.flush()
+        apply_counter_deltas(db, dca_deltas(None, dca.is_active))
         db.commit()
         db.refresh(dca)
+        get_dca_capacity_index().refresh([dca])
         return dca
     
     @staticmethod
@@ -35,7 +48,12 @@ class DCAService:
         if active_only:
             query = query.filter(DCA.is_active == True)
         
-        return query.order_by(DCA.performance_score.desc()).offset(skip).limit(limit).all()
+        # Matches ix_dcas_ranking, so the sort is served by the index
+        return query.order_by(
+            DCA.performance_rated.desc(),
+            DCA.performance_score.desc(),
+            DCA.active_cases_count.asc()
+        ).offset(skip).limit(limit).all()
     
     @staticmethod
     def update_dca(db: Session, dca_id: int, dca_data: DCAUpdate) -> Optional[DCA]:
@@ -44,14 +62,87 @@ class DCAService:
         if not dca:
             return None
         
+        was_active = dca.is_active
         update_data = dca_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(dca, field, value)
         
+        apply_counter_deltas(db, dca_deltas(was_active, dca.is_active))
         db.commit()
         db.refresh(dca)
+        get_dca_capacity_index().refresh([dca])
         return dca
     
+    @staticmethod
+    def recompute_metrics(db: Session) -> DCAMetricsRecomputeResult:
+        """
+        Recompute performance_score, avg_completion_time_days and
+        active_cases_count for every DCA from its cases.
+        
+        Nightly reconciliation: one grouped aggregate over cases, then the
+        performance aggregates table and all DCAs are rewritten with one
+        executemany each, in a single transaction.
+        """
+        started = time.perf_counter()
+        rows = aggregate_dca_cases(db)
+        aggregated = time.perf_counter()
+        
+        stats = rebuild_performance_stats(db, rows)
+        active = {row.dca_id: row.active_count for row in rows}
+        
+        dcas = db.execute(
+            select(
+                DCA.id,
+                DCA.performance_score,
+                DCA.active_cases_count,
+                DCA.total_cases_rejected,
+                DCA.total_delays
+            )
+        ).all()
+        
+        updates = []
+        scores_changed = active_counts_changed = 0
+        for dca in dcas:
+            score = performance_score_from_stats(stats.get(dca.id), dca.total_cases_rejected, dca.total_delays)
+            active_count = active.get(dca.id, 0)
+            scores_changed += score != dca.performance_score
+            active_counts_changed += active_count != dca.active_cases_count
+            updates.append({
+                "dca_id": dca.id,
+                "score": score,
+                "rated": score is not None,
+                "avg_days": average_completion_days(stats.get(dca.id)),
+                "active": active_count
+            })
+        
+        # Core executemany bypasses the ORM validator, so set the rated flag explicitly
+        if updates:
+            dca_table = DCA.__table__
+            db.execute(
+                dca_table.update()
+                .where(dca_table.c.id == bindparam("dca_id"))
+                .values(
+                    performance_score=bindparam("score"),
+                    performance_rated=bindparam("rated"),
+                    avg_completion_time_days=bindparam("avg_days"),
+                    active_cases_count=bindparam("active")
+                ),
+                updates
+            )
+        
+        db.commit()
+        get_dca_capacity_index().invalidate()
+        finished = time.perf_counter()
+        
+        return DCAMetricsRecomputeResult(
+            dca_count=len(dcas),
+            rated=sum(update["rated"] for update in updates),
+            scores_changed=scores_changed,
+            active_counts_changed=active_counts_changed,
+            aggregate_ms=round((aggregated - started) * 1000, 1),
+            write_ms=round((finished - aggregated) * 1000, 1)
+        )
+    
     @staticmethod
     def delete_dca(db: Session, dca_id: int) -> bool:
         """Delete a DCA (soft delete by marking inactive)."""
@@ -59,6 +150,9 @@ class DCAService:
         if not dca:
             return False
         
+        was_active = dca.is_active
         dca.is_active = False
+        apply_counter_deltas(db, dca_deltas(was_active, dca.is_active))
         db.commit()
+        get_dca_capacity_index().refresh([dca])
         return True
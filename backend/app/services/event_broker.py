@@ -0,0 +1,169 @@
+"""
+Case Event Broker
+
+In-process publish/subscribe for case events, streamed to dashboards over
+Server-Sent Events (GET /api/v1/events/stream) so they do not have to poll.
+
+Event types:
+- case.created: a case was created (including bulk imports)
+- case.assigned: a case was (re)assigned to a DCA, or unassigned (dca_id None)
+- case.status_changed: a case moved between Open / In Progress / Closed
+- case.sla_changed: a case's SLA status changed (SLA refresh or scheduler)
+
+Events are published after the change is committed, from request threads
+and the SLA scheduler thread. Each subscriber has filters (DCA, priority,
+SLA status) applied at publish time and a bounded buffer: when a slow
+client falls behind, its oldest events are dropped and it receives an
+events.dropped notice with the count, so it can refetch instead.
+
+Subscribers only see events published by their own worker process.
+"""
+import asyncio
+import itertools
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import settings
+
+
+def case_event(event_type: str, case: Any, **previous: Any) -> Dict[str, Any]:
+    """
+    Event payload for a case (an ORM Case or a row with the same columns).
+    
+    Keyword arguments are the case's previous values, e.g. status=CaseStatus.OPEN.
+    """
+    return {
+        "type": event_type,
+        "case": {
+            "id": case.id,
+            "case_id": case.case_id,
+            "dca_id": case.dca_id,
+            "priority": _value(case.priority),
+            "status": _value(case.status),
+            "sla_status": _value(case.sla_status),
+        },
+        "previous": {name: _value(value) for name, value in previous.items()},
+        "at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _value(value):
+    """JSON form of an enum value."""
+    return getattr(value, "value", value)
+
+
+class EventSubscription:
+    """One client's filters and bounded event buffer."""
+    
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        dca_ids: Optional[Iterable[int]] = None,
+        priorities: Optional[Iterable[str]] = None,
+        sla_statuses: Optional[Iterable[str]] = None,
+        buffer_size: int = 1000
+    ):
+        self.dca_ids = set(dca_ids) if dca_ids else None
+        self.priorities = {_value(p) for p in priorities} if priorities else None
+        self.sla_statuses = {_value(s) for s in sla_statuses} if sla_statuses else None
+        self.dropped = 0
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._ready = asyncio.Event()
+    
+    def matches(self, event: Dict[str, Any]) -> bool:
+        case = event["case"]
+        if self.dca_ids is not None and not (
+            case["dca_id"] in self.dca_ids or event["previous"].get("dca_id") in self.dca_ids
+        ):
+            return False
+        if self.priorities is not None and case["priority"] not in self.priorities:
+            return False
+        if self.sla_statuses is not None and case["sla_status"] not in self.sla_statuses:
+            return False
+        return True
+    
+    def push(self, event: Dict[str, Any]):
+        """Buffer an event (any thread); the oldest one is dropped when full."""
+        with self._lock:
+            was_empty = not self._buffer
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(event)
+        
+        # One wake-up per batch: the consumer drains everything buffered since
+        if not was_empty:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # Event loop already closed
+    
+    async def next_batch(self, timeout: float) -> List[Dict[str, Any]]:
+        """Wait up to `timeout` seconds for events and return all buffered ones."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        
+        with self._lock:
+            events = list(self._buffer)
+            self._buffer.clear()
+            dropped, self.dropped = self.dropped, 0
+        
+        if dropped:
+            events.insert(0, {"type": "events.dropped", "count": dropped})
+        return events
+
+
+class EventBroker:
+    """Fans case events out to the matching subscriptions of this process."""
+    
+    def __init__(self, buffer_size: int = 1000):
+        self.buffer_size = buffer_size
+        self._subscriptions: List[EventSubscription] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+    
+    def subscribe(self, **filters) -> EventSubscription:
+        """Subscribe from a coroutine; see EventSubscription for the filters."""
+        subscription = EventSubscription(
+            asyncio.get_running_loop(), buffer_size=self.buffer_size, **filters
+        )
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+    
+    def unsubscribe(self, subscription: EventSubscription):
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+    
+    def publish(self, events: Iterable[Dict[str, Any]]):
+        """Deliver events to every matching subscription. Call after the change is committed."""
+        subscriptions = self._subscriptions
+        if not subscriptions:
+            return
+        
+        for event in events:
+            event["id"] = next(self._ids)
+            for subscription in subscriptions:
+                if subscription.matches(event):
+                    subscription.push(event)
+
+
+_broker: Optional[EventBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_event_broker() -> EventBroker:
+    """Get this worker's event broker."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = EventBroker(buffer_size=settings.EVENT_STREAM_BUFFER_SIZE)
+    return _broker
@@ -0,0 +1,65 @@
+"""
+Leader Election for Background Jobs
+
+Jobs that should run in one worker only (the SLA scheduler, dashboard
+counter reconciliation, dashboard rollups) hold a PostgreSQL session-level
+advisory lock on a dedicated connection while they lead; the other
+workers keep trying to take it and take over once the leader's
+connection is gone. SQLite has no advisory locks, so there every
+process leads.
+"""
+from sqlalchemy import text
+
+from app.database import engine
+
+
+class LeaderLock:
+    """One advisory lock key; this worker leads while it holds it."""
+    
+    def __init__(self, key: int, name: str):
+        self.key = key
+        self.name = name
+        self._connection = None
+    
+    def acquire(self) -> bool:
+        """Whether this worker leads; tries to take the lock if not."""
+        if engine.dialect.name != "postgresql":
+            return True
+        if self._connection is not None:
+            return True
+        
+        connection = engine.connect()
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        
+        if not acquired:
+            connection.close()
+            return False
+        
+        self._connection = connection
+        print(f"[{self.name}] Acquired leadership")
+        return True
+    
+    def check(self):
+        """Raise if the lock's connection was lost (and with it the lock)."""
+        if self._connection is not None:
+            self._connection.execute(text("SELECT 1"))
+            self._connection.commit()
+    
+    def release(self):
+        """Unlock and return the lock connection, if held."""
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            # Session-level locks outlive close(): the connection goes back to the pool
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            connection.commit()
+        except Exception:
+            connection.invalidate()
+        finally:
+            connection.close()
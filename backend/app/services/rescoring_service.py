@@ -0,0 +1,171 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select, update
+from typing import List, Optional
+from datetime import datetime, timezone
+import threading
+import time
+
+from app.database import SessionLocal
+from app.models import Case, CaseStatus, RescoringJob
+from app.schemas import RescoringJobResponse
+from app.ai.predictor import load_predictor_version
+
+# Job ids currently running in this process
+_running_jobs = set()
+_running_lock = threading.Lock()
+
+
+class RescoringService:
+    """
+    Background re-scoring of open cases after a model version change.
+    
+    Cases are walked in primary-key order, one chunk at a time: each chunk is
+    read with a keyset query (id > checkpoint), scored with one vectorized
+    predict_batch call and written back with a bulk UPDATE by primary key,
+    and the job checkpoint is committed in the same short transaction. A job
+    interrupted at any point resumes from its last committed chunk.
+    """
+    
+    OPEN_STATUSES = [CaseStatus.OPEN, CaseStatus.IN_PROGRESS]
+    
+    @staticmethod
+    def _pending_filter(model_version: str):
+        """Open cases not yet scored by `model_version`."""
+        return (
+            Case.status.in_(RescoringService.OPEN_STATUSES),
+            or_(Case.ai_model_version.is_(None), Case.ai_model_version != model_version)
+        )
+    
+    @staticmethod
+    def create_job(db: Session, model_version: str) -> RescoringJob:
+        """Create a re-scoring job for a model version."""
+        total = db.query(func.count(Case.id)).filter(
+            *RescoringService._pending_filter(model_version)
+        ).scalar()
+        
+        job = RescoringJob(model_version=model_version, status="pending", total_count=total)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+    
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> Optional[RescoringJob]:
+        """Get job by ID."""
+        return db.query(RescoringJob).filter(RescoringJob.id == job_id).first()
+    
+    @staticmethod
+    def list_jobs(db: Session, limit: int = 20) -> List[RescoringJob]:
+        """List most recent jobs first."""
+        return db.query(RescoringJob).order_by(RescoringJob.id.desc()).limit(limit).all()
+    
+    @staticmethod
+    def run_job(job_id: int, chunk_size: int = 5000):
+        """
+        Run (or resume) a job to completion in its own session.
+        
+        Meant to be called from a background task or thread; a job already
+        running in this process is not started twice.
+        """
+        with _running_lock:
+            if job_id in _running_jobs:
+                return
+            _running_jobs.add(job_id)
+        
+        db = SessionLocal()
+        try:
+            job = RescoringService.get_job(db, job_id)
+            if not job or job.status == "completed":
+                return
+            
+            predictor = load_predictor_version(job.model_version)
+            job.status = "running"
+            job.error = None
+            job.started_at = job.started_at or datetime.now(timezone.utc)
+            job.updated_at = datetime.now(timezone.utc)
+            db.commit()
+            
+            started = time.perf_counter()
+            processed_in_run = 0
+            while True:
+                rows = db.execute(
+                    select(Case.id, Case.overdue_amount, Case.ageing_days)
+                    .where(Case.id > job.last_case_id, *RescoringService._pending_filter(job.model_version))
+                    .order_by(Case.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+                
+                scores = predictor.predict_batch(
+                    [row.overdue_amount for row in rows],
+                    [row.ageing_days for row in rows]
+                ).tolist()
+                
+                db.execute(update(Case), [
+                    {"id": row.id, "ai_recovery_score": score, "ai_model_version": job.model_version}
+                    for row, score in zip(rows, scores)
+                ])
+                
+                job.last_case_id = rows[-1].id
+                job.processed_count += len(rows)
+                job.updated_at = datetime.now(timezone.utc)
+                db.commit()
+                
+                processed_in_run += len(rows)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"[Rescoring] Job {job.id} ({job.model_version}): {job.processed_count}/{job.total_count} "
+                    f"cases, {processed_in_run / elapsed:,.0f} rows/s"
+                )
+            
+            job.status = "completed"
+            job.finished_at = datetime.now(timezone.utc)
+            job.updated_at = job.finished_at
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            job = RescoringService.get_job(db, job_id)
+            if job:
+                job.status = "failed"
+                job.error = str(e)
+                job.updated_at = datetime.now(timezone.utc)
+                db.commit()
+            print(f"[Rescoring] Job {job_id} failed: {e}")
+        finally:
+            db.close()
+            with _running_lock:
+                _running_jobs.discard(job_id)
+    
+    @staticmethod
+    def to_response(job: RescoringJob) -> RescoringJobResponse:
+        """Build the progress view of a job, including throughput."""
+        percent = 100.0 if job.status == "completed" else (
+            round(100.0 * job.processed_count / job.total_count, 2) if job.total_count else 0.0
+        )
+        
+        rate = 0.0
+        if job.started_at and job.processed_count:
+            end = job.finished_at or job.updated_at or datetime.now(timezone.utc)
+            elapsed = (_as_utc(end) - _as_utc(job.started_at)).total_seconds()
+            rate = round(job.processed_count / elapsed, 1) if elapsed > 0 else 0.0
+        
+        return RescoringJobResponse(
+            id=job.id,
+            model_version=job.model_version,
+            status=job.status,
+            last_case_id=job.last_case_id,
+            total_count=job.total_count,
+            processed_count=job.processed_count,
+            percent_complete=percent,
+            rows_per_second=rate,
+            error=job.error,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            updated_at=job.updated_at
+        )
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite returns naive datetimes; treat them as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
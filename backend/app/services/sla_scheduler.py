@@ -0,0 +1,197 @@
+"""
+SLA Transition Scheduler
+
+Moves open cases to At Risk (24 hours before the SLA due date) and to
+Breached (at the due date) as those moments pass, instead of waiting for
+an admin to run the batch SLA update.
+
+The scheduler keeps a min-heap of the SLA boundaries falling in the next
+window (SLA_SCHEDULER_WINDOW_SECONDS), loaded with two range scans over
+the sla_due_date index, and sleeps until the earliest one has passed. On
+waking it updates just the cases whose boundary passed, recomputing their
+status in SQL from the current due date, so heap entries made stale by a
+closed or rescheduled case are harmless. Each window load first catches up
+cases whose boundary fell in the previous window without being in the heap
+(created or rescheduled after it was loaded). A new leader refreshes all
+open cases once, which also covers any downtime.
+
+Only one worker runs the scheduler: the leader holds a PostgreSQL
+advisory lock (see LeaderLock), and the others retry every
+SLA_SCHEDULER_LEADER_RETRY_SECONDS, taking over once the leader's
+connection is gone. SQLite has no advisory locks, so there every process
+runs it; the updates are conditional, so that only repeats work.
+"""
+import heapq
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Case, CaseStatus
+from app.services.case_service import CaseService
+from app.services.leader_lock import LeaderLock
+
+# Application-wide key of the scheduler's advisory lock ("SLA")
+ADVISORY_LOCK_KEY = 0x534C41
+
+AT_RISK_BEFORE_DUE = timedelta(hours=24)
+
+# Cases updated per statement when many boundaries pass at once
+FIRE_BATCH_SIZE = 1000
+
+
+class SLAScheduler:
+    """Background thread applying SLA status transitions as they fall due."""
+    
+    def __init__(self, window_seconds: float = 900.0, leader_retry_seconds: float = 30.0):
+        self.window = timedelta(seconds=window_seconds)
+        self.leader_retry_seconds = leader_retry_seconds
+        self._heap: List[Tuple[datetime, int]] = []
+        self._window_start: Optional[datetime] = None
+        self._window_end: Optional[datetime] = None
+        self._leader = LeaderLock(ADVISORY_LOCK_KEY, "SLAScheduler")
+        self._leading = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the scheduler thread (no-op if already running)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sla-scheduler", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5.0):
+        """Stop the thread and give up leadership."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._release_leadership()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if not self._acquire_leadership():
+                    self._stop.wait(self.leader_retry_seconds)
+                    continue
+                
+                now = _utcnow()
+                if self._window_end is None or now >= self._window_end:
+                    self._load_window(now)
+                
+                # Sleep until the earliest boundary has passed, or the window ends
+                wake_at = min(self._heap[0][0], self._window_end) if self._heap else self._window_end
+                if self._stop.wait(max((wake_at - _utcnow()).total_seconds(), 0) + 0.01):
+                    break
+                self._fire(_utcnow())
+            except Exception as e:
+                print(f"[SLAScheduler] Error, restarting from a full refresh: {e}")
+                self._release_leadership()
+                self._stop.wait(self.leader_retry_seconds)
+    
+    def _acquire_leadership(self) -> bool:
+        """Whether this worker runs the scheduler; a new leader starts from a full refresh."""
+        if not self._leader.acquire():
+            return False
+        if not self._leading:
+            self._leading = True
+            self._window_end = None
+        return True
+    
+    def _release_leadership(self):
+        """Drop the heap and give up the leadership lock."""
+        self._heap = []
+        self._window_start = self._window_end = None
+        self._leading = False
+        self._leader.release()
+    
+    def _load_window(self, now: datetime):
+        """Catch up on missed transitions, then load the boundaries of the next window."""
+        # Fails, and so drops leadership, if the lock connection was lost
+        self._leader.check()
+        
+        db = SessionLocal()
+        try:
+            if self._window_end is None:
+                result = CaseService.update_sla_statuses(db, set_based=True)
+                caught_up = result.updated
+            else:
+                caught_up = CaseService.refresh_sla_statuses(
+                    db, _boundary_between(self._window_start, now), now=now
+                )
+            
+            start, end = now, now + self.window
+            rows = db.execute(
+                select(Case.id, Case.sla_due_date).where(
+                    Case.status.in_([CaseStatus.OPEN, CaseStatus.IN_PROGRESS]),
+                    _boundary_between(start, end)
+                )
+            ).all()
+        finally:
+            db.close()
+        
+        heap = []
+        for case_id, due in rows:
+            due = _as_utc(due)
+            for boundary in (due - AT_RISK_BEFORE_DUE, due):
+                if start <= boundary < end:
+                    heap.append((boundary, case_id))
+        heapq.heapify(heap)
+        
+        self._heap = heap
+        self._window_start, self._window_end = start, end
+        print(f"[SLAScheduler] Caught up {caught_up} cases, {len(heap)} transitions due by {end:%H:%M:%S} UTC")
+    
+    def _fire(self, now: datetime):
+        """Update the cases whose boundary has passed."""
+        due_ids = []
+        while self._heap and self._heap[0][0] < now:
+            due_ids.append(heapq.heappop(self._heap)[1])
+        if not due_ids:
+            return
+        
+        due_ids = sorted(set(due_ids))
+        db = SessionLocal()
+        try:
+            changed = sum(
+                CaseService.refresh_sla_statuses(db, Case.id.in_(due_ids[i:i + FIRE_BATCH_SIZE]), now=now)
+                for i in range(0, len(due_ids), FIRE_BATCH_SIZE)
+            )
+        finally:
+            db.close()
+        print(f"[SLAScheduler] {changed} of {len(due_ids)} due cases changed SLA status")
+
+
+def _boundary_between(start: datetime, end: datetime):
+    """Cases with an SLA boundary (At Risk or Breached) in [start, end), as sla_due_date ranges."""
+    return or_(
+        and_(Case.sla_due_date >= start, Case.sla_due_date < end),
+        and_(Case.sla_due_date >= start + AT_RISK_BEFORE_DUE, Case.sla_due_date < end + AT_RISK_BEFORE_DUE)
+    )
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Timezone-aware UTC datetime; SQLite hands back stored datetimes naive."""
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+_scheduler: Optional[SLAScheduler] = None
+
+
+def get_sla_scheduler() -> SLAScheduler:
+    """Get this worker's SLA scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SLAScheduler(
+            window_seconds=settings.SLA_SCHEDULER_WINDOW_SECONDS,
+            leader_retry_seconds=settings.SLA_SCHEDULER_LEADER_RETRY_SECONDS
+        )
+    return _scheduler
@@ -0,0 +1,101 @@
+"""
+Case Import Utilities
+Streams case records out of CSV or NDJSON uploads for bulk ingestion.
+Rows are yielded one at a time so arbitrarily large files never have to
+be held in memory.
+"""
+import codecs
+import csv
+import json
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """
+    Work out the upload format from the file name or content type.
+    
+    Raises:
+        ValueError: If the format cannot be determined
+    """
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    
+    raise ValueError("Could not detect file format, expected a .csv or .ndjson upload")
+
+
+def iter_case_rows(stream: BinaryIO, file_format: str) -> Iterator[Tuple[int, Optional[dict]]]:
+    """
+    Yield (line_number, row) pairs from an uploaded file.
+    
+    Empty CSV cells are dropped so optional fields fall back to their defaults.
+    Lines that are not valid UTF-8, malformed CSV records and malformed
+    NDJSON lines are yielded with a row of None so the caller can report
+    them without aborting the whole import.
+    """
+    if file_format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format '{file_format}'")
+    
+    bad_lines: List[int] = []
+    text = _decoded_lines(stream, bad_lines)
+    
+    def undecodable():
+        while bad_lines:
+            yield bad_lines.pop(0), None
+    
+    if file_format == "csv":
+        reader = csv.DictReader(text)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                break
+            except csv.Error:
+                yield from undecodable()
+                # DictReader only updates its own line_num for records it parsed
+                yield reader.reader.line_num, None
+                continue
+            
+            yield from undecodable()
+            yield reader.line_num, {
+                key.strip(): value.strip()
+                for key, value in row.items()
+                if key and value is not None and value.strip() != ""
+            }
+        yield from undecodable()
+        return
+    
+    for line_number, line in enumerate(text, 1):
+        yield from undecodable()
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+    yield from undecodable()
+
+
+def _decoded_lines(stream: BinaryIO, bad_lines: List[int]) -> Iterator[str]:
+    """
+    Decode an upload line by line as UTF-8 (with or without a BOM).
+    
+    An undecodable line is replaced by a blank one, so line numbers stay
+    right, and its number is appended to bad_lines.
+    """
+    for line_number, raw in enumerate(stream, 1):
+        if line_number == 1 and raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8):]
+        try:
+            yield raw.decode("utf-8")
+        except UnicodeDecodeError:
+            bad_lines.append(line_number)
+            yield "\n"
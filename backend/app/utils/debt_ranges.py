@@ -0,0 +1,95 @@
+"""
+Index over DCA debt ranges for finding the DCAs that accept an amount.
+
+Each DCA accepts debts in the inclusive range [min_debt_amount,
+max_debt_amount]. The range endpoints are sorted into breakpoints that cut
+the amount axis into elementary segments, and a segment tree over those
+segments stores every range in the O(log n) nodes that exactly cover it.
+The ranges containing an amount are the ones stored on the path from its
+segment's leaf to the root: one bisect plus a walk of O(log n) nodes,
+instead of a scan over every DCA.
+"""
+import bisect
+import math
+from collections import defaultdict
+from typing import Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+
+
+class DebtRangeIndex(Generic[K]):
+    """Stabbing-query index over inclusive debt ranges, keyed by DCA (or DCA id)."""
+    
+    def __init__(self, ranges: Iterable[Tuple[K, Optional[float], Optional[float]]]):
+        """
+        Build the index from (key, min_debt, max_debt) triples.
+        
+        A missing minimum means 0 and a missing maximum means no upper limit.
+        Ranges with min_debt > max_debt accept nothing.
+        """
+        bounds = [
+            (key, 0.0 if low is None else float(low), math.inf if high is None else float(high))
+            for key, low, high in ranges
+        ]
+        
+        # A range [low, high] covers amounts from breakpoint `low` up to (not
+        # including) the breakpoint just above `high`
+        self._edges: List[float] = sorted(
+            {low for _, low, _ in bounds} | {math.nextafter(high, math.inf) for _, _, high in bounds}
+        )
+        self._leaves = 1
+        while self._leaves < max(len(self._edges), 1):
+            self._leaves *= 2
+        
+        self._members: Dict[int, List[K]] = defaultdict(list)
+        self._nodes: Dict[K, Tuple[int, ...]] = {}
+        for key, low, high in bounds:
+            first = bisect.bisect_left(self._edges, low)
+            last = bisect.bisect_left(self._edges, math.nextafter(high, math.inf)) if low <= high else first
+            self._nodes[key] = self._cover(first, last)
+            for node in self._nodes[key]:
+                self._members[node].append(key)
+    
+    def __len__(self) -> int:
+        return len(self._nodes)
+    
+    @property
+    def segments(self) -> int:
+        return len(self._edges)
+    
+    def path(self, amount: float) -> List[int]:
+        """Tree nodes whose ranges all contain `amount`, leaf first."""
+        segment = bisect.bisect_right(self._edges, amount) - 1
+        if segment < 0:
+            return []
+        
+        node = segment + self._leaves
+        nodes = []
+        while node:
+            nodes.append(node)
+            node //= 2
+        return nodes
+    
+    def nodes_of(self, key: K) -> Tuple[int, ...]:
+        """Tree nodes that store this key's range."""
+        return self._nodes.get(key, ())
+    
+    def eligible(self, amount: float) -> List[K]:
+        """Keys whose range contains `amount`."""
+        return [key for node in self.path(amount) for key in self._members.get(node, ())]
+    
+    def _cover(self, first: int, last: int) -> Tuple[int, ...]:
+        """Canonical nodes covering leaf segments [first, last)."""
+        nodes = []
+        low, high = first + self._leaves, last + self._leaves
+        while low < high:
+            if low & 1:
+                nodes.append(low)
+                low += 1
+            if high & 1:
+                high -= 1
+                nodes.append(high)
+            low //= 2
+            high //= 2
+        return tuple(nodes)
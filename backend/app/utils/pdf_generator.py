@@ -12,9 +12,10 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from datetime import datetime
 from io import BytesIO
 from typing import List
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from app.models import Case, DCA
+from app.utils.performance import format_performance_score
 
 
 def generate_case_report_pdf(case: Case, db: Session) -> BytesIO:
@@ -150,7 +151,7 @@ def generate_case_report_pdf(case: Case, db: Session) -> BytesIO:
             ['Contact Person:', case.dca.contact_person or 'N/A'],
             ['Email:', case.dca.email or 'N/A'],
             ['Phone:', case.dca.phone or 'N/A'],
-            ['Performance Score:', case.dca.performance_score],
+            ['Performance Score:', format_performance_score(case.dca.performance_score)],
             ['Allocation Reason:', case.allocation_reason or 'N/A'],
         ]
         
@@ -250,7 +251,7 @@ def generate_all_cases_report_pdf(db: Session) -> BytesIO:
     elements.append(Spacer(1, 0.3*inch))
     
     # Get all cases
-    cases = db.query(Case).all()
+    cases = db.query(Case).options(joinedload(Case.dca).load_only(DCA.name)).all()
     
     # Summary statistics
     total_cases = len(cases)
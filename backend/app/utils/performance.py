@@ -1,17 +1,38 @@
 """
 Performance Score Calculation Utilities
-Calculates DCA performance scores based on:
+Calculates DCA performance scores, from per-DCA running aggregates, based on:
 - 100% base score for perfect completion
-- Penalties: Rejection (-5%), Delay (-3%), At Risk (-5%), Breached (-5%), Processing time over 10 days (-2%/day)
+- Penalties: Rejection, Delay, At Risk, Breached, Processing time over a threshold (per day)
 - Rewards: Quick completion within 5 days (+5%)
+
+Penalty percentages and the processing threshold are platform settings;
+the defaults are -5% per rejection, -3% per delay, -5% per at-risk or
+breached case and -2% per day over 10 days.
 - Average time from case assignment to completion
 """
 from datetime import datetime, timezone
+from typing import Dict, Optional
+from sqlalchemy import Integer, case as sql_case, cast, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from app.models import Case, DCA, CaseStatus, SLAStatus
+from app.models import Case, DCA, DCAPerformanceStats, CaseStatus, SLAStatus
+from app.utils.settings_cache import get_platform_settings
+
+QUICK_COMPLETION_DAYS = 5
+QUICK_COMPLETION_REWARD = 5.0
+
+STATS_COUNTERS = (
+    "completed_count",
+    "quick_count",
+    "slow_count",
+    "slow_overage_days",
+    "completion_days_total",
+    "at_risk_count",
+    "breached_count",
+)
 
 
-def calculate_dca_performance_score(dca: DCA, db: Session) -> float:
+def calculate_dca_performance_score(dca: DCA, db: Session) -> Optional[float]:
     """
     Calculate DCA performance score based on their case handling.
     
@@ -19,101 +40,199 @@ def calculate_dca_performance_score(dca: DCA, db: Session) -> float:
     - Start with 100% base score
     - For each COMPLETED case:
       * Reward: +5% if completed within 5 days (quick resolution)
-      * Penalty: -2% per day if completed in more than 10 days
-      * Penalty: -5% if case was AT_RISK at completion
-      * Penalty: -5% if case was BREACHED at completion
-    - For REJECTIONS: -5% per rejected case
-    - For DELAYS: -3% per delayed case
+      * Penalty: processing_penalty_per_day per day over processing_threshold_days
+      * Penalty: breach_penalty_percent if case was AT_RISK or BREACHED at completion
+    - For REJECTIONS: rejection_penalty_percent per rejected case
+    - For DELAYS: delay_penalty_percent per delayed case
+    
+    The per-case terms come from the DCA's running aggregates
+    (DCAPerformanceStats, kept up to date by record_case_completion), so
+    this is one primary key lookup however many cases the DCA has closed.
     
     Args:
         dca: DCA instance
         db: Database session
         
     Returns:
-        float: Performance score (0-100) or "TBD"
+        float: Performance score (0-120), or None if the DCA is still unrated
     """
+    stats = db.get(DCAPerformanceStats, dca.id, populate_existing=True)
+    score = apply_performance_stats(dca, stats)
     
-    # Get all completed cases handled by this DCA
-    completed_cases = db.query(Case).filter(
-        Case.dca_id == dca.id,
-        Case.status == CaseStatus.CLOSED
-    ).all()
-    
-    # If no completed cases, return TBD
-    if not completed_cases:
-        return "TBD"
-    
-    # Start with 100% base score
-    base_score = 100.0
-    total_rewards = 0.0
-    total_penalties = 0.0
-    
-    # Analyze completed cases
-    total_completed = len(completed_cases)
-    total_completion_days = 0
-    quick_completions = 0
-    at_risk_cases = 0
-    breached_cases = 0
-    slow_completions = 0
-    
-    for case in completed_cases:
-        # Calculate processing time (from assigned_at to completed_at)
-        if case.assigned_at and case.completed_at:
-            processing_days = (case.completed_at - case.assigned_at).days
-            total_completion_days += processing_days
-            
-            # REWARD: Quick completion (within 5 days)
-            if processing_days <= 5:
-                quick_completions += 1
-                total_rewards += 5.0  # +5% reward for quick resolution
-            
-            # PENALTY: Slow completion (more than 10 days)
-            elif processing_days > 10:
-                slow_completions += 1
-                days_over = processing_days - 10
-                total_penalties += (days_over * 2.0)  # -2% per day over 10
-        
-        # PENALTY: Case was at risk at completion
-        if case.sla_status == SLAStatus.AT_RISK:
-            at_risk_cases += 1
-            total_penalties += 5.0  # -5% penalty
-        
-        # PENALTY: Case was breached at completion
-        if case.sla_status == SLAStatus.BREACHED:
-            breached_cases += 1
-            total_penalties += 5.0  # -5% penalty
+    # Log calculation for debugging
+    if stats is not None:
+        print(f"[Performance] DCA: {dca.name}")
+        print(f"  Completed: {stats.completed_count}, Quick: {stats.quick_count}, Slow: {stats.slow_count}")
+        print(f"  At Risk: {stats.at_risk_count}, Breached: {stats.breached_count}")
+        print(f"  Rejections: {dca.total_cases_rejected or 0}, Delays: {dca.total_delays or 0}")
+        print(f"  Final Score: {score}%")
+    
+    return score
+
+
+def performance_score_from_stats(
+    stats: Optional[DCAPerformanceStats],
+    total_rejections: Optional[int],
+    total_delays: Optional[int]
+) -> Optional[float]:
+    """Score from a DCA's aggregates; None (unrated) until it has completed a case."""
+    if stats is None or not stats.completed_count:
+        return None
+    
+    params = get_platform_settings()
+    
+    # Base + Rewards - Penalties
+    rewards = stats.quick_count * QUICK_COMPLETION_REWARD
+    penalties = (
+        stats.slow_overage_days * params.processing_penalty_per_day
+        + (stats.at_risk_count + stats.breached_count) * params.breach_penalty_percent
+        + int(total_rejections or 0) * params.rejection_penalty_percent
+        + int(total_delays or 0) * params.delay_penalty_percent
+    )
     
-    # Calculate average completion time
-    avg_completion_days = total_completion_days / total_completed if total_completed > 0 else 0
+    # Cap score between 0 and 120 (allow exceeding 100% for exceptional performance)
+    return round(max(0.0, min(120.0, 100.0 + rewards - penalties)), 1)
+
+
+def apply_performance_stats(dca: DCA, stats: Optional[DCAPerformanceStats]) -> Optional[float]:
+    """Set a DCA's average completion time from its aggregates and return its score (caller stores it)."""
+    dca.avg_completion_time_days = average_completion_days(stats)
+    return performance_score_from_stats(stats, dca.total_cases_rejected, dca.total_delays)
+
+
+def average_completion_days(stats: Optional[DCAPerformanceStats]) -> float:
+    if stats is None or not stats.completed_count:
+        return 0.0
+    return round(stats.completion_days_total / stats.completed_count, 2)
+
+
+def record_case_completion(db: Session, dca: DCA, case: Case):
+    """
+    Add a closed case to its DCA's aggregates.
     
-    # PENALTY: Rejections (-5% each)
-    total_rejections = int(dca.total_cases_rejected) if dca.total_cases_rejected is not None else 0
-    if total_rejections > 0:
-        total_penalties += (total_rejections * 5.0)
+    One atomic upsert that adds this case's contribution to each counter,
+    so concurrent completions for the same DCA do not lose updates. Call
+    once per case, when it is closed.
+    """
+    slow_after_days = get_platform_settings().processing_threshold_days
+    deltas = dict.fromkeys(STATS_COUNTERS, 0)
+    deltas["completed_count"] = 1
+    
+    if case.assigned_at and case.completed_at:
+        processing_days = (_as_utc(case.completed_at) - _as_utc(case.assigned_at)).days
+        deltas["completion_days_total"] = processing_days
+        if processing_days <= QUICK_COMPLETION_DAYS:
+            deltas["quick_count"] = 1
+        elif processing_days > slow_after_days:
+            deltas["slow_count"] = 1
+            deltas["slow_overage_days"] = processing_days - slow_after_days
+    
+    if case.sla_status == SLAStatus.AT_RISK:
+        deltas["at_risk_count"] = 1
+    elif case.sla_status == SLAStatus.BREACHED:
+        deltas["breached_count"] = 1
+    
+    upsert = (postgresql.insert if _dialect_name(db) == "postgresql" else sqlite.insert)(DCAPerformanceStats)
+    db.execute(
+        upsert.values(dca_id=dca.id, **deltas).on_conflict_do_update(
+            index_elements=[DCAPerformanceStats.dca_id],
+            set_={
+                **{name: getattr(DCAPerformanceStats, name) + getattr(upsert.excluded, name) for name in STATS_COUNTERS},
+                "updated_at": func.now(),
+            }
+        )
+    )
+
+
+def aggregate_dca_cases(db: Session, slow_after_days: Optional[int] = None) -> list:
+    """
+    One grouped pass over assigned cases: per DCA, the number of active
+    (open or in progress) cases and the DCAPerformanceStats counters over
+    closed ones. Works on a Session or a Connection.
     
-    # PENALTY: Delays (-3% each)
-    total_delays = int(dca.total_delays) if dca.total_delays is not None else 0
-    if total_delays > 0:
-        total_penalties += (total_delays * 3.0)
+    Completions count as slow after `slow_after_days` (default: the
+    processing_threshold_days setting).
+    """
+    if slow_after_days is None:
+        slow_after_days = get_platform_settings().processing_threshold_days
+    
+    # Whole days from assignment to completion, as timedelta.days computes them
+    if _dialect_name(db) == "postgresql":
+        elapsed_days = func.floor(func.extract("epoch", Case.completed_at - Case.assigned_at) / 86400)
+    else:
+        # julianday() differences carry float error; nudge exact day counts back up before truncating
+        elapsed_days = func.julianday(Case.completed_at) - func.julianday(Case.assigned_at) + 1e-8
+    
+    assigned = (
+        select(Case.dca_id, Case.status, Case.sla_status, cast(elapsed_days, Integer).label("days"))
+        .where(Case.dca_id.isnot(None))
+        .subquery()
+    )
+    closed = assigned.c.status == CaseStatus.CLOSED
+    days = assigned.c.days
+    
+    def count_where(condition):
+        return func.coalesce(func.sum(sql_case((condition, 1), else_=0)), 0)
+    
+    def sum_where(condition, value):
+        return func.coalesce(func.sum(sql_case((condition, value), else_=0)), 0)
+    
+    return db.execute(
+        select(
+            assigned.c.dca_id,
+            count_where(assigned.c.status.in_([CaseStatus.OPEN, CaseStatus.IN_PROGRESS])).label("active_count"),
+            count_where(closed).label("completed_count"),
+            count_where(closed & (days <= QUICK_COMPLETION_DAYS)).label("quick_count"),
+            count_where(closed & (days > slow_after_days)).label("slow_count"),
+            sum_where(closed & (days > slow_after_days), days - slow_after_days).label("slow_overage_days"),
+            sum_where(closed & days.isnot(None), days).label("completion_days_total"),
+            count_where(closed & (assigned.c.sla_status == SLAStatus.AT_RISK)).label("at_risk_count"),
+            count_where(closed & (assigned.c.sla_status == SLAStatus.BREACHED)).label("breached_count")
+        ).group_by(assigned.c.dca_id)
+    ).all()
+
+
+def rebuild_performance_stats(
+    db: Session,
+    rows: Optional[list] = None,
+    slow_after_days: Optional[int] = None
+) -> Dict[int, DCAPerformanceStats]:
+    """
+    Recompute every DCA's aggregates from its closed cases.
     
-    # Calculate final score: Base + Rewards - Penalties
-    final_score = base_score + total_rewards - total_penalties
+    For reconciliation after direct database edits or bulk loads: the
+    table is replaced from one grouped query (or from `rows` already
+    returned by aggregate_dca_cases). Works on a Session or a Connection.
+    Returns the new aggregates by DCA id.
+    """
+    if rows is None:
+        rows = aggregate_dca_cases(db, slow_after_days)
     
-    # Cap score between 0 and 120 (allow exceeding 100% for exceptional performance)
-    final_score = max(0.0, min(120.0, final_score))
+    records = [
+        {name: getattr(row, name) for name in ("dca_id", *STATS_COUNTERS)}
+        for row in rows if row.completed_count
+    ]
     
-    # Update DCA metrics (will be committed by caller)
-    dca.avg_completion_time_days = round(avg_completion_days, 2)
+    db.execute(delete(DCAPerformanceStats))
+    if records:
+        db.execute(insert(DCAPerformanceStats), records)
     
-    # Log calculation for debugging
-    print(f"[Performance] DCA: {dca.name}")
-    print(f"  Completed: {total_completed}, Quick: {quick_completions}, Slow: {slow_completions}")
-    print(f"  At Risk: {at_risk_cases}, Breached: {breached_cases}")
-    print(f"  Rejections: {total_rejections}, Delays: {total_delays}")
-    print(f"  Rewards: +{total_rewards}%, Penalties: -{total_penalties}%")
-    print(f"  Final Score: {round(final_score, 1)}%")
-    
-    return round(final_score, 1)
+    return {record["dca_id"]: DCAPerformanceStats(**record) for record in records}
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Timezone-aware UTC datetime; SQLite hands back stored datetimes naive."""
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment.astimezone(timezone.utc)
+
+
+def _dialect_name(db) -> str:
+    """Dialect of a Session or Connection."""
+    return db.get_bind().dialect.name if isinstance(db, Session) else db.dialect.name
+
+
+def format_performance_score(score: Optional[float]) -> str:
+    """Display form of a performance score; unrated DCAs show as TBD."""
+    return "TBD" if score is None else f"{score:.1f}"
 
 
 def update_active_case_count(dca: DCA, db: Session):
@@ -0,0 +1,113 @@
+"""
+In-process cache of the platform Settings row.
+
+SLA days and performance penalties are read on every case creation and
+score update, so they are served from an immutable snapshot instead of a
+query per use. The settings routes invalidate the snapshot after writing;
+other workers pick the change up within PLATFORM_SETTINGS_TTL_SECONDS.
+Every write bumps Settings.version, which travels with the snapshot.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Priority, Settings
+
+
+def default_settings() -> Dict[str, Any]:
+    """Column defaults of the Settings model."""
+    return {
+        column.name: column.default.arg
+        for column in Settings.__table__.columns
+        if column.default is not None and not callable(column.default.arg)
+    }
+
+
+class PlatformSettings:
+    """Read-only snapshot of the platform Settings row."""
+    
+    def __init__(self, values: Dict[str, Any]):
+        self._values = values
+    
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+    
+    def sla_days(self, priority: Priority) -> int:
+        return {
+            Priority.P1: self.p1_sla_days,
+            Priority.P2: self.p2_sla_days,
+            Priority.P3: self.p3_sla_days,
+        }[priority]
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self._values)
+
+
+class PlatformSettingsCache:
+    """Settings snapshot shared by all requests in a worker."""
+    
+    def __init__(self, ttl_seconds: float = 30.0):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[PlatformSettings] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+    
+    def get(self) -> PlatformSettings:
+        """Current settings; loads them only when invalidated or older than the TTL."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return snapshot
+        
+        with self._lock:
+            if self._snapshot is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+                self._snapshot = self._load()
+                self._loaded_at = time.monotonic()
+            return self._snapshot
+    
+    def invalidate(self):
+        """Drop the snapshot, e.g. after the settings row was written."""
+        with self._lock:
+            self._snapshot = None
+    
+    def _load(self) -> PlatformSettings:
+        # Read-only, so a cold cache never takes a write lock from inside
+        # another transaction; the row is created on the first update
+        db = SessionLocal()
+        try:
+            row = db.query(Settings).first()
+        finally:
+            db.close()
+        
+        values = {column.name: None for column in Settings.__table__.columns}
+        values.update(default_settings())
+        if row is not None:
+            values.update(
+                (column.name, getattr(row, column.name))
+                for column in Settings.__table__.columns
+                if getattr(row, column.name) is not None
+            )
+        return PlatformSettings(values)
+
+
+_cache: Optional[PlatformSettingsCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_settings_cache() -> PlatformSettingsCache:
+    """Get this worker's platform settings cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PlatformSettingsCache(ttl_seconds=settings.PLATFORM_SETTINGS_TTL_SECONDS)
+    return _cache
+
+
+def get_platform_settings() -> PlatformSettings:
+    """Current platform settings, from this worker's cache."""
+    return get_settings_cache().get()
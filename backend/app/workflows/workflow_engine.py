@@ -1,16 +1,12 @@
 from datetime import datetime, timedelta
 from app.models import Priority, SLAStatus, CaseStatus
+from app.utils.settings_cache import get_platform_settings
 
 
 class WorkflowEngine:
     """Rule-based workflow engine for case management."""
     
-    # SLA days by priority
-    SLA_DAYS = {
-        Priority.P1: 3,   # 3 days for P1
-        Priority.P2: 7,   # 7 days for P2
-        Priority.P3: 14,  # 14 days for P3
-    }
+    # SLA days by priority come from the platform settings (p1/p2/p3_sla_days)
     
     # Priority thresholds
     P1_AMOUNT_THRESHOLD = 50000  # Amount >= 50k
@@ -39,11 +35,11 @@ class WorkflowEngine:
     
     @staticmethod
     def calculate_sla_due_date(priority: Priority, created_at: datetime = None) -> datetime:
-        """Calculate SLA due date based on priority."""
+        """Calculate SLA due date based on priority and the configured SLA days."""
         if created_at is None:
             created_at = datetime.utcnow()
         
-        sla_days = WorkflowEngine.SLA_DAYS[priority]
+        sla_days = get_platform_settings().sla_days(priority)
         return created_at + timedelta(days=sla_days)
     
     @staticmethod
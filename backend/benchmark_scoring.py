@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Scoring Microbenchmark for the recovery score predictor.
+
+Compares the sklearn inference path (scaler.transform + predict_proba) with
+the closed-form "fast" path, for single-row and batch scoring, and checks
+that both produce the same probabilities.
+
+Usage:
+    python benchmark_scoring.py
+    python benchmark_scoring.py --rows 100000 --single-rows 5000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.ai.predictor import RecoveryScorePredictor
+
+
+def _time(fn, repeat: int) -> float:
+    """Best wall-clock time of `repeat` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recovery score inference paths")
+    parser.add_argument("--rows", type=int, default=50000, help="Rows per batch benchmark")
+    parser.add_argument("--single-rows", type=int, default=2000, help="Rows for the single-row benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per measurement (best is reported)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    amounts = rng.uniform(500, 250000, args.rows)
+    ageing = rng.integers(0, 365, args.rows).astype(np.float64)
+    
+    sklearn_predictor = RecoveryScorePredictor(inference_mode="sklearn")
+    fast_predictor = RecoveryScorePredictor(inference_mode="fast")
+    
+    # Correctness: raw probabilities and rounded scores
+    X_scaled = sklearn_predictor.scaler.transform(np.column_stack((amounts, ageing)))
+    reference = sklearn_predictor.model.predict_proba(X_scaled)[:, 1]
+    fast_batch = fast_predictor._fast_probabilities(amounts, ageing)
+    fast_single = np.array([
+        fast_predictor._fast_probability(a, g)
+        for a, g in zip(amounts.tolist(), ageing.tolist())
+    ])
+    
+    print("=" * 60)
+    print("Correctness (vs sklearn predict_proba)")
+    print(f"  Max abs diff, NumPy batch:   {np.max(np.abs(fast_batch - reference)):.3e}")
+    print(f"  Max abs diff, Python single: {np.max(np.abs(fast_single - reference)):.3e}")
+    print(f"  Score mismatches (4 dp), batch:  "
+          f"{int(np.sum(np.round(fast_batch, 4) != np.round(reference, 4)))} / {args.rows}")
+    print(f"  Score mismatches (4 dp), single: "
+          f"{int(np.sum(np.round(fast_single, 4) != np.round(reference, 4)))} / {args.rows}")
+    
+    # Single-row latency
+    single_pairs = list(zip(amounts[:args.single_rows].tolist(), ageing[:args.single_rows].tolist()))
+    
+    def score_single(predictor):
+        for a, g in single_pairs:
+            predictor.predict_recovery_score(a, g)
+    
+    sklearn_single = _time(lambda: score_single(sklearn_predictor), args.repeat) / len(single_pairs)
+    fast_single_t = _time(lambda: score_single(fast_predictor), args.repeat) / len(single_pairs)
+    
+    # Batch throughput
+    sklearn_batch = _time(lambda: sklearn_predictor.predict_batch(amounts, ageing), args.repeat)
+    fast_batch_t = _time(lambda: fast_predictor.predict_batch(amounts, ageing), args.repeat)
+    
+    print("=" * 60)
+    print("Single row (predict_recovery_score)")
+    print(f"  sklearn: {sklearn_single * 1e6:10.2f} us/row")
+    print(f"  fast:    {fast_single_t * 1e6:10.2f} us/row  ({sklearn_single / fast_single_t:.0f}x)")
+    print(f"Batch of {args.rows} rows (predict_batch)")
+    print(f"  sklearn: {sklearn_batch * 1e3:10.2f} ms  ({args.rows / sklearn_batch:,.0f} rows/s)")
+    print(f"  fast:    {fast_batch_t * 1e3:10.2f} ms  ({args.rows / fast_batch_t:,.0f} rows/s)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
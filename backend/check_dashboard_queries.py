@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Query budget check for the dashboard statistics.
+
+Against the configured database (DATABASE_URL), counts the SQL
+statements issued by the full aggregation (reconciliation) and by a
+dashboard read from the counters row, and fails if either is over budget.
+The dashboard is the most frequently hit endpoint, so its cost must not
+creep back up to one query per figure.
+
+Usage:
+    python check_dashboard_queries.py
+    python check_dashboard_queries.py --budget 2 --read-budget 1
+"""
+
+import argparse
+import sys
+import time
+
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.services import CaseService
+from app.services.dashboard_counters import aggregate_dashboard_stats, reconcile_dashboard_counters
+
+
+def count_queries(func, *args):
+    """Run func(*args); return its result, the statements it executed and the elapsed ms."""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, statements, elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the query budget of the dashboard statistics")
+    parser.add_argument("--budget", type=int, default=2, help="Maximum SQL statements of the full aggregation")
+    parser.add_argument("--read-budget", type=int, default=1, help="Maximum SQL statements of a counters read")
+    parser.add_argument("--verbose", action="store_true", help="Print the statements")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        stats, aggregate_statements, aggregate_ms = count_queries(aggregate_dashboard_stats, db)
+        reconcile_dashboard_counters(db)
+        counters, read_statements, read_ms = count_queries(CaseService.get_dashboard_stats, db)
+    finally:
+        db.close()
+    
+    for name, value in stats.model_dump().items():
+        print(f"  {name:<22} {value}")
+    if args.verbose:
+        for statement in aggregate_statements + read_statements:
+            print(f"\n{statement}")
+    
+    failed = False
+    for label, statements, elapsed_ms, budget in (
+        ("Full aggregation", aggregate_statements, aggregate_ms, args.budget),
+        ("Counters read", read_statements, read_ms, args.read_budget),
+    ):
+        print(f"{label}: {len(statements)} queries in {elapsed_ms:.1f} ms (budget {budget})")
+        failed |= len(statements) > budget
+    
+    if counters != stats:
+        print("❌ Dashboard counters differ from the aggregated statistics")
+        sys.exit(1)
+    if failed:
+        print("❌ Dashboard query count is over budget")
+        sys.exit(1)
+    print("✅ Dashboard query budget OK")
+
+
+if __name__ == "__main__":
+    main()
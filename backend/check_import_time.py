@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the API entry point.
+
+Imports the target module in a fresh interpreter with `python -X importtime`,
+reports the slowest imports and fails if the cumulative import time is over
+budget or if any of the lazily loaded heavy stacks (numpy, scikit-learn,
+reportlab, ...) were pulled in at import time.
+
+Usage:
+    python check_import_time.py
+    python check_import_time.py --budget-ms 1500 --module app.main
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Dependencies that must only load on first use or during warm-up
+LAZY_PACKAGES = ("numpy", "scipy", "sklearn", "joblib", "pandas", "reportlab")
+
+
+def measure_imports(module: str):
+    """Return {module_name: (self_us, cumulative_us)} for a fresh import of `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(f"Importing {module} failed")
+    
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import-time budget of the API")
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--budget-ms", type=float, default=2000.0, help="Cumulative import budget in ms")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to show")
+    args = parser.parse_args()
+    
+    timings = measure_imports(args.module)
+    total_ms = timings[args.module][1] / 1000
+    
+    print(f"Slowest imports (self time) for {args.module}:")
+    for name, (self_us, cumulative_us) in sorted(timings.items(), key=lambda t: -t[1][0])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  (cumulative {cumulative_us / 1000:8.1f} ms)  {name}")
+    
+    eager = sorted({name.split(".")[0] for name in timings} & set(LAZY_PACKAGES))
+    
+    print(f"\nCumulative import time: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if total_ms > args.budget_ms:
+        print("❌ Import time is over budget")
+        failed = True
+    if eager:
+        print(f"❌ Heavy packages imported eagerly: {', '.join(eager)}")
+        failed = True
+    if not failed:
+        print("✅ Import-time budget OK")
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Maintenance Commands for FedEx DCA Management Platform
+
+Usage:
+    python maintenance.py rebuild-performance-stats
+    python maintenance.py recompute-dca-metrics
+    python maintenance.py reconcile-dashboard-counters
+    python maintenance.py backfill-dashboard-rollups [--start YYYY-MM-DD] [--end YYYY-MM-DD]
+"""
+
+import argparse
+import time
+from datetime import date
+
+from app.database import SessionLocal
+from app.models import DCA
+from app.services import DCAService
+from app.services.dca_capacity_index import get_dca_capacity_index
+from app.services.dashboard_counters import COUNTER_COLUMNS, reconcile_dashboard_counters
+from app.services.dashboard_rollups import backfill_rollups, snapshot_today
+from app.utils.performance import apply_performance_stats, rebuild_performance_stats
+
+
+def rebuild_performance_stats_command(args):
+    """Recompute DCA performance aggregates from closed cases, then every DCA's score."""
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        stats = rebuild_performance_stats(db)
+        aggregated = time.perf_counter()
+        
+        changed = 0
+        for dca in db.query(DCA).all():
+            score = apply_performance_stats(dca, stats.get(dca.id))
+            if score != dca.performance_score:
+                changed += 1
+                print(f"  {dca.name}: {dca.performance_score} -> {score}")
+            dca.performance_score = score
+        
+        db.commit()
+        get_dca_capacity_index().invalidate()
+        finished = time.perf_counter()
+        
+        print(f"Rebuilt aggregates for {len(stats)} DCAs in {aggregated - started:.2f}s")
+        print(f"Updated scores in {finished - aggregated:.2f}s ({changed} changed)")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def recompute_dca_metrics_command(args):
+    """Recompute scores, average completion times and active counts for all DCAs in one pass."""
+    db = SessionLocal()
+    try:
+        result = DCAService.recompute_metrics(db)
+    finally:
+        db.close()
+    
+    print(f"Recomputed {result.dca_count} DCAs ({result.rated} rated)")
+    print(f"  Scores changed: {result.scores_changed}, active counts changed: {result.active_counts_changed}")
+    print(f"  Aggregate: {result.aggregate_ms:.1f} ms, write: {result.write_ms:.1f} ms")
+
+
+def reconcile_dashboard_counters_command(args):
+    """Recompute the dashboard counters from cases and DCAs."""
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        counters = reconcile_dashboard_counters(db)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        for name in COUNTER_COLUMNS:
+            print(f"  {name:<22} {getattr(counters, name)}")
+    finally:
+        db.close()
+    
+    print(f"Reconciled dashboard counters in {elapsed_ms:.1f} ms")
+
+
+def backfill_dashboard_rollups_command(args):
+    """Rebuild the daily dashboard rollups of past days from cases, then snapshot today."""
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rows = backfill_rollups(db, start=args.start, end=args.end)
+        backfilled = time.perf_counter()
+        today_rows = snapshot_today(db) if args.end is None else 0
+        finished = time.perf_counter()
+    finally:
+        db.close()
+    
+    print(f"Backfilled {rows} rollup rows in {backfilled - started:.2f}s")
+    if args.end is None:
+        print(f"Snapshot {today_rows} rows for today in {finished - backfilled:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintenance commands')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    
+    subcommands.add_parser(
+        'rebuild-performance-stats',
+        help='Rebuild DCA performance aggregates and scores from closed cases'
+    ).set_defaults(handler=rebuild_performance_stats_command)
+    
+    subcommands.add_parser(
+        'recompute-dca-metrics',
+        help='Recompute score, average completion time and active case count for every DCA'
+    ).set_defaults(handler=recompute_dca_metrics_command)
+    
+    subcommands.add_parser(
+        'reconcile-dashboard-counters',
+        help='Recompute the dashboard counters from cases and DCAs'
+    ).set_defaults(handler=reconcile_dashboard_counters_command)
+    
+    backfill = subcommands.add_parser(
+        'backfill-dashboard-rollups',
+        help='Rebuild the daily dashboard rollups from case history (default: all days up to yesterday)'
+    )
+    backfill.add_argument('--start', type=date.fromisoformat, help='First day to rebuild (UTC)')
+    backfill.add_argument('--end', type=date.fromisoformat, help='Last day to rebuild (UTC)')
+    backfill.set_defaults(handler=backfill_dashboard_rollups_command)
+    
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
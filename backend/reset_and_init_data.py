@@ -17,9 +17,13 @@ import argparse
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.database import Base, engine
-from app.models import User, Case, DCA, CaseStatus, SLAStatus, Priority
+from app.models import User, Case, DCA, DCAPerformanceStats, DashboardDailyRollup, CaseStatus, SLAStatus, Priority
 from app.models.models import AuditLog
 from app.auth import get_password_hash
+from app.services.case_id_generator import get_case_id_generator
+from app.services.dashboard_counters import reconcile_dashboard_counters
+from app.services.dashboard_rollups import get_dashboard_rollup_job
+from app.utils.debt_ranges import DebtRangeIndex
 from app.config import settings
 from datetime import datetime, timedelta, timezone
 import random
@@ -38,10 +42,15 @@ def delete_all_data(session):
         session.query(Case).delete()
         print("   ✓ Deleted all cases")
         
-        # Then delete DCAs
+        # Then delete DCAs and their performance aggregates
+        session.query(DCAPerformanceStats).delete()
         session.query(DCA).delete()
         print("   ✓ Deleted all DCAs")
         
+        # Trend history described the deleted cases
+        session.query(DashboardDailyRollup).delete()
+        print("   ✓ Deleted all dashboard rollups")
+        
         # Don't delete users to keep admin login working
         # session.query(User).delete()
         
@@ -163,7 +172,7 @@ def init_dcas(session):
             contact_person=config["contact"],
             email=config["email"],
             phone=config["phone"],
-            performance_score="TBD",
+            performance_score=None,
             max_capacity=config["capacity"],
             min_debt_amount=config["min_debt"],
             max_debt_amount=config["max_debt"],
@@ -240,9 +249,9 @@ def init_cases(session, dcas):
     ]
     
     created_cases = []
-    case_number = 1
+    case_ids = get_case_id_generator().next_case_ids(session, len(customers_config))
     
-    for config in customers_config:
+    for case_id, config in zip(case_ids, customers_config):
         # Calculate priority based on amount and ageing
         amount = config["amount"]
         ageing = config["ageing"]
@@ -266,7 +275,7 @@ def init_cases(session, dcas):
         created_at = datetime.now(timezone.utc) - timedelta(days=ageing)
         
         case = Case(
-            case_id=f"CASE-2026-{case_number:06d}",
+            case_id=case_id,
             customer_name=config["name"],
             customer_email=config["email"],
             customer_phone=config["phone"],
@@ -288,7 +297,6 @@ def init_cases(session, dcas):
         
         session.add(case)
         created_cases.append(case)
-        case_number += 1
     
     session.commit()
     print(f"   ✓ Created {len(created_cases)} cases")
@@ -300,13 +308,13 @@ def assign_cases_to_dcas(session, cases, dcas):
     print("\n🔗 Assigning cases to DCAs...")
     
     assigned_count = 0
+    debt_ranges = DebtRangeIndex((dca, dca.min_debt_amount, dca.max_debt_amount) for dca in dcas)
     
     for case in cases:
         # Find suitable DCAs based on debt range
         suitable_dcas = [
-            dca for dca in dcas
-            if dca.min_debt_amount <= case.overdue_amount <= dca.max_debt_amount
-            and dca.active_cases_count < dca.max_capacity
+            dca for dca in debt_ranges.eligible(case.overdue_amount)
+            if dca.active_cases_count < dca.max_capacity
         ]
         
         if suitable_dcas:
@@ -390,6 +398,10 @@ def main():
             assign_cases_to_dcas(session, cases, dcas)
             print("\n✅ DATA INITIALIZATION COMPLETED!")
         
+        # Bulk changes above bypass the dashboard counters; rebuild the trend history too
+        reconcile_dashboard_counters(session)
+        get_dashboard_rollup_job().run_once()
+        
         print("\n" + "=" * 60)
         print("Summary:")
         print(f"  Users: {session.query(User).count()}")
@@ -184,7 +184,7 @@ const DCADetailModal: React.FC<DCADetailModalProps> = ({ dca, onClose }) => {
               </div>
               <div className="info-item">
                 <span className="info-label">Performance Score:</span>
-                <span className="info-value performance-score">{dca.performance_score}</span>
+                <span className="info-value performance-score">{dca.performance_score ?? 'TBD'}</span>
               </div>
               <div className="info-item">
                 <span className="info-label">Active Cases:</span>
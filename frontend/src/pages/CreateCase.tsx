@@ -199,7 +199,7 @@ const CreateCase: React.FC = () => {
                   <option value="">-- Select a DCA --</option>
                   {dcas.map((dca) => (
                     <option key={dca.id} value={dca.id}>
-                      {dca.name} - Score: {dca.performance_score} | Capacity: {dca.active_cases_count}/{dca.max_capacity}
+                      {dca.name} - Score: {dca.performance_score ?? 'TBD'} | Capacity: {dca.active_cases_count}/{dca.max_capacity}
                     </option>
                   ))}
                 </select>
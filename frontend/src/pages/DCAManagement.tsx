@@ -10,7 +10,7 @@ interface DCA {
   contact_person: string;
   email: string;
   phone: string;
-  performance_score: number | string;  // Can be number or "TBD"
+  performance_score: number | null;  // null until the DCA is rated
   active_cases_count: number;
   max_capacity: number;
   is_active: boolean;
@@ -60,7 +60,7 @@ const DCAManagement: React.FC = () => {
         min_debt_amount: parseFloat(formData.min_debt_amount) || 0,
         max_debt_amount: parseFloat(formData.max_debt_amount) || 1000000,
         website_url: formData.website_url,
-        performance_score: 'TBD',
+        performance_score: null,
       });
       setShowCreate(false);
       setFormData({
@@ -240,7 +240,7 @@ const DCAManagement: React.FC = () => {
                 <span className="score">
                   {typeof dca.performance_score === 'number' 
                     ? `${dca.performance_score.toFixed(1)}%` 
-                    : dca.performance_score}
+                    : 'TBD'}
                 </span>
               </div>
               <div className="info-row">
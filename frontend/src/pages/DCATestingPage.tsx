@@ -19,7 +19,7 @@ interface Case {
 interface DCA {
   id: number;
   name: string;
-  performance_score: string;
+  performance_score: number | null;
   active_cases: number;
   total_completed: number;
   total_rejected: number;
@@ -141,7 +141,7 @@ const DCATestingPage: React.FC = () => {
                 <div className="dca-stats">
                   <div className="stat">
                     <span className="stat-label">Score:</span>
-                    <span className="stat-value">{dca.performance_score}</span>
+                    <span className="stat-value">{dca.performance_score ?? 'TBD'}</span>
                   </div>
                   <div className="stat">
                     <span className="stat-label">Active:</span>